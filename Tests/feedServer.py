@@ -0,0 +1,109 @@
+import gzip
+import io
+import select
+import socket
+import threading
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+
+
+class FeedRequestHandler(BaseHTTPRequestHandler):
+    """Answers every GET request with the feed of the server"""
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.numConnections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, dict(self.headers.items())))
+        if len(server.statusCodes) > 0:
+            status, headers = server.statusCodes.pop(0)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.send_header("ETag", server.etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = server.body
+        encoded = (server.gzip and
+                   ("gzip" in self.headers.get("Accept-Encoding", "")))
+        if encoded:
+            buf = io.BytesIO()
+            with gzip.GzipFile(fileobj=buf, mode="wb") as f:
+                f.write(body)
+            body = buf.getvalue()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/atom+xml")
+        self.send_header("ETag", server.etag)
+        if encoded:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if server.delay > 0:
+            self.wfile.flush()
+            # a client giving up closes (or aborts) the connection meanwhile
+            readable = select.select([self.connection], [], [],
+                                     server.delay)[0]
+            try:
+                dropped = (len(readable) > 0) and (self.connection.recv(1)
+                                                   == b"")
+            except socket.error:
+                dropped = True
+            if dropped:
+                server.numDropped += 1
+                self.close_connection = True
+                return
+        server.bytesSent += len(body)
+        self.wfile.write(body)
+
+
+class FeedServer(ThreadingMixIn, HTTPServer):
+    """Local stand-in for arXiv's api serving one feed
+
+    Counts requests, connections and bytes sent, gzip encodes the feed if
+    asked to, answers conditional requests with 304 Not Modified, and can be
+    told to answer with other status codes or to delay the body (counting
+    the connections dropped meanwhile).
+    """
+    daemon_threads = True
+
+    def __init__(self, fileName="./Tests/testFeed.xml", gzip=True):
+        HTTPServer.__init__(self, ("127.0.0.1", 0), FeedRequestHandler)
+        with open(fileName, "rb") as f:
+            self.body = f.read()
+        self.etag = '"testFeed"'
+        self.requests = []
+        self.numConnections = 0
+        self.bytesSent = 0
+        self.gzip = gzip
+        self.statusCodes = []
+        self.delay = 0.
+        self.numDropped = 0
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+    def url(self, path="/api/query?search_query=all:test"):
+        return "http://127.0.0.1:{0:d}{1}".format(self.server_port, path)
@@ -0,0 +1,212 @@
+import datetime
+import os
+import re
+import sys
+import time
+import unittest
+import feedDownloader as fD
+import queryString as qS
+import rateLimiter as rL
+from feedServer import FeedServer
+import arXivQuerPy as aQ
+from arXivQuerPy import arXivQuerPy
+if sys.version_info >= (3, 5):
+    import asyncio
+    import asyncFeedDownloader as aFD
+else:
+    aFD = None
+
+
+@unittest.skipIf(aFD is None, "asyncio needs python 3")
+class test_asyncFeedDownloader(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.limiter = fD.rateLimiter
+        fD.setRateLimiter(rL.RateLimiter(interval=0.))
+        self.server = FeedServer().__enter__()
+
+    def tearDown(self):
+        fD.setRateLimiter(self.limiter)
+        self.server.__exit__()
+        self.server = None
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def wait(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_downloadFeed(self):
+        feed = self.wait(aFD.downloadFeed(self.server.url()))
+        self.assertEqual(len(feed.entries), 10)
+        self.assertEqual(feed.entries[0].link,
+                         "http://arxiv.org/abs/1608.03248v1")
+        self.assertEqual(feed.feed.opensearch_totalresults, "38253")
+        self.assertTrue("gzip" in
+                        self.server.requests[0][1]["Accept-Encoding"])
+
+    def test_uncompressed(self):
+        self.server.gzip = False
+        feed = self.wait(aFD.downloadFeed(self.server.url()))
+        self.assertEqual(len(feed.entries), 10)
+
+    def test_stopDate(self):
+        feed = self.wait(aFD.downloadFeed(self.server.url(),
+                                          datetime.date(2016, 8, 11)))
+        self.assertEqual(len(feed.entries), 1)
+
+    def test_file(self):
+        url = "file://" + os.path.abspath("./Tests/testFeed.xml")
+        self.assertEqual(len(self.wait(aFD.downloadFeed(url)).entries), 10)
+
+    def test_redirect(self):
+        self.server.statusCodes.append((302, {"Location": "/moved"}))
+        self.assertEqual(
+            len(self.wait(aFD.downloadFeed(self.server.url())).entries), 10)
+        self.assertEqual(self.server.requests[1][0], "/moved")
+
+    def test_retryUnavailable(self):
+        self.server.statusCodes.append((503, {"Retry-After": "0"}))
+        self.assertEqual(
+            len(self.wait(aFD.downloadFeed(self.server.url())).entries), 10)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_notFound(self):
+        self.server.statusCodes.append((404, {}))
+        with self.assertRaises(fD.HTTPError):
+            self.wait(aFD.downloadFeed(self.server.url()))
+
+    def test_prefetch(self):
+        downloader = aFD.AsyncFeedDownloader(self.server.url())
+        downloader.prefetch([self.server.url("/second")])
+        self.wait(downloader.updateFeed())
+        downloader.updateQueryString(self.server.url("/second"))
+        self.wait(downloader.updateFeed())
+        self.assertEqual(len(downloader.getFeed().entries), 10)
+        self.assertEqual(sorted(path for path, headers
+                                in self.server.requests),
+                         ["/api/query?search_query=all:test", "/second"])
+
+    def test_timeout(self):
+        fD.setRateLimiter(rL.RateLimiter(interval=60.))
+        downloader = aFD.AsyncFeedDownloader(self.server.url(), timeout=0.1)
+        self.wait(downloader.updateFeed())
+        with self.assertRaises(asyncio.TimeoutError):
+            self.wait(downloader.updateFeed())
+        # the request waiting for the rate limiter is not made anymore
+        self.wait(asyncio.sleep(0.2))
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_timeoutAbortsRequest(self):
+        self.server.delay = 60.
+        downloader = aFD.AsyncFeedDownloader(self.server.url(), timeout=0.2)
+        with self.assertRaises(asyncio.TimeoutError):
+            self.wait(downloader.updateFeed())
+        for i in range(50):
+            if self.server.numDropped > 0:
+                break
+            time.sleep(0.05)
+        self.assertEqual(self.server.numDropped, 1)
+        self.assertEqual(self.server.bytesSent, 0)
+
+    def test_cancelAbortsRequest(self):
+        self.server.delay = 60.
+        downloader = aFD.AsyncFeedDownloader(self.server.url())
+        downloader.prefetch([self.server.url()])
+        task = downloader.pending[self.server.url()]
+        while len(self.server.requests) == 0:
+            self.wait(asyncio.sleep(0.01))
+        downloader.cancel()
+        self.wait(asyncio.wait([task]))
+        self.assertTrue(task.cancelled())
+        for i in range(50):
+            if self.server.numDropped > 0:
+                break
+            time.sleep(0.05)
+        self.assertEqual(self.server.numDropped, 1)
+
+    def test_maxDownloads(self):
+        downloader = aFD.AsyncFeedDownloader(self.server.url(),
+                                             maxDownloads=1)
+        queryStrings = [self.server.url("/{0:d}".format(i))
+                        for i in range(5)]
+        downloader.prefetch(queryStrings)
+        # only the first download started, the others wait for it
+        self.wait(asyncio.sleep(0))
+        self.assertEqual([task.done() for task in downloader.pending.values()],
+                         [False] * 5)
+        self.assertEqual(downloader.semaphore.locked(), True)
+        for queryString in queryStrings:
+            downloader.updateQueryString(queryString)
+            self.wait(downloader.updateFeed())
+        self.assertEqual([path for path, headers in self.server.requests],
+                         ["/{0:d}".format(i) for i in range(5)])
+
+
+@unittest.skipIf(aFD is None, "asyncio needs python 3")
+class test_searchAsync(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.limiter = fD.rateLimiter
+        fD.setRateLimiter(None)
+        self.server = FeedServer(gzip=False).__enter__()
+        # the date window of the search holds 12 results
+        self.server.body = re.sub(b"(<opensearch:totalResults[^>]*>)\\d+",
+                                  b"\\g<1>12", self.server.body)
+        self.baseUrl = qS.QueryString.baseUrl
+        qS.QueryString.baseUrl = self.server.url("/api/query?")
+
+    def tearDown(self):
+        qS.QueryString.baseUrl = self.baseUrl
+        fD.setRateLimiter(self.limiter)
+        self.server.__exit__()
+        self.server = None
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_search(self):
+        querPy = arXivQuerPy("Hi\n", datetime.date(2016, 8, 10), pageSize=2)
+        querPy.addCategory("cond-mat")
+        self.loop.run_until_complete(querPy.searchAsync(prefetch=2))
+        paths = sorted(path for path, headers in self.server.requests)
+        self.assertEqual(len(paths), 3)
+        self.assertTrue(all("lastUpdatedDate:%5B201608100000+TO+" in path
+                            for path in paths))
+        self.assertEqual(querPy.textComp.getEntryIds()[:2],
+                         ["http://arxiv.org/abs/1608.03248v1",
+                          "http://arxiv.org/abs/1512.00810v3"])
+
+    def test_sameAsSearch(self):
+        querPy = arXivQuerPy("Hi\n", datetime.date(2016, 8, 10), pageSize=2)
+        querPy.addCategory("cond-mat")
+        self.loop.run_until_complete(querPy.searchAsync())
+        blocking = arXivQuerPy("Hi\n", datetime.date(2016, 8, 10),
+                               pageSize=2)
+        blocking.addCategory("cond-mat")
+        blocking.search()
+        self.assertEqual(querPy.textComp.getText(),
+                         blocking.textComp.getText())
+
+
+class test_withoutAsyncio(unittest.TestCase):
+    def setUp(self):
+        self.aFD = aQ.aFD
+        aQ.aFD = None
+
+    def tearDown(self):
+        aQ.aFD = self.aFD
+
+    def test_searchAsync(self):
+        querPy = arXivQuerPy()
+        querPy.addCategory("cond-mat")
+        with self.assertRaises(RuntimeError):
+            querPy.searchAsync()
+
+    def test_sendMailAsync(self):
+        with self.assertRaises(RuntimeError):
+            arXivQuerPy().sendMailAsync("a@b.de", True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+import feedparser
+from benchmark import *
+
+
+class test_syntheticFeed(unittest.TestCase):
+    def test_entries(self):
+        feed = feedparser.parse(syntheticFeed(25))
+        self.assertEqual(len(feed.entries), 25)
+        self.assertEqual(len(set(entry.id for entry in feed.entries)), 25)
+        updates = [entry.updated_parsed for entry in feed.entries]
+        self.assertEqual(updates, sorted(updates, reverse=True))
+        self.assertEqual(feed.feed.opensearch_totalresults, "25")
+
+
+class test_findRegressions(unittest.TestCase):
+    def setUp(self):
+        self.baseline = [{"stage": "parse", "entries": 10, "best": 1.},
+                         {"stage": "compose", "entries": 10, "best": 1.}]
+
+    def test_noRegression(self):
+        results = [{"stage": "parse", "entries": 10, "best": 1.1},
+                   {"stage": "mail", "entries": 10, "best": 5.}]
+        self.assertEqual(findRegressions(results, self.baseline), [])
+
+    def test_regression(self):
+        results = [{"stage": "compose", "entries": 10, "best": 1.5}]
+        self.assertEqual(findRegressions(results, self.baseline),
+                         [{"stage": "compose", "entries": 10, "best": 1.5,
+                           "baseline": 1.}])
+
+
+class test_runBenchmarks(unittest.TestCase):
+    def test_stages(self):
+        results = runBenchmarks(sizes=[10], repeats=1)
+        self.assertEqual([result["stage"] for result in results],
+                         ["queryString", "download", "parse",
+                          "streamingParse", "loadFeed", "compose", "mail",
+                          "pipeline"])
+        self.assertTrue(all(result["best"] >= 0. for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import datetime
+import feedDownloader as fD
+from connectionPool import *
+from feedServer import FeedServer
+
+
+class test_connectionPool(unittest.TestCase):
+    def setUp(self):
+        self.server = FeedServer().__enter__()
+        self.pool = ConnectionPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.__exit__()
+        self.pool = None
+        self.server = None
+
+    def test_keepAlive(self):
+        for i in range(3):
+            with self.pool.open(self.server.url()) as response:
+                self.assertEqual(response.read(), self.server.body)
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.server.numConnections, 1)
+        self.assertEqual(self.pool.numConnections, 1)
+
+    def test_gzip(self):
+        with self.pool.open(self.server.url()) as response:
+            self.assertEqual(response.info().get("Content-Encoding"),
+                             "gzip")
+            data = b""
+            chunk = response.read(100)
+            while len(chunk) > 0:
+                self.assertTrue(len(chunk) <= 100)
+                data += chunk
+                chunk = response.read(100)
+        self.assertEqual(data, self.server.body)
+        self.assertTrue(self.server.bytesSent < len(self.server.body))
+
+    def test_noGzip(self):
+        pool = ConnectionPool(gzip=False)
+        with pool.open(self.server.url()) as response:
+            self.assertEqual(response.read(), self.server.body)
+        pool.close()
+        self.assertEqual(self.server.bytesSent, len(self.server.body))
+
+    def test_abandonedResponse(self):
+        self.server.gzip = False
+        response = self.pool.open(self.server.url())
+        response.read(10)
+        response.close()
+        with self.pool.open(self.server.url()) as response:
+            self.assertEqual(response.read(), self.server.body)
+        self.assertEqual(self.server.numConnections, 2)
+
+    def test_staleConnection(self):
+        with self.pool.open(self.server.url()) as response:
+            response.read()
+        for connection in self.pool.idle.values():
+            connection[0].sock.close()
+        with self.pool.open(self.server.url()) as response:
+            self.assertEqual(response.read(), self.server.body)
+
+    def test_httpError(self):
+        self.server.statusCodes.append((503, {"Retry-After": "1"}))
+        with self.assertRaises(HTTPError) as context:
+            self.pool.open(self.server.url())
+        self.assertEqual(context.exception.code, 503)
+        with self.pool.open(self.server.url()) as response:
+            self.assertEqual(response.read(), self.server.body)
+        self.assertEqual(self.server.numConnections, 1)
+
+    def test_redirect(self):
+        self.server.statusCodes.append((301, {"Location": "/moved"}))
+        with self.pool.open(self.server.url()) as response:
+            self.assertEqual(response.read(), self.server.body)
+        self.assertEqual(self.server.requests[1][0], "/moved")
+
+    def test_tooManyRedirects(self):
+        self.server.statusCodes.extend([(302, {"Location": "/moved"})] * 6)
+        self.assertRaises(TooManyRedirectsException,
+                          self.pool.open, self.server.url())
+
+
+class test_pooledDownload(unittest.TestCase):
+    def setUp(self):
+        self.server = FeedServer().__enter__()
+        self.pool = ConnectionPool()
+        fD.setConnectionPool(self.pool)
+        self.limiter = fD.rateLimiter
+        fD.setRateLimiter(None)
+
+    def tearDown(self):
+        fD.setRateLimiter(self.limiter)
+        fD.setConnectionPool(ConnectionPool())
+        self.pool.close()
+        self.server.__exit__()
+        self.pool = None
+        self.server = None
+
+    def test_downloadersShareConnection(self):
+        for i in range(3):
+            feedDL = fD.FeedDownloader(self.server.url())
+            feedDL.updateFeed()
+            self.assertEqual(len(feedDL.getFeed().entries), 10)
+        self.assertEqual(self.server.numConnections, 1)
+
+    def test_streamingDownload(self):
+        self.server.gzip = False
+        feed = fD.downloadFeed(self.server.url(), datetime.date(2016, 8, 11))
+        self.assertEqual(len(feed.entries), 1)
+        feed = fD.downloadFeed(self.server.url(), datetime.date(2016, 8, 10))
+        self.assertEqual(len(feed.entries), 10)
+        self.assertEqual(len(fD.downloadFeed(self.server.url()).entries),
+                         10)
+        self.assertEqual(self.server.numConnections, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from feedDownloader import *
+from queryString import *
+from entryFilter import *
+
+
+class test_authorMatches(unittest.TestCase):
+    def test_surnameAndInitial(self):
+        self.assertTrue(authorMatches("Rutenberg_A", "Andrew D Rutenberg"))
+
+    def test_wrongInitial(self):
+        self.assertFalse(authorMatches("Rutenberg_B", "Andrew D Rutenberg"))
+
+    def test_onlySurname(self):
+        self.assertTrue(authorMatches("rutenberg", "Andrew D Rutenberg"))
+
+    def test_doubleName(self):
+        self.assertTrue(authorMatches("Schimansky-Geier_L",
+                                      "Lutz Schimansky-Geier"))
+
+    def test_otherAuthor(self):
+        self.assertFalse(authorMatches("Brown_A", "Andrew D Rutenberg"))
+
+
+class test_entryFilter(unittest.TestCase):
+    def setUp(self):
+        self.queryString = QueryString()
+        feedDL = FeedDownloader(r"notNecessary")
+        feedDL.loadFeed("./Tests/testFeed.pickle")
+        self.feed = feedDL.getFeed()
+
+    def tearDown(self):
+        self.queryString = None
+        self.feed = None
+
+    def titles(self):
+        entryFilter = EntryFilter(self.queryString)
+        return [entry.title[:20]
+                for entry in entryFilter.filterFeed(self.feed).entries]
+
+    def test_author(self):
+        self.queryString.addAuthorQuery("Sperl_M")
+        self.assertEqual(self.titles(), ["Glassy Dynamics of B"])
+
+    def test_titleKeyword(self):
+        self.queryString.addTitleQuery("vortex")
+        self.assertEqual(self.titles(), ["Space-time vortex dr"])
+
+    def test_abstractKeyword(self):
+        self.queryString.addAbstractQuery("collagen")
+        self.assertEqual(self.titles(), ["Uniform spatial dist"])
+
+    def test_orConnector(self):
+        self.queryString.addAuthorQuery("Sperl_M")
+        self.queryString.addTitleQuery("vortex")
+        self.assertEqual(self.titles(), ["Space-time vortex dr",
+                                         "Glassy Dynamics of B"])
+
+    def test_andConnector(self):
+        self.queryString.addAuthorQuery("Sperl_M")
+        self.queryString.addTitleQuery("vortex")
+        self.queryString.setConnector("and")
+        self.assertEqual(self.titles(), [])
+
+    def test_subcategories(self):
+        self.queryString.addCategory("cond-mat")
+        self.assertEqual(self.titles(), ["Space-time vortex dr",
+                                         "Glassy Dynamics of B",
+                                         "Topological attribut"])
+
+    def test_keywordAndCategory(self):
+        self.queryString.addTitleQuery("dynamics")
+        self.queryString.addCategory("cond-mat.soft")
+        self.assertEqual(self.titles(), ["Glassy Dynamics of B"])
+
+    def test_phrase(self):
+        self.queryString.addTitleQuery("vortex turbulence")
+        self.assertEqual(self.titles(), ["Space-time vortex dr"])
+
+    def test_phraseOrder(self):
+        self.queryString.addTitleQuery("turbulence vortex")
+        self.assertEqual(self.titles(), [])
+
+    def test_fieldAndConnector(self):
+        self.queryString.addTitleQuery("dynamics")
+        self.queryString.addTitleQuery("friction")
+        self.queryString.setFieldConnector("ti", "and")
+        self.assertEqual(self.titles(), ["Glassy Dynamics of B"])
+        self.queryString.addTitleQuery("vortex")
+        self.assertEqual(self.titles(), [])
+
+    def test_filteredFeedKeepsHeader(self):
+        self.queryString.addAuthorQuery("Sperl_M")
+        filteredFeed = EntryFilter(self.queryString).filterFeed(self.feed)
+        self.assertEqual(filteredFeed.feed, self.feed.feed)
+        self.assertEqual(len(self.feed.entries), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+import calendar
+import datetime
+import os
+from feedDownloader import *
+from queryString import *
+from entryFilter import *
+from entryStore import *
+from entryIndex import *
+
+
+class test_entryIndex(unittest.TestCase):
+    def setUp(self):
+        self.queryString = QueryString()
+        feedDL = FeedDownloader(r"notNecessary")
+        feedDL.loadFeed("./Tests/testFeed.pickle")
+        self.feed = feedDL.getFeed()
+        self.index = EntryIndex(self.feed.entries)
+
+    def tearDown(self):
+        self.queryString = None
+        self.feed = None
+        self.index = None
+
+    def assertSameAsFilter(self):
+        filtered = EntryFilter(self.queryString).filterFeed(self.feed)
+        self.assertEqual(
+            [entry.id for entry in self.index.getEntries(self.queryString)],
+            [entry.id for entry in filtered.entries])
+
+    def test_length(self):
+        self.assertEqual(len(self.index), 10)
+
+    def test_author(self):
+        self.queryString.addAuthorQuery("Sperl_M")
+        self.assertSameAsFilter()
+
+    def test_titleAndAbstract(self):
+        self.queryString.addTitleQuery("vortex")
+        self.queryString.addAbstractQuery("collagen")
+        self.assertSameAsFilter()
+
+    def test_phrase(self):
+        self.queryString.addTitleQuery("vortex turbulence")
+        self.assertSameAsFilter()
+        self.queryString = QueryString()
+        self.queryString.addTitleQuery("turbulence vortex")
+        self.assertEqual(self.index.getEntries(self.queryString), [])
+
+    def test_connectors(self):
+        self.queryString.addAuthorQuery("Sperl_M")
+        self.queryString.addTitleQuery("dynamics")
+        self.queryString.setConnector("and")
+        self.assertSameAsFilter()
+        self.queryString.addTitleQuery("friction")
+        self.queryString.setFieldConnector("ti", "and")
+        self.assertSameAsFilter()
+
+    def test_categories(self):
+        self.queryString.addCategory("cond-mat")
+        self.assertSameAsFilter()
+        self.queryString.addTitleQuery("dynamics")
+        self.assertSameAsFilter()
+
+    def test_date(self):
+        self.queryString.addCategory("cond-mat")
+        date = datetime.date(*self.feed.entries[3].updated_parsed[:3])
+        since = calendar.timegm(date.timetuple())
+        self.assertEqual(
+            [entry.id for entry in self.index.getEntries(self.queryString,
+                                                          date)],
+            [entry.id for entry
+             in EntryFilter(self.queryString).filterFeed(self.feed).entries
+             if calendar.timegm(entry.updated_parsed) >= since])
+        self.assertEqual(self.index.getEntries(
+            self.queryString, date + datetime.timedelta(days=1)), [])
+
+    def test_newerVersionReplaces(self):
+        newer = feedparser.FeedParserDict(self.feed.entries[5])
+        newer["id"] = newer.id[:-2] + "v9"
+        newer["title"] = "Something else entirely"
+        self.index.addEntries([newer])
+        self.assertEqual(len(self.index), 10)
+        self.queryString.addTitleQuery("glassy")
+        self.assertEqual(self.index.getEntries(self.queryString), [])
+        self.queryString.addTitleQuery("entirely")
+        self.assertEqual([entry.id for entry
+                          in self.index.getEntries(self.queryString)],
+                         [newer.id])
+
+    def test_olderVersionIgnored(self):
+        older = feedparser.FeedParserDict(self.feed.entries[5])
+        older["id"] = older.id[:-2] + "v0"
+        older["title"] = "Something else entirely"
+        self.index.addEntries([older])
+        self.queryString.addTitleQuery("entirely")
+        self.assertEqual(self.index.getEntries(self.queryString), [])
+
+    def test_getFeed(self):
+        self.queryString.addAuthorQuery("Sperl_M")
+        feed = self.index.getFeed(self.queryString)
+        self.assertEqual([entry.title[:20] for entry in feed.entries],
+                         ["Glassy Dynamics of B"])
+
+    def test_emptyQuery(self):
+        self.assertRaises(EmptyQueryException, self.index.getEntries,
+                          self.queryString)
+
+
+class test_entryIndexFromStore(unittest.TestCase):
+    fileName = "./testIndexEntries.sqlite"
+
+    def setUp(self):
+        self.store = EntryStore(self.fileName)
+        feedDL = FeedDownloader(r"notNecessary")
+        feedDL.loadFeed("./Tests/testFeed.pickle")
+        self.feed = feedDL.getFeed()
+        self.store.addEntries(self.feed.entries)
+
+    def tearDown(self):
+        self.store.close()
+        self.store = None
+        self.feed = None
+        if os.path.exists(self.fileName):
+            os.remove(self.fileName)
+
+    def test_fromStore(self):
+        index = EntryIndex.fromStore(self.store)
+        self.assertEqual(len(index), len(self.store))
+        queryString = QueryString()
+        queryString.addAuthorQuery("Sperl_M")
+        self.assertEqual([entry.title[:20]
+                          for entry in index.getEntries(queryString)],
+                         ["Glassy Dynamics of B"])
+
+
+if __name__ == "__main__":
+    unittest.main()
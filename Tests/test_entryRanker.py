@@ -0,0 +1,71 @@
+import unittest
+from feedDownloader import *
+from queryString import *
+from entryRanker import *
+
+
+class test_entryRanker(unittest.TestCase):
+    def setUp(self):
+        self.queryString = QueryString()
+        feedDL = FeedDownloader(r"notNecessary")
+        feedDL.loadFeed("./Tests/testFeed.pickle")
+        self.feed = feedDL.getFeed()
+        self.ranker = EntryRanker(self.feed.entries)
+
+    def tearDown(self):
+        self.queryString = None
+        self.feed = None
+        self.ranker = None
+
+    def titles(self, topK=None, entries=None):
+        return [entry.title[:20]
+                for entry in self.ranker.rank(self.queryString, entries,
+                                              topK)]
+
+    def test_length(self):
+        self.assertEqual(len(self.ranker), 10)
+
+    def test_noQueriesKeepsOrder(self):
+        self.queryString.addCategory("cond-mat")
+        self.assertEqual(self.ranker.score(self.queryString), [0.] * 10)
+        self.assertEqual([entry.id for entry
+                          in self.ranker.rank(self.queryString)],
+                         [entry.id for entry in self.feed.entries])
+
+    def test_titleKeyword(self):
+        self.queryString.addTitleQuery("vortex")
+        self.assertEqual(self.titles(topK=1), ["Space-time vortex dr"])
+
+    def test_titleBeforeAbstract(self):
+        self.queryString.addTitleQuery("collagen")
+        self.queryString.addAbstractQuery("vortex")
+        self.assertEqual(self.titles(topK=2), ["Uniform spatial dist",
+                                               "Space-time vortex dr"])
+
+    def test_author(self):
+        self.queryString.addAuthorQuery("Sperl_M")
+        self.queryString.addAbstractQuery("collagen")
+        scores = self.ranker.score(self.queryString)
+        self.assertEqual(scores[5], self.ranker.authorBonus)
+        self.assertEqual(sorted(self.titles(topK=2)),
+                         ["Glassy Dynamics of B", "Uniform spatial dist"])
+
+    def test_moreMatchesRankHigher(self):
+        self.queryString.addTitleQuery("dynamics")
+        self.queryString.addTitleQuery("glassy")
+        self.assertEqual(self.titles(topK=2), ["Glassy Dynamics of B",
+                                               "Topological attribut"])
+
+    def test_subsetOfEntries(self):
+        self.queryString.addTitleQuery("vortex")
+        self.assertEqual(self.titles(entries=self.feed.entries[4:6]),
+                         ["Inner jet kinematics", "Glassy Dynamics of B"])
+
+    def test_topK(self):
+        self.queryString.addTitleQuery("vortex")
+        self.assertEqual(len(self.titles(topK=3)), 3)
+        self.assertEqual(len(self.titles(topK=20)), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import datetime
+import os
+import re
+import time
+import queryString as qS
+from feedDownloader import *
+from textComposer import *
+from entryStore import *
+from feedServer import FeedServer
+from arXivQuerPy import arXivQuerPy
+
+
+class test_entryStore(unittest.TestCase):
+    fileName = "./testEntries.sqlite"
+
+    def setUp(self):
+        self.store = EntryStore(self.fileName)
+        feedDL = FeedDownloader(r"notNecessary")
+        feedDL.loadFeed("./Tests/testFeed.pickle")
+        self.feed = feedDL.getFeed()
+
+    def tearDown(self):
+        self.store.close()
+        self.store = None
+        self.feed = None
+        if os.path.exists(self.fileName):
+            os.remove(self.fileName)
+
+    def test_emptyStore(self):
+        self.assertEqual(len(self.store), 0)
+        self.assertEqual(self.store.getEntries(), [])
+
+    def test_addEntries(self):
+        self.store.addEntries(self.feed.entries)
+        self.assertEqual(len(self.store), 10)
+
+    def test_addEntriesTwice(self):
+        self.store.addEntries(self.feed.entries)
+        self.store.addEntries(self.feed.entries)
+        self.assertEqual(len(self.store), 10)
+
+    def test_persistence(self):
+        self.store.addEntries(self.feed.entries)
+        self.store.close()
+        self.store = EntryStore(self.fileName)
+        self.assertEqual(len(self.store), 10)
+
+    def test_newerVersionReplaces(self):
+        entry = feedparser.FeedParserDict(self.feed.entries[0])
+        entry["id"] = entry.id.replace("v1", "v2")
+        entry["updated_parsed"] = time.gmtime(time.time())
+        self.store.addEntries([entry])
+        self.store.addEntries(self.feed.entries)
+        self.assertEqual(len(self.store), 10)
+        self.assertEqual(self.store.getEntries()[0].id, entry.id)
+
+    def test_getEntriesSince(self):
+        self.store.addEntries(self.feed.entries)
+        self.assertEqual(
+            len(self.store.getEntries(datetime.date(2016, 8, 10))), 10)
+        self.assertEqual(self.store.getEntries(datetime.date(2016, 8, 11)), [])
+
+    def test_composeFromStore(self):
+        self.store.addEntries(self.feed.entries)
+        fromFeed = TextComposer()
+        fromFeed.addFeed(self.feed)
+        fromStore = TextComposer()
+        fromStore.addFeed(self.store.getFeed())
+        self.assertEqual(fromStore.getText(), fromFeed.getText())
+
+    def test_sync(self):
+        queryKey = "http://export.arxiv.org/api/query?search_query=%28cat:x%29"
+        self.assertEqual(self.store.getSync(queryKey), None)
+        self.store.setSync(queryKey, datetime.date(2016, 8, 1), 12.)
+        self.assertEqual(self.store.getSync(queryKey),
+                         (datetime.date(2016, 8, 1), 12.))
+        self.store.setSync(queryKey, None, 13.)
+        self.assertEqual(self.store.getSync(queryKey), (None, 13.))
+
+
+class test_syncStore(unittest.TestCase):
+    fileName = "./testEntries.sqlite"
+
+    def setUp(self):
+        self.store = EntryStore(self.fileName)
+        self.limiter = rateLimiter
+        setRateLimiter(None)
+        self.server = FeedServer(gzip=False).__enter__()
+        # all results of the date window fit on one page
+        self.server.body = re.sub(b"(<opensearch:totalResults[^>]*>)\\d+",
+                                  b"\\g<1>10", self.server.body)
+        self.baseUrl = qS.QueryString.baseUrl
+        qS.QueryString.baseUrl = self.server.url("/api/query?")
+
+    def tearDown(self):
+        qS.QueryString.baseUrl = self.baseUrl
+        setRateLimiter(self.limiter)
+        self.server.__exit__()
+        self.server = None
+        self.store.close()
+        self.store = None
+        if os.path.exists(self.fileName):
+            os.remove(self.fileName)
+
+    def sync(self, date):
+        querPy = arXivQuerPy("Hi\n", date)
+        querPy.addCategory("cond-mat")
+        querPy.syncStore(self.store)
+        return self.store.getSync(querPy.query.getQueryKey())
+
+    def test_windowCompletesBackToItsStart(self):
+        self.assertEqual(self.sync(datetime.date(2016, 8, 10))[0],
+                         datetime.date(2016, 8, 10))
+
+    def test_widerLookBack(self):
+        self.sync(datetime.date(2016, 8, 10))
+        self.assertEqual(self.sync(datetime.date(2016, 8, 1))[0],
+                         datetime.date(2016, 8, 1))
+        self.assertTrue("lastUpdatedDate:%5B201608010000+TO+"
+                        in self.server.requests[-1][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
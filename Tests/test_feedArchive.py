@@ -0,0 +1,84 @@
+import os
+import unittest
+import feedEntry as fE
+import textComposer as tC
+from feedDownloader import *
+from feedArchive import *
+
+
+class test_feedArchive(unittest.TestCase):
+    def setUp(self):
+        self.fileName = "./feed.archive"
+        feedDL = FeedDownloader(r"notNecessary")
+        feedDL.loadFeed("./Tests/testFeed.pickle")
+        self.feed = feedDL.getFeed()
+
+    def tearDown(self):
+        self.feed = None
+        for fileName in (self.fileName, "./feed.uncompressed"):
+            if os.path.exists(fileName):
+                os.remove(fileName)
+
+    def test_isFeedArchive(self):
+        saveFeed(self.feed, self.fileName)
+        self.assertTrue(isFeedArchive(self.fileName))
+        self.assertFalse(isFeedArchive("./Tests/testFeed.pickle"))
+
+    def test_entries(self):
+        saveFeed(self.feed, self.fileName)
+        feed = loadFeed(self.fileName)
+        self.assertEqual(feed.entries,
+                         [fE.toEntry(entry) for entry in self.feed.entries])
+
+    def test_header(self):
+        saveFeed(self.feed, self.fileName)
+        feed = loadFeed(self.fileName)
+        self.assertEqual(feed.feed, self.feed.feed)
+        self.assertEqual(feed.feed.updated_parsed,
+                         self.feed.feed.updated_parsed)
+        self.assertEqual(tC.isLastPage(feed), tC.isLastPage(self.feed))
+
+    def test_uncompressed(self):
+        saveFeed(self.feed, self.fileName)
+        saveFeed(self.feed, "./feed.uncompressed", compress=False)
+        self.assertLess(os.path.getsize(self.fileName),
+                        os.path.getsize("./feed.uncompressed"))
+        self.assertEqual(loadFeed("./feed.uncompressed").entries,
+                         loadFeed(self.fileName).entries)
+
+    def test_emptyFeed(self):
+        feedDL = FeedDownloader(r"notNecessary")
+        feedDL.loadFeed("./Tests/testFeedEmpty.pickle")
+        saveFeed(feedDL.getFeed(), self.fileName)
+        self.assertEqual(len(loadFeed(self.fileName).entries), 0)
+
+    def test_column(self):
+        saveFeed(self.feed, self.fileName)
+        with FeedArchive(self.fileName) as archive:
+            self.assertEqual(len(archive), 10)
+            self.assertEqual(archive.getColumn("id"),
+                             [entry.id for entry in self.feed.entries])
+            self.assertEqual(list(archive.columns.keys()), ["id"])
+            with self.assertRaises(KeyError):
+                archive.getColumn("comment")
+
+    def test_notAnArchive(self):
+        with self.assertRaises(NotAFeedArchiveException):
+            FeedArchive("./Tests/testFeed.pickle")
+        open(self.fileName, "wb").close()
+        with self.assertRaises(NotAFeedArchiveException):
+            FeedArchive(self.fileName)
+
+    def test_feedDownloader(self):
+        feedDL = FeedDownloader(r"notNecessary")
+        feedDL.feed = self.feed
+        feedDL.saveFeed(self.fileName)
+        self.assertTrue(isFeedArchive(self.fileName))
+        newFeedDL = FeedDownloader(r"notNecessary")
+        newFeedDL.loadFeed(self.fileName)
+        self.assertEqual(newFeedDL.getFeed().entries,
+                         [fE.toEntry(entry) for entry in self.feed.entries])
+
+
+if __name__ == "__main__":
+    unittest.main()
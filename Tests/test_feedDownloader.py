@@ -1,4 +1,5 @@
 import unittest
+import datetime
 import os
 from feedDownloader import *
 from queryString import *
@@ -10,8 +11,8 @@ class test_feedDownloader(unittest.TestCase):
 
     def tearDown(self):
         self.feedDownloader = None
-        if os.path.exists("./feed.pickle"):
-            os.remove("./feed.pickle")
+        if os.path.exists("./feed.archive"):
+            os.remove("./feed.archive")
 
 
 class test_queryStringManipulationAndEmptyFeed(test_feedDownloader):
@@ -40,6 +41,47 @@ class test_queryStringManipulationAndEmptyFeed(test_feedDownloader):
         self.assertEqual(len(feed.entries), 10)
 
 
+class test_feedPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.url = "file://" + os.path.abspath("./Tests/testFeed.xml")
+        self.prefetcher = FeedPrefetcher(2)
+
+    def tearDown(self):
+        self.prefetcher.close()
+        self.prefetcher = None
+
+    def test_downloadFeed(self):
+        feed = downloadFeed(self.url)
+        self.assertEqual(len(feed.entries), 10)
+        self.assertEqual(feed.entries[0].link,
+                         "http://arxiv.org/abs/1608.03248v1")
+
+    def test_downloadFeedStopDate(self):
+        feed = downloadFeed(self.url, datetime.date(2016, 8, 11))
+        self.assertEqual(len(feed.entries), 1)
+
+    def test_prefetchedFeed(self):
+        self.prefetcher.prefetch([self.url])
+        self.assertTrue(self.url in self.prefetcher.pending)
+        feed = self.prefetcher.getFeed(self.url)
+        self.assertEqual(len(feed.entries), 10)
+        self.assertFalse(self.url in self.prefetcher.pending)
+
+    def test_getFeedWithoutPrefetch(self):
+        self.assertEqual(len(self.prefetcher.getFeed(self.url).entries), 10)
+
+    def test_cancel(self):
+        self.prefetcher.prefetch([self.url, self.url + "?page=2"])
+        self.prefetcher.cancel()
+        self.assertEqual(len(self.prefetcher.pending), 0)
+
+    def test_feedDownloaderWithPrefetcher(self):
+        feedDownloader = FeedDownloader(self.url, self.prefetcher)
+        feedDownloader.prefetch([self.url])
+        feedDownloader.updateFeed()
+        self.assertEqual(len(feedDownloader.getFeed().entries), 10)
+
+
 class test_feedDownload(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -86,8 +128,8 @@ class test_feedDownload(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         cls.feedDownloader = None
-        if os.path.exists("./feed.pickle"):
-            os.remove("./feed.pickle")
+        if os.path.exists("./feed.archive"):
+            os.remove("./feed.archive")
 
 
 if __name__ == "__main__":
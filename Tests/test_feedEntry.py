@@ -0,0 +1,66 @@
+import unittest
+import pickle
+from feedDownloader import *
+from feedEntry import *
+
+
+class test_entry(unittest.TestCase):
+    def setUp(self):
+        feedDL = FeedDownloader(r"notNecessary")
+        feedDL.loadFeed("./Tests/testFeed.pickle")
+        self.feedEntry = feedDL.getFeed().entries[1]
+        self.entry = Entry.fromFeedParserDict(self.feedEntry)
+
+    def tearDown(self):
+        self.feedEntry = None
+        self.entry = None
+
+    def test_fromFeedParserDict(self):
+        self.assertEqual(self.entry.id, self.feedEntry.id)
+        self.assertEqual(self.entry.title, self.feedEntry.title)
+        self.assertEqual(self.entry.authors,
+                         (u"Carsten Allefeld", u"Kai G\xf6rgen",
+                          u"John-Dylan Haynes"))
+        self.assertEqual(self.entry.link, self.feedEntry.link)
+        self.assertEqual(self.entry.summary, self.feedEntry.summary)
+        self.assertEqual(self.entry.updated_parsed,
+                         self.feedEntry.updated_parsed)
+        self.assertEqual(self.entry.categories, ("q-bio.NC", "stat.AP"))
+
+    def test_roundTrip(self):
+        self.assertEqual(
+            Entry.fromFeedParserDict(self.entry.toFeedParserDict()),
+            self.entry)
+
+    def test_noInstanceDict(self):
+        self.assertFalse(hasattr(self.entry, "__dict__"))
+
+    def test_pickle(self):
+        self.assertEqual(pickle.loads(pickle.dumps(self.entry)), self.entry)
+
+    def test_toEntry(self):
+        self.assertTrue(toEntry(self.entry) is self.entry)
+        self.assertEqual(toEntry(self.feedEntry), self.entry)
+
+    def test_notEqual(self):
+        other = Entry.fromFeedParserDict(self.feedEntry)
+        other.title = u"Other"
+        self.assertNotEqual(other, self.entry)
+
+
+class test_splitArxivId(unittest.TestCase):
+    def test_newStyleId(self):
+        self.assertEqual(splitArxivId("http://arxiv.org/abs/1608.03248v2"),
+                         ("1608.03248", 2))
+
+    def test_oldStyleId(self):
+        self.assertEqual(
+            splitArxivId("http://arxiv.org/abs/cond-mat/0601001v1"),
+            ("cond-mat/0601001", 1))
+
+    def test_noVersion(self):
+        self.assertEqual(splitArxivId("1608.03248"), ("1608.03248", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
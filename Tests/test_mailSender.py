@@ -1,13 +1,162 @@
 import unittest
+import os
+import shutil
 import smtplib
 from mailSender import *
 
 
+class FakeSMTP():
+    """Stand-in for smtplib.SMTP recording connections and messages"""
+    connections = []
+    refuseConnections = 0
+    refuseRecipients = False
+
+    def __init__(self, address):
+        if FakeSMTP.refuseConnections > 0:
+            FakeSMTP.refuseConnections -= 1
+            raise smtplib.SMTPConnectError(421, "busy")
+        self.address = address
+        self.messages = []
+        self.closed = False
+        self.failNext = False
+        FakeSMTP.connections.append(self)
+
+    def login(self, user, password):
+        self.user = user
+
+    def sendmail(self, mailFrom, to, message):
+        if self.failNext:
+            raise smtplib.SMTPServerDisconnected
+        if FakeSMTP.refuseRecipients:
+            raise smtplib.SMTPRecipientsRefused(
+                dict((address, (550, "unknown")) for address in to))
+        self.messages.append((mailFrom, to, message))
+
+    def quit(self):
+        self.closed = True
+
+
 class test_mailSender(unittest.TestCase):
     def test_invalidEmail(self):
         with self.assertRaises(smtplib.SMTPRecipientsRefused):
             sendMail("Test", "asdf")
 
 
+class test_composeMail(unittest.TestCase):
+    def test_singleAddress(self):
+        msg, to = composeMail("Test", "a@b.de")
+        self.assertEqual(to, ["a@b.de"])
+        self.assertEqual(msg["To"], "a@b.de")
+        self.assertEqual(msg["Subject"], "arXive update")
+
+    def test_addressList(self):
+        msg, to = composeMail("Test", ["a@b.de", "c@d.de"])
+        self.assertEqual(to, ["a@b.de", "c@d.de"])
+        self.assertEqual(msg["To"], "a@b.de,c@d.de")
+
+    def test_emptyAddress(self):
+        with self.assertRaises(InvalidEmailAddress):
+            composeMail("Test", "")
+
+
+class test_mailSession(unittest.TestCase):
+    def setUp(self):
+        FakeSMTP.connections = []
+        self.session = MailSession("localhost:25", 2, smtpClass=FakeSMTP)
+
+    def tearDown(self):
+        self.session.close()
+        self.session = None
+
+    def test_reuseConnection(self):
+        self.session.send("Test", "a@b.de")
+        self.session.send("Test", "c@d.de")
+        self.assertEqual(len(FakeSMTP.connections), 1)
+        self.assertEqual(len(FakeSMTP.connections[0].messages), 2)
+
+    def test_maxMessagesPerConnection(self):
+        for i in range(5):
+            self.session.send("Test", "a@b.de")
+        self.assertEqual(len(FakeSMTP.connections), 3)
+        self.assertTrue(FakeSMTP.connections[0].closed)
+        self.assertEqual([len(c.messages) for c in FakeSMTP.connections],
+                         [2, 2, 1])
+
+    def test_reconnectOnFailure(self):
+        self.session.send("Test", "a@b.de")
+        FakeSMTP.connections[0].failNext = True
+        self.session.send("Test", "c@d.de")
+        self.assertEqual(len(FakeSMTP.connections), 2)
+        self.assertEqual(FakeSMTP.connections[1].messages[0][1], ["c@d.de"])
+
+    def test_login(self):
+        session = MailSession("localhost:25", user="me", password="pw",
+                              smtpClass=FakeSMTP)
+        session.send("Test", "a@b.de")
+        self.assertEqual(FakeSMTP.connections[0].user, "me")
+        session.close()
+
+    def test_closeQuits(self):
+        self.session.send("Test", "a@b.de")
+        self.session.close()
+        self.assertTrue(FakeSMTP.connections[0].closed)
+        self.assertEqual(self.session.connection, None)
+
+
+class test_deliveryQueue(unittest.TestCase):
+    spoolDirectory = "./testSpool"
+
+    def setUp(self):
+        FakeSMTP.connections = []
+        FakeSMTP.refuseConnections = 0
+        FakeSMTP.refuseRecipients = False
+        self.queue = DeliveryQueue("localhost:25", maxConnections=2,
+                                   maxRetries=2, backoff=0.,
+                                   spoolDirectory=self.spoolDirectory,
+                                   smtpClass=FakeSMTP)
+
+    def tearDown(self):
+        self.queue.close()
+        self.queue = None
+        if os.path.exists(self.spoolDirectory):
+            shutil.rmtree(self.spoolDirectory)
+
+    def numSent(self):
+        return sum(len(c.messages) for c in FakeSMTP.connections)
+
+    def test_deliverAll(self):
+        for i in range(10):
+            self.queue.send("Test {0:d}".format(i), "a@b.de")
+        self.assertEqual(self.queue.join(), 0)
+        self.assertEqual(self.numSent(), 10)
+        self.assertTrue(len(FakeSMTP.connections) <= 2)
+
+    def test_invalidAddressRaisesImmediately(self):
+        with self.assertRaises(InvalidEmailAddress):
+            self.queue.send("Test", "")
+
+    def test_retry(self):
+        FakeSMTP.refuseConnections = 2
+        self.assertTrue(self.queue.send("Test", "a@b.de").result())
+        self.assertEqual(self.numSent(), 1)
+
+    def test_spoolAndResend(self):
+        FakeSMTP.refuseConnections = 3
+        self.assertFalse(self.queue.send("Test", "a@b.de").result())
+        self.assertEqual(self.queue.join(), 1)
+        self.assertEqual(len(os.listdir(self.spoolDirectory)), 1)
+        futures = self.queue.resendSpool()
+        self.assertEqual([future.result() for future in futures], [True])
+        self.assertEqual(os.listdir(self.spoolDirectory), [])
+        self.assertEqual(FakeSMTP.connections[0].messages[0][1], ["a@b.de"])
+
+    def test_refusedIsNotSpooled(self):
+        FakeSMTP.refuseRecipients = True
+        self.assertFalse(self.queue.send("Test", "a@b.de").result())
+        self.assertEqual(self.queue.join(), 1)
+        self.assertFalse(os.path.exists(self.spoolDirectory))
+        self.assertEqual(self.queue.resendSpool(), [])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import datetime
+import json
+import os
+import pstats
+import feedDownloader as fD
+import metrics as mT
+from metrics import *
+from feedServer import FeedServer
+
+
+class test_metrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics()
+        self.fileName = "./testMetrics.out"
+
+    def tearDown(self):
+        self.metrics = None
+        if os.path.exists(self.fileName):
+            os.remove(self.fileName)
+
+    def test_counters(self):
+        self.metrics.count("requests")
+        self.metrics.count("requests")
+        self.metrics.count("bytes", 100)
+        self.assertEqual(self.metrics.summary()["counters"],
+                         {"requests": 2, "bytes": 100})
+
+    def test_timers(self):
+        with self.metrics.timer("parse"):
+            pass
+        self.metrics.addTime("parse", 1.)
+        timer = self.metrics.summary()["timers"]["parse"]
+        self.assertEqual(timer["calls"], 2)
+        self.assertTrue(timer["seconds"] >= 1.)
+
+    def test_timerWithException(self):
+        with self.assertRaises(ValueError):
+            with self.metrics.timer("parse"):
+                raise ValueError
+        self.assertEqual(self.metrics.summary()["timers"]["parse"]["calls"],
+                         1)
+
+    def test_writeJson(self):
+        self.metrics.count("pages", 3)
+        self.metrics.writeJson(self.fileName)
+        with open(self.fileName) as f:
+            summary = json.load(f)
+        self.assertEqual(summary["counters"], {"pages": 3})
+        self.assertEqual(summary["timers"], {})
+
+    def test_writePrometheus(self):
+        self.metrics.count("entriesParsed", 10)
+        self.metrics.addTime("smtp", 0.5)
+        self.metrics.writePrometheus(self.fileName)
+        with open(self.fileName) as f:
+            lines = f.read().splitlines()
+        self.assertTrue("# TYPE arxivquerpy_entries_parsed gauge" in lines)
+        self.assertTrue("arxivquerpy_entries_parsed 10" in lines)
+        self.assertTrue("# TYPE arxivquerpy_smtp_seconds gauge" in lines)
+        self.assertTrue("arxivquerpy_smtp_seconds 0.5" in lines)
+        self.assertTrue("arxivquerpy_smtp_calls 1" in lines)
+        self.assertFalse(os.path.exists(self.fileName + ".tmp"))
+
+    def test_profiled(self):
+        with profiled(self.fileName):
+            sum(range(1000))
+        self.assertTrue(len(pstats.Stats(self.fileName).stats) > 0)
+
+    def test_notProfiled(self):
+        with profiled(None):
+            pass
+        self.assertFalse(os.path.exists(self.fileName))
+
+
+class test_downloadMetrics(unittest.TestCase):
+    def setUp(self):
+        self.server = FeedServer(gzip=False).__enter__()
+        self.limiter = fD.rateLimiter
+        fD.setRateLimiter(None)
+        self.metrics = mT.metrics
+        setMetrics(Metrics())
+
+    def tearDown(self):
+        self.server.__exit__()
+        fD.setRateLimiter(self.limiter)
+        setMetrics(self.metrics)
+
+    def test_download(self):
+        feed = fD.downloadFeed(self.server.url())
+        summary = mT.metrics.summary()
+        self.assertEqual(summary["counters"]["requests"], 1)
+        self.assertEqual(summary["counters"]["pages"], 1)
+        self.assertEqual(summary["counters"]["bytes"], self.server.bytesSent)
+        self.assertEqual(summary["counters"]["entriesParsed"],
+                         len(feed.entries))
+        self.assertEqual(summary["timers"]["parse"]["calls"], 1)
+        self.assertEqual(summary["timers"]["http"]["calls"], 1)
+
+    def test_compressedDownload(self):
+        self.server.gzip = True
+        fD.downloadFeed(self.server.url())
+        summary = mT.metrics.summary()
+        self.assertEqual(summary["counters"]["bytes"], self.server.bytesSent)
+        self.assertTrue(self.server.bytesSent < len(self.server.body))
+
+    def test_streamingDownload(self):
+        fD.downloadFeed(self.server.url(), datetime.date(2016, 8, 11))
+        summary = mT.metrics.summary()
+        self.assertEqual(summary["timers"]["http"]["calls"], 1)
+        self.assertEqual(summary["timers"]["parse"]["calls"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
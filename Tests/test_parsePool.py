@@ -0,0 +1,95 @@
+import unittest
+import datetime
+import feedDownloader as fD
+import rateLimiter as rL
+from parsePool import *
+from feedServer import FeedServer
+
+
+class test_parsePool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open("./Tests/testFeed.xml", "rb") as f:
+            cls.body = f.read()
+        cls.pool = ParsePool(maxWorkers=2, minBytes=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_records(self):
+        feed = toFeed(parseRecords(self.body))
+        expected = fD.parseBody(self.body)
+        self.assertEqual(feed.entries, expected.entries)
+        self.assertEqual(feed.feed.opensearch_totalresults,
+                         expected.feed.opensearch_totalresults)
+        self.assertEqual(feed.bozo, expected.bozo)
+
+    def test_plainRecords(self):
+        values, header, entries = parseRecords(self.body)
+        self.assertFalse("links" in header)
+        self.assertEqual(header["opensearch_startindex"], "0")
+        self.assertEqual(type(entries[0]), tuple)
+
+    def test_submitFeed(self):
+        feed = self.pool.submitFeed(self.body).result()
+        self.assertEqual(feed.entries, fD.parseBody(self.body).entries)
+
+    def test_parse(self):
+        feed = self.pool.parse(self.body)
+        self.assertEqual(feed.entries, fD.parseBody(self.body).entries)
+        self.assertEqual(feed.entries[0].link,
+                         "http://arxiv.org/abs/1608.03248v1")
+
+    def test_stopDate(self):
+        feed = self.pool.parse(self.body, datetime.date(2016, 8, 11))
+        self.assertEqual(len(feed.entries), 1)
+
+    def test_smallFeedsInline(self):
+        pool = ParsePool(maxWorkers=1, minBytes=len(self.body) + 1)
+        try:
+            self.assertFalse(pool.usesWorkers(self.body))
+            self.assertEqual(len(pool.parse(self.body).entries), 10)
+        finally:
+            pool.close()
+
+
+class test_downloadWithParsePool(unittest.TestCase):
+    def setUp(self):
+        self.limiter = fD.rateLimiter
+        fD.setRateLimiter(rL.RateLimiter(interval=0.))
+        fD.setParsePool(ParsePool(maxWorkers=1, minBytes=0))
+        self.server = FeedServer().__enter__()
+
+    def tearDown(self):
+        fD.parsePool.close()
+        fD.setParsePool(None)
+        fD.setRateLimiter(self.limiter)
+        self.server.__exit__()
+        self.server = None
+
+    def test_downloadFeed(self):
+        feed = fD.downloadFeed(self.server.url())
+        self.assertEqual(len(feed.entries), 10)
+        self.assertEqual(feed.entries[0].link,
+                         "http://arxiv.org/abs/1608.03248v1")
+
+    def test_requestDoesNotWait(self):
+        pending = fD.requestFeed(self.server.url())
+        self.assertTrue(isinstance(pending, fD.PendingFeed))
+        self.assertEqual(len(fD.resolveFeed(pending).entries), 10)
+
+    def test_prefetch(self):
+        with fD.FeedPrefetcher(maxWorkers=1) as prefetcher:
+            prefetcher.prefetch([self.server.url("/first"),
+                                 self.server.url("/second")])
+            self.assertEqual(
+                len(prefetcher.getFeed(self.server.url("/first")).entries),
+                10)
+            self.assertEqual(
+                len(prefetcher.getFeed(self.server.url("/second")).entries),
+                10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import datetime
 import unittest
 from queryString import *
 
@@ -243,6 +244,14 @@ class test_queryStringProduction(test_queryString):
                          r"search_query=%28%28ti:Awesome+OR+ti:Stuff%29%29"
                          r"&sortBy=lastUpdatedDate&start=0&max_results=10")
 
+    def test_onlyCategories(self):
+        self.queryString.addCategory("cond-mat")
+        self.queryString.addCategory("cond-mat.soft")
+        self.assertEqual(str(self.queryString),
+                         r"http://export.arxiv.org/api/query?"
+                         r"search_query=%28cat:cond-mat+OR+cat:cond-mat.soft"
+                         r"%29&sortBy=lastUpdatedDate&start=0&max_results=10")
+
     def test_AuthorsTitlesAbstractsWithCategory(self):
         self.queryString.addAuthorQuery("Testfrau_T")
         self.queryString.addAuthorQuery("Mustermann_M")
@@ -348,5 +357,208 @@ class test_queryStringConstructor(unittest.TestCase):
                          r"&sortBy=lastUpdatedDate&start=0&max_results=10")
 
 
+class test_shard(test_queryString):
+    def setUp(self):
+        self.queryString = QueryString()
+        self.queryString.addCategory("cond-mat")
+        self.authors = ["Author_{0:d}".format(i) for i in range(30)]
+        for author in self.authors:
+            self.queryString.addAuthorQuery(author)
+        self.queryString.addTitleQuery("Awesome")
+        self.queryString.addAbstractQuery("Stuff")
+
+    def test_withinBudget(self):
+        shards = self.queryString.shard()
+        self.assertEqual(len(shards), 1)
+        self.assertEqual(str(shards[0]), str(self.queryString))
+
+    def test_termBudgetOr(self):
+        self.queryString.setShardBudget(maxTerms=10)
+        shards = self.queryString.shard()
+        self.assertEqual(len(shards), 4)
+        for shard in shards:
+            self.assertTrue(len(shard.getAllAuthorQueries())
+                            + len(shard.getAllTitleQueries())
+                            + len(shard.getAllAbstractQueries()) <= 10)
+            self.assertEqual(shard.getAllCategories(), ["cond-mat"])
+        self.assertEqual(sum([shard.getAllAuthorQueries()
+                              for shard in shards], []), self.authors)
+        self.assertEqual(sum([shard.getAllTitleQueries()
+                              for shard in shards], []), ["Awesome"])
+
+    def test_termBudgetAnd(self):
+        self.queryString.setConnector("and")
+        self.queryString.setShardBudget(maxTerms=12)
+        shards = self.queryString.shard()
+        self.assertEqual(len(shards), 3)
+        for shard in shards:
+            self.assertEqual(len(shard.getAllAuthorQueries()), 10)
+            self.assertEqual(shard.getAllTitleQueries(), ["Awesome"])
+            self.assertEqual(shard.getAllAbstractQueries(), ["Stuff"])
+
+    def test_urlLengthBudget(self):
+        self.queryString.setShardBudget(maxUrlLength=300)
+        shards = self.queryString.shard()
+        self.assertTrue(len(shards) > 1)
+        for shard in shards:
+            self.assertTrue(len(str(shard)) <= 300)
+
+    def test_unsplittable(self):
+        self.queryString.setShardBudget(maxUrlLength=10)
+        self.assertEqual(len(self.queryString.shard()), 32)
+
+    def test_onlyCategories(self):
+        self.queryString = QueryString()
+        self.queryString.addCategory("cond-mat")
+        self.queryString.setShardBudget(maxTerms=0)
+        self.assertEqual(len(self.queryString.shard()), 1)
+
+    def test_empty(self):
+        self.assertRaises(EmptyQueryException, QueryString().shard)
+
+
+class test_encoding(test_queryString):
+    def test_phrase(self):
+        self.queryString.addTitleQuery("active  matter")
+        self.assertEqual(self.queryString.getQueryKey(),
+                         r"http://export.arxiv.org/api/query?search_query="
+                         r"%28%28ti:%22active+matter%22%29%29")
+
+    def test_quotedPhrase(self):
+        self.queryString.addTitleQuery('"glass"')
+        self.assertEqual(self.queryString.getQueryKey(),
+                         r"http://export.arxiv.org/api/query?search_query="
+                         r"%28%28ti:%22glass%22%29%29")
+
+    def test_specialCharacters(self):
+        self.queryString.addAuthorQuery(u"M\u00fcller_M")
+        self.queryString.addAbstractQuery("a&b:c")
+        self.assertEqual(self.queryString.getQueryKey(),
+                         r"http://export.arxiv.org/api/query?search_query="
+                         r"%28%28au:M%C3%BCller_M%29+OR+%28abs:a%26b%3Ac%29%29")
+
+    def test_fieldConnector(self):
+        self.queryString.addTitleQuery("active")
+        self.queryString.addTitleQuery("matter")
+        self.queryString.addAbstractQuery("glass")
+        self.queryString.setFieldConnector("ti", "and")
+        self.assertEqual(self.queryString.getFieldConnector("ti"), "and")
+        self.assertEqual(self.queryString.getQueryKey(),
+                         r"http://export.arxiv.org/api/query?search_query="
+                         r"%28%28%28ti:active+AND+ti:matter%29+OR+"
+                         r"abs:glass%29%29")
+
+    def test_invalidFieldConnector(self):
+        with self.assertRaises(InvalidFieldException):
+            self.queryString.setFieldConnector("cat", "and")
+        with self.assertRaises(InvalidConnectorException):
+            self.queryString.setFieldConnector("ti", "xor")
+        with self.assertRaises(InvalidFieldException):
+            self.queryString.getFieldConnector("cat")
+
+    def test_shardKeepsAndConnectedField(self):
+        for title in ["a", "b", "c"]:
+            self.queryString.addTitleQuery(title)
+        self.queryString.addAbstractQuery("d")
+        self.queryString.setFieldConnector("ti", "and")
+        self.queryString.setShardBudget(maxTerms=1)
+        shards = self.queryString.shard()
+        self.assertEqual([shard.getAllTitleQueries() for shard in shards],
+                         [["a", "b", "c"], []])
+
+
+class test_cachedQuery(test_queryString):
+    def setUp(self):
+        self.queryString = QueryString()
+        self.queryString.addAuthorQuery("Author")
+        self.queryString.addCategory("cond-mat")
+
+    def test_paging(self):
+        key = self.queryString.getQueryKey()
+        self.queryString.nextNumberOfResults(20)
+        self.assertEqual(self.queryString.getQueryKey(), key)
+        self.assertEqual(str(self.queryString), key
+                         + r"&sortBy=lastUpdatedDate&start=10&max_results=20")
+
+    def test_invalidatedByAdd(self):
+        str(self.queryString)
+        self.queryString.addTitleQuery("Awesome")
+        self.assertTrue("ti:Awesome" in str(self.queryString))
+
+    def test_invalidatedByRemove(self):
+        str(self.queryString)
+        self.queryString.removeAuthorQuery("Author")
+        self.assertFalse("au:Author" in str(self.queryString))
+        self.queryString.removeCategory("cond-mat")
+        self.assertRaises(EmptyQueryException, str, self.queryString)
+
+    def test_invalidatedByConnector(self):
+        self.queryString.addTitleQuery("Awesome")
+        str(self.queryString)
+        self.queryString.setConnector("and")
+        self.assertTrue(r"%29+AND+%28ti:Awesome" in str(self.queryString))
+
+    def test_insertionOrder(self):
+        for author in ["C", "A", "B", "A"]:
+            self.queryString.addAuthorQuery(author)
+        self.assertEqual(self.queryString.getAllAuthorQueries(),
+                         ["Author", "C", "A", "B"])
+
+
+class test_dateWindow(test_queryString):
+    def setUp(self):
+        self.queryString = QueryString()
+        self.queryString.addCategory("cond-mat")
+
+    def test_window(self):
+        key = self.queryString.getQueryKey()
+        self.queryString.setDateWindow(datetime.date(2016, 8, 10),
+                                       datetime.date(2016, 8, 11))
+        self.assertEqual(self.queryString.getQueryKey(), key)
+        self.assertEqual(str(self.queryString), key
+                         + r"+AND+lastUpdatedDate:%5B201608100000+TO+"
+                           r"201608112359%5D"
+                         + r"&sortBy=lastUpdatedDate&start=0&max_results=10")
+
+    def test_submittedDate(self):
+        self.queryString.setDateWindow(datetime.date(2016, 8, 10),
+                                       datetime.date(2016, 8, 10),
+                                       "submittedDate")
+        self.assertTrue(r"+AND+submittedDate:%5B201608100000+TO+"
+                        r"201608102359%5D&" in str(self.queryString))
+
+    def test_openEnds(self):
+        self.queryString.setDateWindow(until=datetime.date(2016, 8, 11))
+        self.assertTrue(r"%5B000000000000+TO+201608112359%5D"
+                        in str(self.queryString))
+        self.queryString.setDateWindow(datetime.date(2016, 8, 10))
+        tomorrow = (datetime.datetime.utcnow().date()
+                    + datetime.timedelta(days=1))
+        self.assertTrue(r"%5B201608100000+TO+" + tomorrow.strftime("%Y%m%d")
+                        in str(self.queryString))
+
+    def test_removeWindow(self):
+        self.queryString.setDateWindow(datetime.date(2016, 8, 10))
+        self.queryString.setDateWindow()
+        self.assertIsNone(self.queryString.getDateWindow())
+        self.assertFalse("lastUpdatedDate:" in str(self.queryString))
+
+    def test_invalidField(self):
+        with self.assertRaises(InvalidFieldException):
+            self.queryString.setDateWindow(datetime.date(2016, 8, 10),
+                                           field="published")
+
+    def test_shardsKeepWindow(self):
+        self.queryString.setDateWindow(datetime.date(2016, 8, 10))
+        self.queryString.setShardBudget(maxTerms=1)
+        self.queryString.addAuthorQuery("A")
+        self.queryString.addAuthorQuery("B")
+        shards = self.queryString.shard()
+        self.assertEqual(len(shards), 2)
+        for shard in shards:
+            self.assertEqual(shard.getDateWindow(),
+                             self.queryString.getDateWindow())
+
+
 if __name__ == "__main__":
     unittest.main()
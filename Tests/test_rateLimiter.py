@@ -0,0 +1,128 @@
+import unittest
+import os
+import feedDownloader as fD
+from rateLimiter import *
+from feedServer import FeedServer
+
+
+class FakeClock():
+    """Clock that only advances when slept on"""
+    def __init__(self):
+        self.now = 1000.
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class test_parseRetryAfter(unittest.TestCase):
+    def test_seconds(self):
+        self.assertEqual(parseRetryAfter("120"), 120.)
+
+    def test_date(self):
+        self.assertEqual(parseRetryAfter("Thu, 01 Jan 1970 00:01:00 GMT",
+                                         now=30.), 30.)
+
+    def test_invalid(self):
+        self.assertTrue(parseRetryAfter(None) is None)
+        self.assertTrue(parseRetryAfter("soon") is None)
+
+
+class test_rateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(interval=3., clock=self.clock.clock,
+                                   sleep=self.clock.sleep)
+        self.lockFile = "./Tests/testRateLimiter.lock"
+
+    def tearDown(self):
+        self.clock = None
+        self.limiter = None
+        if os.path.exists(self.lockFile):
+            os.remove(self.lockFile)
+
+    def test_spacing(self):
+        self.assertEqual(self.limiter.acquire(), 0.)
+        self.assertEqual(self.limiter.acquire(), 3.)
+        self.clock.now += 1.
+        self.assertEqual(self.limiter.acquire(), 2.)
+        self.clock.now += 10.
+        self.assertEqual(self.limiter.acquire(), 0.)
+
+    def test_burst(self):
+        limiter = RateLimiter(interval=3., burst=2, clock=self.clock.clock,
+                              sleep=self.clock.sleep)
+        self.assertEqual([limiter.acquire() for i in range(4)],
+                         [0., 0., 3., 3.])
+
+    def test_statistics(self):
+        for i in range(3):
+            self.limiter.acquire()
+        statistics = self.limiter.statistics()
+        self.assertEqual(statistics["requests"], 3)
+        self.assertEqual(statistics["totalWait"], 6.)
+        self.assertEqual(statistics["meanWait"], 2.)
+        self.assertEqual(statistics["maxWait"], 3.)
+
+    def test_lockFile(self):
+        first = RateLimiter(interval=3., lockFile=self.lockFile,
+                            clock=self.clock.clock, sleep=self.clock.sleep)
+        second = RateLimiter(interval=3., lockFile=self.lockFile,
+                             clock=self.clock.clock, sleep=self.clock.sleep)
+        self.assertEqual(first.acquire(), 0.)
+        self.assertEqual(second.acquire(), 3.)
+        self.assertEqual(first.acquire(), 3.)
+
+    def test_retryAfter(self):
+        responses = [HTTPError("url", 503, "busy", {"Retry-After": "20"},
+                               None), "feed"]
+
+        def request():
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        self.assertEqual(self.limiter.call(request), "feed")
+        self.assertEqual(self.clock.sleeps, [20.])
+        self.assertEqual(self.limiter.statistics()["retries"], 1)
+
+    def test_backoff(self):
+        def request():
+            raise HTTPError("url", 429, "slow down", {}, None)
+        self.assertRaises(HTTPError, self.limiter.call, request)
+        self.assertEqual(self.clock.sleeps, [3., 6., 12.])
+
+    def test_otherErrorsAreRaised(self):
+        def request():
+            raise HTTPError("url", 404, "not found", {}, None)
+        self.assertRaises(HTTPError, self.limiter.call, request)
+        self.assertEqual(self.limiter.statistics()["requests"], 1)
+
+
+class test_rateLimitedDownload(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = fD.rateLimiter
+        fD.setRateLimiter(RateLimiter(clock=self.clock.clock,
+                                      sleep=self.clock.sleep))
+        self.server = FeedServer().__enter__()
+
+    def tearDown(self):
+        fD.setRateLimiter(self.limiter)
+        self.server.__exit__()
+        self.server = None
+        self.clock = None
+
+    def test_unavailable(self):
+        self.server.statusCodes.append((503, {"Retry-After": "5"}))
+        self.assertEqual(len(fD.downloadFeed(self.server.url()).entries), 10)
+        self.assertEqual(len(fD.downloadFeed(self.server.url()).entries), 10)
+        self.assertEqual(self.clock.sleeps, [5., 3.])
+
+
+if __name__ == "__main__":
+    unittest.main()
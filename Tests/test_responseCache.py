@@ -0,0 +1,136 @@
+import unittest
+import datetime
+import os
+import feedDownloader as fD
+from responseCache import *
+from feedServer import FeedServer
+
+
+class test_responseCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResponseCache(maxEntries=2)
+        self.fileName = "./Tests/testCache.pickle"
+
+    def tearDown(self):
+        self.cache = None
+        if os.path.exists(self.fileName):
+            os.remove(self.fileName)
+
+    def test_normalizeUrl(self):
+        self.assertEqual(normalizeUrl("HTTP://Export.arXiv.org/api/query?"
+                                      "start=0&search_query=cat:a"),
+                         normalizeUrl("http://export.arxiv.org/api/query?"
+                                      "search_query=cat:a&start=0"))
+        self.assertNotEqual(normalizeUrl("http://a/query?start=0"),
+                            normalizeUrl("http://a/query?start=10"))
+
+    def test_getPut(self):
+        self.assertTrue(self.cache.get("http://a/?x=1&y=2") is None)
+        response = CachedResponse("feed")
+        self.cache.put("http://a/?x=1&y=2", response)
+        self.assertTrue(self.cache.get("http://a/?y=2&x=1") is response)
+
+    def test_lruEviction(self):
+        self.cache.put("http://a/1", CachedResponse("1"))
+        self.cache.put("http://a/2", CachedResponse("2"))
+        self.cache.get("http://a/1")
+        self.cache.put("http://a/3", CachedResponse("3"))
+        self.assertEqual(len(self.cache), 2)
+        self.assertTrue(self.cache.get("http://a/2") is None)
+        self.assertEqual(self.cache.get("http://a/1").feed, "1")
+
+    def test_sizeEviction(self):
+        cache = ResponseCache(maxBytes=100)
+        cache.put("http://a/1", CachedResponse("1", size=60))
+        cache.put("http://a/2", CachedResponse("2", size=60))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.numBytes, 60)
+        self.assertTrue(cache.get("http://a/1") is None)
+
+    def test_freshness(self):
+        response = CachedResponse("feed")
+        self.assertTrue(self.cache.isFresh(response))
+        response.storedAt -= self.cache.ttl
+        self.assertFalse(self.cache.isFresh(response))
+        self.cache.put("http://a/1", response)
+        self.cache.refresh("http://a/1")
+        self.assertTrue(self.cache.isFresh(response))
+
+    def test_covers(self):
+        self.assertTrue(CachedResponse("feed").covers(None))
+        truncated = CachedResponse("feed", datetime.date(2016, 8, 10))
+        self.assertFalse(truncated.covers(None))
+        self.assertFalse(truncated.covers(datetime.date(2016, 8, 9)))
+        self.assertTrue(truncated.covers(datetime.date(2016, 8, 11)))
+
+    def test_validators(self):
+        self.assertEqual(CachedResponse("feed").validators(), {})
+        self.assertEqual(CachedResponse("feed", etag='"x"',
+                                        lastModified="date").validators(),
+                         {"If-None-Match": '"x"',
+                          "If-Modified-Since": "date"})
+
+    def test_saveLoad(self):
+        self.cache.put("http://a/1", CachedResponse("1", etag='"x"'))
+        self.cache.save(self.fileName)
+        cache = ResponseCache(fileName=self.fileName)
+        self.assertEqual(cache.get("http://a/1").feed, "1")
+        self.assertEqual(cache.get("http://a/1").etag, '"x"')
+
+
+class test_cachedDownload(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResponseCache()
+        fD.setResponseCache(self.cache)
+        self.limiter = fD.rateLimiter
+        fD.setRateLimiter(None)
+        self.server = FeedServer().__enter__()
+
+    def tearDown(self):
+        fD.setRateLimiter(self.limiter)
+        fD.setResponseCache(None)
+        self.server.__exit__()
+        self.server = None
+        self.cache = None
+
+    def test_freshResponseIsReused(self):
+        feed = fD.downloadFeed(self.server.url())
+        self.assertEqual(len(feed.entries), 10)
+        self.assertTrue(fD.downloadFeed(self.server.url()) is feed)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.cache.get(self.server.url()).size,
+                         len(self.server.body))
+
+    def test_staleResponseIsRevalidated(self):
+        feed = fD.downloadFeed(self.server.url())
+        self.cache.get(self.server.url()).storedAt -= self.cache.ttl
+        self.assertTrue(fD.downloadFeed(self.server.url()) is feed)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.requests[1][1].get("If-None-Match"),
+                         self.server.etag)
+        self.assertTrue(self.cache.isFresh(
+            self.cache.get(self.server.url())))
+
+    def test_changedResponseIsDownloaded(self):
+        feed = fD.downloadFeed(self.server.url())
+        self.cache.get(self.server.url()).storedAt -= self.cache.ttl
+        self.server.etag = '"changed"'
+        newFeed = fD.downloadFeed(self.server.url())
+        self.assertFalse(newFeed is feed)
+        self.assertEqual(self.cache.get(self.server.url()).etag,
+                         '"changed"')
+
+    def test_truncatedResponse(self):
+        stopDate = datetime.date(2016, 8, 11)
+        feed = fD.downloadFeed(self.server.url(), stopDate)
+        self.assertEqual(len(feed.entries), 1)
+        self.assertTrue(fD.downloadFeed(self.server.url(),
+                                        stopDate) is feed)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(len(fD.downloadFeed(self.server.url()).entries),
+                         10)
+        self.assertEqual(len(self.server.requests), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import unittest
+from searchCheckpoint import *
+
+
+class test_searchCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.fileName = "./checkpoint.pickle"
+        self.checkpoint = SearchCheckpoint(self.fileName)
+        self.key = ("cat:cond-mat", None, False, None, None)
+        self.state = {"start": 75, "N": 100,
+                      "text": {"text": u"arXiv update:\n", "entryIds": [],
+                               "newestUpdate": None},
+                      "rankBuffer": []}
+
+    def tearDown(self):
+        for fileName in (self.fileName, self.fileName + ".tmp"):
+            if os.path.exists(fileName):
+                os.remove(fileName)
+
+    def test_noCheckpoint(self):
+        self.assertIsNone(self.checkpoint.load(self.key))
+
+    def test_saveAndLoad(self):
+        self.checkpoint.save(self.key, self.state)
+        self.assertEqual(SearchCheckpoint(self.fileName).load(self.key),
+                         self.state)
+        self.assertFalse(os.path.exists(self.fileName + ".tmp"))
+
+    def test_otherSearch(self):
+        self.checkpoint.save(self.key, self.state)
+        self.assertIsNone(self.checkpoint.load(("cat:math", None, False,
+                                                None, None)))
+
+    def test_replace(self):
+        self.checkpoint.save(self.key, self.state)
+        self.state["start"] = 175
+        self.checkpoint.save(self.key, self.state)
+        self.assertEqual(self.checkpoint.load(self.key)["start"], 175)
+
+    def test_clear(self):
+        self.checkpoint.save(self.key, self.state)
+        self.checkpoint.clear()
+        self.assertFalse(os.path.exists(self.fileName))
+        self.assertIsNone(self.checkpoint.load(self.key))
+        self.checkpoint.clear()
+
+    def test_unreadable(self):
+        with open(self.fileName, "wb") as f:
+            f.write(b"not a checkpoint")
+        self.assertIsNone(self.checkpoint.load(self.key))
+
+
+if __name__ == "__main__":
+    unittest.main()
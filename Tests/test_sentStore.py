@@ -0,0 +1,87 @@
+import unittest
+import datetime
+import os
+from sentStore import *
+
+
+class test_bloomFilter(unittest.TestCase):
+    def test_noFalseNegatives(self):
+        bloomFilter = BloomFilter(capacity=100)
+        keys = ["key{0:d}".format(i) for i in range(100)]
+        for key in keys:
+            bloomFilter.add(key)
+        self.assertEqual(len(bloomFilter), 100)
+        self.assertTrue(all(key in bloomFilter for key in keys))
+
+    def test_fewFalsePositives(self):
+        bloomFilter = BloomFilter(capacity=100, errorRate=0.01)
+        for i in range(100):
+            bloomFilter.add("key{0:d}".format(i))
+        falsePositives = sum(1 for i in range(1000)
+                             if "other{0:d}".format(i) in bloomFilter)
+        self.assertTrue(falsePositives < 50)
+
+
+class test_sentStore(unittest.TestCase):
+    fileName = "./testSent.sqlite"
+
+    def setUp(self):
+        self.store = SentStore(self.fileName)
+
+    def tearDown(self):
+        self.store.close()
+        self.store = None
+        if os.path.exists(self.fileName):
+            os.remove(self.fileName)
+
+    def test_emptyStore(self):
+        self.assertEqual(len(self.store), 0)
+        self.assertFalse(self.store.isSent(
+            "a@b.c", "http://arxiv.org/abs/1608.03248v1"))
+
+    def test_sent(self):
+        self.store.addSent("a@b.c", ["http://arxiv.org/abs/1608.03248v1"])
+        self.assertTrue(self.store.isSent(
+            "a@b.c", "http://arxiv.org/abs/1608.03248v1"))
+        self.assertFalse(self.store.isSent(
+            "d@e.f", "http://arxiv.org/abs/1608.03248v1"))
+
+    def test_newVersionIsNotSent(self):
+        self.store.addSent("a@b.c", ["http://arxiv.org/abs/1608.03248v1"])
+        self.assertFalse(self.store.isSent(
+            "a@b.c", "http://arxiv.org/abs/1608.03248v2"))
+
+    def test_addTwice(self):
+        self.store.addSent("a@b.c", ["http://arxiv.org/abs/1608.03248v1"])
+        self.store.addSent("a@b.c", ["http://arxiv.org/abs/1608.03248v1"])
+        self.assertEqual(len(self.store), 1)
+
+    def test_persistent(self):
+        self.store.addSent("a@b.c", ["http://arxiv.org/abs/1608.03248v1"])
+        self.store.close()
+        self.store = SentStore(self.fileName)
+        self.assertTrue(self.store.isSent(
+            "a@b.c", "http://arxiv.org/abs/1608.03248v1"))
+
+    def test_filterGrows(self):
+        entryIds = ["http://arxiv.org/abs/1608.{0:05d}v1".format(i)
+                    for i in range(3000)]
+        self.store.addSent("a@b.c", entryIds)
+        self.assertTrue(self.store.filter.capacity >= 3000)
+        self.assertTrue(all(self.store.isSent("a@b.c", entryId)
+                            for entryId in entryIds))
+
+    def test_coverage(self):
+        self.assertEqual(self.store.getCoverage("a@b.c", "query"), None)
+        date = datetime.date(2016, 8, 9)
+        self.store.setCoverage("a@b.c", "query", date, 1470852958.)
+        self.assertEqual(self.store.getCoverage("a@b.c", "query"),
+                         (date, 1470852958.))
+        self.assertEqual(self.store.getCoverage("d@e.f", "query"), None)
+        self.store.setCoverage("a@b.c", "query", None, 1470852959.)
+        self.assertEqual(self.store.getCoverage("a@b.c", "query"),
+                         (None, 1470852959.))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import datetime
+import io
+import feedparser
+from feedEntry import *
+from streamParser import *
+
+
+class test_streamParser(unittest.TestCase):
+    def setUp(self):
+        with open("./Tests/testFeed.xml", "rb") as f:
+            self.raw = f.read()
+        self.stream = io.BytesIO(self.raw)
+
+    def tearDown(self):
+        self.raw = None
+        self.stream = None
+
+    def test_parseDate(self):
+        self.assertEqual(parseDate("2016-08-10T18:15:58Z"),
+                         feedparser.parse(self.raw).entries[0].updated_parsed)
+
+    def test_sameEntriesAsFeedparser(self):
+        expected = [Entry.fromFeedParserDict(entry)
+                    for entry in feedparser.parse(self.raw).entries]
+        self.assertEqual(list(StreamingFeedParser(self.stream)), expected)
+
+    def test_header(self):
+        parser = StreamingFeedParser(self.stream)
+        next(iter(parser))
+        self.assertEqual(parser.feed.opensearch_totalresults, "38253")
+        self.assertEqual(parser.feed.opensearch_startindex, "0")
+        self.assertEqual(parser.feed.opensearch_itemsperpage, "10")
+
+    def test_parseUntilNoDate(self):
+        feed = parseUntil(self.stream)
+        self.assertEqual(len(feed.entries), 10)
+        self.assertTrue(self.stream.closed)
+
+    def test_parseUntilDateNotReached(self):
+        feed = parseUntil(self.stream, datetime.date(2016, 8, 10))
+        self.assertEqual(len(feed.entries), 10)
+
+    def test_parseUntilDateReached(self):
+        feed = parseUntil(self.stream, datetime.date(2016, 8, 11))
+        self.assertEqual(len(feed.entries), 1)
+        self.assertEqual(feed.feed.opensearch_totalresults, "38253")
+        self.assertTrue(self.stream.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
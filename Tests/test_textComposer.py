@@ -1,4 +1,5 @@
 import unittest
+import calendar
 import feedparser
 import datetime
 from feedDownloader import *
@@ -62,6 +63,19 @@ class test_textComposer(unittest.TestCase):
     def test_noFeed(self):
         self.assertEqual(str(self.textComposer), "")
         self.assertEqual(self.textComposer.getText(), "")
+        self.assertEqual(list(self.textComposer.iterText()), [])
+        self.assertEqual(self.textComposer.getNumberOfLines(), 0)
+
+    def test_iterText(self):
+        feedDL = FeedDownloader(r"notNecessary")
+        feedDL.loadFeed("./Tests/testFeed.pickle")
+        self.textComposer.addFeed(feedDL.getFeed())
+        self.textComposer.addFeed(feedDL.getFeed())
+        fragments = list(self.textComposer.iterText())
+        self.assertTrue(len(fragments) > 20)
+        self.assertEqual("".join(fragments), self.textComposer.getText())
+        self.assertEqual(self.textComposer.getNumberOfLines(),
+                         self.textComposer.getText().count("\n"))
 
     def test_testFeed(self):
         expectedText = (u"Combinations of Adaptive Filters with Coefficients"
@@ -118,6 +132,137 @@ class test_textComposer(unittest.TestCase):
         self.textComposer = None
 
 
+class test_isLastPage(unittest.TestCase):
+    def setUp(self):
+        feedDL = FeedDownloader(r"notNecessary")
+        feedDL.loadFeed("./Tests/testFeed.pickle")
+        self.feed = feedDL.getFeed()
+
+    def test_emptyFeedIsLast(self):
+        feedDL = FeedDownloader(r"notNecessary")
+        feedDL.loadFeed("./Tests/testFeedEmpty.pickle")
+        self.assertTrue(isLastPage(feedDL.getFeed()))
+
+    def test_moreResultsAvailable(self):
+        self.assertFalse(isLastPage(self.feed))
+
+    def test_totalResultsReached(self):
+        self.feed.feed["opensearch_startindex"] = "38243"
+        self.assertTrue(isLastPage(self.feed))
+
+    def test_dateReached(self):
+        self.assertTrue(isDateReached(self.feed, datetime.date(2016, 8, 11)))
+        self.assertFalse(isDateReached(self.feed, datetime.date(2016, 8, 10)))
+        self.assertFalse(isDateReached(self.feed, None))
+
+    def test_fallbackToItemsPerPage(self):
+        del self.feed.feed["opensearch_totalresults"]
+        self.assertFalse(isLastPage(self.feed))
+        self.feed.feed["opensearch_itemsperpage"] = "25"
+        self.assertTrue(isLastPage(self.feed))
+
+    def test_numberOfResults(self):
+        self.assertEqual(numberOfResults(self.feed), 38253)
+        del self.feed.feed["opensearch_totalresults"]
+        self.assertIsNone(numberOfResults(self.feed))
+
+    def tearDown(self):
+        self.feed = None
+
+
+class test_mergeFeeds(unittest.TestCase):
+    def setUp(self):
+        feedDL = FeedDownloader(r"notNecessary")
+        feedDL.loadFeed("./Tests/testFeed.pickle")
+        self.feed = feedDL.getFeed()
+
+    def tearDown(self):
+        self.feed = None
+
+    def test_duplicatesAreRemoved(self):
+        first = feedparser.FeedParserDict(feed=self.feed.feed,
+                                          entries=self.feed.entries[:6])
+        second = feedparser.FeedParserDict(feed=self.feed.feed,
+                                           entries=self.feed.entries[3:])
+        merged = mergeFeeds([first, second])
+        self.assertEqual([entry.id for entry in merged.entries],
+                         [entry.id for entry in self.feed.entries])
+        self.assertEqual(merged.feed, self.feed.feed)
+
+    def test_newestFirst(self):
+        entries = list(reversed(self.feed.entries))
+        merged = mergeFeeds([feedparser.FeedParserDict(entries=entries)])
+        self.assertEqual([entry.updated_parsed for entry in merged.entries],
+                         sorted([entry.updated_parsed for entry in entries],
+                                reverse=True))
+
+    def test_newestVersionIsKept(self):
+        newer = feedparser.FeedParserDict(self.feed.entries[0])
+        newer["id"] = newer.id[:-2] + "v9"
+        merged = mergeFeeds([self.feed,
+                             feedparser.FeedParserDict(entries=[newer])])
+        self.assertEqual(len(merged.entries), len(self.feed.entries))
+        self.assertTrue(newer.id in [entry.id for entry in merged.entries])
+
+    def test_noFeeds(self):
+        self.assertEqual(mergeFeeds([]).entries, [])
+
+
+class test_sentFilter(unittest.TestCase):
+    def setUp(self):
+        self.textComposer = TextComposer()
+        feedDL = FeedDownloader(r"notNecessary")
+        feedDL.loadFeed("./Tests/testFeed.pickle")
+        self.feed = feedDL.getFeed()
+
+    def tearDown(self):
+        self.textComposer = None
+        self.feed = None
+
+    def test_entryIds(self):
+        self.textComposer.addFeed(self.feed)
+        self.assertEqual(self.textComposer.getEntryIds(),
+                         [entry.id for entry in self.feed.entries])
+        self.assertEqual(self.textComposer.getNewestUpdate(),
+                         max(calendar.timegm(entry.updated_parsed)
+                             for entry in self.feed.entries))
+
+    def test_sentAreSkipped(self):
+        sent = set(entry.id for entry in self.feed.entries[:9])
+        self.textComposer.setSentFilter(lambda entryId: entryId in sent)
+        self.assertFalse(self.textComposer.addFeed(self.feed))
+        self.assertEqual(self.textComposer.getEntryIds(),
+                         [self.feed.entries[9].id])
+        self.assertTrue(self.textComposer.getText().startswith(
+            self.feed.entries[9].title))
+
+    def test_coveredUntil(self):
+        updates = [calendar.timegm(entry.updated_parsed)
+                   for entry in self.feed.entries]
+        self.textComposer.setSentFilter(lambda entryId: False, updates[2])
+        self.assertTrue(self.textComposer.addFeed(self.feed))
+        self.assertEqual(self.textComposer.getEntryIds(),
+                         [entry.id for entry in self.feed.entries[:3]])
+
+    def test_resumeFromState(self):
+        first = feedparser.FeedParserDict(feed=self.feed.feed,
+                                          entries=self.feed.entries[:4])
+        second = feedparser.FeedParserDict(feed=self.feed.feed,
+                                           entries=self.feed.entries[4:])
+        self.textComposer.addFeed(first)
+        self.textComposer.addFeed(second)
+        interrupted = TextComposer()
+        interrupted.addFeed(first)
+        resumed = TextComposer()
+        resumed.setState(interrupted.getState())
+        resumed.addFeed(second)
+        self.assertEqual(resumed.getText(), self.textComposer.getText())
+        self.assertEqual(resumed.getEntryIds(),
+                         self.textComposer.getEntryIds())
+        self.assertEqual(resumed.getNewestUpdate(),
+                         self.textComposer.getNewestUpdate())
+
+
 class test_textComposerGreeting(unittest.TestCase):
     def setUp(self):
         self.greeting = "Hi\nThis is a test text\n"
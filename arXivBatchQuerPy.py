@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+
+import argparse
+import sys
+
+import queryString as qS
+import entryStore as eS
+import entryIndex as eI
+import entryRanker as eR
+import sentStore as sS
+import feedDownloader as fD
+import responseCache as rC
+import rateLimiter as rL
+import parsePool as pP
+import metrics as mT
+import mailSender as mS
+from arXivQuerPy import arXivQuerPy
+from arXivConfQuerPy import (config, DictToAttributes, querPyFromArgs,
+                             suppressFromArgs)
+
+
+class arXivBatchQuerPy():
+    """Runs the searches of many profiles sharing the downloads
+
+    Profiles searching in the same categories share one download of all
+    results in these categories (going back to the earliest date of any of
+    them), which is then indexed and searched locally for every profile.
+    """
+    def __init__(self, pageSize=25, pageGrowth=2):
+        """Constructor for the batch runner
+
+        Parameters
+        ----------
+        pageSize: int
+            Number of results requested with the first page of every download
+        pageGrowth: int
+            Factor by which the page size grows for every further page
+        """
+        self.pageSize = pageSize
+        self.pageGrowth = pageGrowth
+        self.profiles = []
+        self.deliveries = []
+
+    def addProfile(self, querPy, address, suppress=False):
+        """Add a profile to search for
+
+        Parameters
+        ----------
+        querPy: arXivQuerPy
+            updater with the keywords/categories of the profile
+        address: str
+            address to send the results to ('print' prints them instead)
+        suppress: bool
+            Don't send empty emails
+        """
+        self.profiles.append((querPy, address, suppress))
+
+    def addConfigFile(self, filename):
+        """Add a profile from a configuration file
+
+        Parameters
+        ----------
+        filename: str
+            path to a config file as used by arXivConfQuerPy
+        """
+        conf = config(filename)
+        # keep the settings (and addresses) of all profiles out of the output
+        conf.config_read(verbose=False)
+        args = DictToAttributes(**conf.get_args())
+        self.addProfile(querPyFromArgs(args), args.email,
+                        suppressFromArgs(args))
+
+    def groupProfiles(self):
+        """Groups the profiles by the categories they search in
+
+        Returns
+        -------
+        groups: dict
+            Maps sorted tuples of categories to lists of profiles (updater,
+            address, suppress). Profiles without categories can not share
+            downloads and are grouped under the empty tuple.
+        """
+        groups = {}
+        for profile in self.profiles:
+            categories = tuple(sorted(profile[0].query.getAllCategories()))
+            groups.setdefault(categories, []).append(profile)
+        return groups
+
+    def downloadCategories(self, categories, date, prefetch=0, store=None,
+                           streaming=False):
+        """Downloads all results in the given categories back to a date
+
+        Parameters
+        ----------
+        categories: tuple
+            categories to download all results of
+        date: datetime.date
+            date until when to go back
+        prefetch: int
+            Number of further pages to download in the background
+        store: entryStore.EntryStore
+            If given, only results missing in the store are downloaded
+        streaming: bool
+            Stop downloading a page once the date limit is reached
+
+        Returns
+        -------
+        feed: feedparser.FeedParserDict
+            one feed containing the entries of all downloaded pages (or all
+            stored entries back to the date)
+        """
+        collector = arXivQuerPy("", date, self.pageSize, self.pageGrowth)
+        collector.addCategory(categories)
+        if not (store is None):
+            collector.syncStore(store, prefetch=prefetch, streaming=streaming)
+            return store.getFeed(date)
+        return collector.collectFeed(prefetch=prefetch, streaming=streaming)
+
+    def search(self, prefetch=0, store=None, streaming=False, session=None):
+        """Perform the queries of all profiles
+
+        Parameters
+        ----------
+        prefetch: int
+            Number of further pages to download in the background
+        store: entryStore.EntryStore
+            If given, only results missing in the store are downloaded
+        streaming: bool
+            Stop downloading a page once the date limit is reached
+        session: mailSender.DeliveryQueue or mailSender.MailSession
+            If given, the results of every profile are delivered with it as
+            soon as they are gathered (otherwise call deliver afterwards)
+        """
+        for categories, profiles in self.groupProfiles().items():
+            if len(categories) == 0:
+                for profile in profiles:
+                    profile[0].search(prefetch=prefetch, store=store,
+                                      streaming=streaming)
+                    self.__deliverProfile(profile, session)
+                continue
+            date = min(profile[0].textComp.getDate() for profile in profiles)
+            feed = self.downloadCategories(categories, date, prefetch, store,
+                                           streaming)
+            index = eI.EntryIndex(feed.entries)
+            ranker = None
+            for profile in profiles:
+                profile[0].addIndexedEntries(index)
+                if profile[0].ranking and (ranker is None):
+                    ranker = eR.EntryRanker(feed.entries)
+                profile[0].composeRanked(ranker)
+                self.__deliverProfile(profile, session)
+
+    def __deliverProfile(self, profile, session):
+        """Sends (or prints) the gathered results of a profile
+
+        Nothing is done without a session, if the results are to be sent.
+        Results queued with a DeliveryQueue are recorded as sent by
+        markDelivered.
+        """
+        querPy, address, suppress = profile
+        if address == "print":
+            if not (session is None):
+                querPy.printText(suppress)
+        elif not (session is None):
+            sent = querPy.sendMail(address, suppress, session)
+            if isinstance(session, mS.DeliveryQueue):
+                if sent:
+                    self.deliveries.append((querPy, sent))
+            elif sent:
+                querPy.markSent()
+
+    def markDelivered(self):
+        """Records the results of all delivered mails as sent
+
+        Waits for the mails queued with a DeliveryQueue. Results of mails
+        that could not be delivered are not recorded, so they are sent
+        again with the next run.
+        """
+        deliveries, self.deliveries = self.deliveries, []
+        for querPy, future in deliveries:
+            if future.result():
+                querPy.markSent()
+
+    def deliver(self, session=None):
+        """Sends (or prints) the gathered results of all profiles
+
+        Parameters
+        ----------
+        session: mailSender.DeliveryQueue or mailSender.MailSession
+            session to send all mails with (a new MailSession if None)
+        """
+        if session is None:
+            with mS.MailSession() as session:
+                self.deliver(session)
+            return
+        for profile in self.profiles:
+            self.__deliverProfile(profile, session)
+
+
+if (__name__ == "__main__"):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("configs", nargs='+',
+                        help="Config files (as written by arXivConfQuerPy) "
+                             "of the profiles to search for")
+    parser.add_argument("--pageSize", type=int, default=25,
+                        help="Number of results requested with the first "
+                             "page (grows for further pages)")
+    parser.add_argument("--prefetch", type=int, default=0,
+                        help="Number of further pages to download "
+                             "concurrently while the current one is "
+                             "processed")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Stop downloading a page once the date limit "
+                             "is reached")
+    parser.add_argument("--parseWorkers", type=int, default=0,
+                        help="Number of processes parsing large pages "
+                             "while further pages are downloaded (implies "
+                             "--prefetch 1, 0 parses them in this process)")
+    parser.add_argument("--store", type=str, default=None,
+                        help="Database to keep downloaded entries in, so "
+                             "that later runs only download new updates")
+    parser.add_argument("--cache", type=str, default=None,
+                        help="File to keep api responses in, so that "
+                             "repeated queries are not downloaded again")
+    parser.add_argument("--rateLimit", type=float, default=3.,
+                        help="Seconds between api requests")
+    parser.add_argument("--rateLock", type=str, default=None,
+                        help="Lock file to space out api requests of "
+                             "concurrent runs through")
+    parser.add_argument("--rank", action="store_true",
+                        help="List the results by relevance for the "
+                             "keywords/authors instead of by date")
+    parser.add_argument("--top", type=int, default=None,
+                        help="Only list this many of the most relevant "
+                             "results (implies --rank)")
+    parser.add_argument("--sent", type=str, default=None,
+                        help="Database to record the sent results in, so "
+                             "that later runs do not send them again")
+    parser.add_argument("--connections", type=int, default=2,
+                        help="Number of concurrent connections to the "
+                             "mailgate")
+    parser.add_argument("--spool", type=str, default=None,
+                        help="Directory to keep undeliverable mails in "
+                             "(they are resent with the next run)")
+    parser.add_argument("--metrics", type=str, default=None,
+                        help="File to write counters and timings of the "
+                             "run to as json")
+    parser.add_argument("--prometheus", type=str, default=None,
+                        help="File to write counters and timings of the "
+                             "run to for Prometheus' textfile collector")
+    parser.add_argument("--profile", type=str, default=None,
+                        help="File to write a cProfile profile of the "
+                             "search and delivery to")
+    args = parser.parse_args()
+
+    batch = arXivBatchQuerPy(pageSize=args.pageSize)
+    for filename in args.configs:
+        batch.addConfigFile(filename)
+    if args.rank or not (args.top is None):
+        for profile in batch.profiles:
+            profile[0].setRanking(topK=args.top)
+    sent = None
+    if not (args.sent is None):
+        sent = sS.SentStore(args.sent)
+        for querPy, address, suppress in batch.profiles:
+            if not (address == "print"):
+                querPy.setSentStore(sent, address)
+
+    store = None
+    if not (args.store is None):
+        store = eS.EntryStore(args.store)
+    if not (args.cache is None):
+        fD.setResponseCache(rC.ResponseCache(fileName=args.cache))
+    fD.setRateLimiter(rL.RateLimiter(args.rateLimit, lockFile=args.rateLock))
+    if args.parseWorkers > 0:
+        fD.setParsePool(pP.ParsePool(args.parseWorkers))
+        # pages are only parsed meanwhile if further ones are downloaded
+        args.prefetch = max(args.prefetch, 1)
+    delivery = mS.DeliveryQueue(maxConnections=args.connections,
+                                spoolDirectory=args.spool)
+    with mT.profiled(args.profile):
+        try:
+            delivery.resendSpool()
+            with mT.timer("search"):
+                batch.search(args.prefetch, store, args.streaming, delivery)
+        except qS.EmptyQueryException:
+            sys.exit(1)
+        finally:
+            if not (store is None):
+                store.close()
+            if not (args.cache is None):
+                fD.responseCache.save()
+            if not (fD.parsePool is None):
+                fD.parsePool.close()
+            with mT.timer("deliver"):
+                numFailed = delivery.close()
+            batch.markDelivered()
+            if not (sent is None):
+                sent.close()
+    mT.report(args.metrics, args.prometheus)
+    if numFailed > 0:
+        print("{0:d} mails could not be delivered.".format(numFailed))
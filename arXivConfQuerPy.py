@@ -4,6 +4,7 @@ import sys
 
 import queryString as qS
 import feedDownloader as fD
+import rateLimiter as rL
 import textComposer as tC
 import mailSender as mS
 from arXivQuerPy import arXivQuerPy
@@ -39,8 +40,13 @@ class config():
         """
         return os.path.isfile(self.filename)
 
-    def config_read(self):
+    def config_read(self, verbose=True):
         """Reads in the given config file.
+
+        Parameters
+        ----------
+        verbose: bool
+            Print the settings read from the file
         """
         self.args = {}
 
@@ -56,7 +62,8 @@ class config():
         content = os.linesep.join([s for s in content.splitlines()
                                    if not s.startswith('#')])
 
-        print content
+        if verbose:
+            print(content)
 
         key_args = ["email", "category", "title", "author", "abstract",
                     "suppress", "lastNDays"]
@@ -64,7 +71,8 @@ class config():
             self.args[key] = None
             for line in content.split('\n'):
                 split = line.split('=')
-                if key == split[0].strip():
+                # generate_config writes the authors as "authors"
+                if split[0].strip() in (key, key + "s"):
                     if split[1].strip() == "":
                         self.args[key] = None
                     else:
@@ -128,6 +136,53 @@ class DictToAttributes:
         self.__dict__.update(entries)
 
 
+def querPyFromArgs(args):
+    """Generates the updater and feeds in the arguments of a config file
+
+    Parameters
+    ----------
+    args: DictToAttributes
+        arguments read from a config file
+
+    Returns
+    -------
+    querPy: arXivQuerPy
+        updater searching for the given arguments
+    """
+    if args.lastNDays is None:
+        querPy = arXivQuerPy()
+    else:
+        querPy = arXivQuerPy(date=datetime.date.today() -
+                             datetime.timedelta(days=int(args.lastNDays)))
+
+    if not (args.category is None):
+        querPy.addCategory(args.category.split(" "))
+    if not (args.author is None):
+        querPy.addAuthors(args.author.split(" "))
+    if not (args.title is None):
+        querPy.addTitleKeywords(args.title.split(" "))
+    if not (args.abstract is None):
+        querPy.addAbstractKeywords(args.abstract.split(" "))
+    return querPy
+
+
+def suppressFromArgs(args):
+    """Checks if empty emails should be suppressed according to a config file
+
+    Parameters
+    ----------
+    args: DictToAttributes
+        arguments read from a config file
+
+    Returns
+    -------
+    suppress: bool
+        Indicates if empty emails should be suppressed
+    """
+    return ((not (args.suppress is None))
+            and (args.suppress.lower() == "true"))
+
+
 if (__name__ == "__main__"):
     # Get the real path to the config file
     scriptpath = os.path.dirname(os.path.realpath(__file__))
@@ -149,24 +204,11 @@ if (__name__ == "__main__"):
     args = DictToAttributes(**args)
 
     # Generate the updater and feed in the arguments.
-    if args.lastNDays is None:
-        querPy = arXivQuerPy()
-    else:
-        querPy = arXivQuerPy(date=datetime.date.today() -
-                             datetime.timedelta(days=int(args.lastNDays)))
-
-    if not (args.category is None):
-        querPy.addCategory(args.category.split(" "))
-    if not (args.author is None):
-        querPy.addAuthors(args.author.split(" "))
-    if not (args.title is None):
-        querPy.addTitleKeywords(args.title.split(" "))
-    if not (args.abstract is None):
-        querPy.addAbstractKeywords(args.abstract.split(" "))
-    if args.suppress.lower() == "true":
-        args.suppress = True
+    querPy = querPyFromArgs(args)
+    args.suppress = suppressFromArgs(args)
 
-    # Do the search
+    # Do the search, spacing out the requests as asked for by arXiv
+    fD.setRateLimiter(rL.RateLimiter())
     try:
         querPy.search()
     except qS.EmptyQueryException:
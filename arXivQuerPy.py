@@ -1,23 +1,47 @@
 #!/usr/bin/env python
 
 import argparse
+import calendar
+import copy
 import datetime
 import collections
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
+import feedparser
 import queryString as qS
 import feedDownloader as fD
 import textComposer as tC
 import mailSender as mS
+import entryFilter as eF
+import entryStore as eS
+import entryIndex as eI
+import entryRanker as eR
+import sentStore as sS
+import searchCheckpoint as sC
+import feedEntry as fE
+import responseCache as rC
+import rateLimiter as rL
+import parsePool as pP
+import metrics as mT
+if sys.version_info >= (3, 5):
+    import asyncFeedDownloader as aFD
+else:
+    # async/await needs python 3.5
+    aFD = None
 
 
 class arXivQuerPy():
     """Main code that glues the other classes to do the full query
     """
+    shardWorkers = 4
+
     def __init__(self,
                  greeting=None,
-                 date=datetime.date.today() - datetime.timedelta(days=1)):
+                 date=datetime.date.today() - datetime.timedelta(days=1),
+                 pageSize=25,
+                 pageGrowth=2):
         """Constructor for the glue class
 
         Parameters
@@ -26,12 +50,39 @@ class arXivQuerPy():
             Beginning of the message
         date: datetime.date
             From when to get the updateDate
+        pageSize: int
+            Number of results requested with the first page
+        pageGrowth: int
+            Factor by which the page size grows for every further page (capped
+            at the maximum number of results the api returns at once)
         """
         if (greeting is None):
             greeting = "arXiv update since {0}:\n".format(str(date))
-        self.query = qS.QueryString()
+        self.pageSize = min(pageSize, qS.QueryString.maxResultsLimit)
+        self.pageGrowth = pageGrowth
+        self.query = qS.QueryString(N=self.pageSize)
         self.feedDL = None
         self.textComp = tC.TextComposer(greeting, date)
+        self.ranking = False
+        self.topK = None
+        self.rankBuffer = []
+        self.sentStore = None
+        self.recipient = None
+        self.coveredUntil = None
+        self.checkpoint = None
+
+    def setRanking(self, ranking=True, topK=None):
+        """Set to list the results by relevance instead of by date
+
+        Parameters
+        ----------
+        ranking: bool
+            Sort the results by their relevance for the keywords/authors
+        topK: int
+            Only list this many of the most relevant results (all if None)
+        """
+        self.ranking = ranking
+        self.topK = topK
 
     def addCategory(self, categories):
         """Add a categories to search in
@@ -69,49 +120,661 @@ class arXivQuerPy():
             for abstract in abstracts:
                 self.query.addAbstractQuery(abstract)
 
-    def search(self, andNotOr=False):
+    def setSentStore(self, sentStore, recipient):
+        """Skip the results that were already sent to a recipient
+
+        Parameters
+        ----------
+        sentStore: sentStore.SentStore
+            record of the entries sent before (see markSent)
+        recipient: str
+            address the results are sent to
+        """
+        self.sentStore = sentStore
+        self.recipient = recipient
+        self.textComp.setSentFilter(self.isSent)
+
+    def setCheckpoint(self, checkpoint):
+        """Checkpoint the search after every page to resume it if it fails
+
+        Parameters
+        ----------
+        checkpoint: searchCheckpoint.SearchCheckpoint
+            where to keep the state of the search (None to not checkpoint)
+        """
+        self.checkpoint = checkpoint
+
+    def checkpointKey(self):
+        """Gives the key a checkpoint of the search is kept under
+
+        Returns
+        -------
+        key: tuple
+            query, date limit, ranking, and recipient of the search
+        """
+        return (self.query.getQueryKey(), self.textComp.getDate(),
+                self.ranking, self.topK, self.recipient)
+
+    def __resume(self):
+        """Continues after the last page of a failed run of the same search
+        """
+        if self.checkpoint is None:
+            return
+        state = self.checkpoint.load(self.checkpointKey())
+        if state is None:
+            return
+        self.query.start = state["start"]
+        self.query.N = state["N"]
+        self.textComp.setState(state["text"])
+        self.rankBuffer = list(state["rankBuffer"])
+        mT.count("checkpointResumes")
+
+    def __saveCheckpoint(self):
+        """Keeps the state of the search after the current page
+        """
+        if self.checkpoint is None:
+            return
+        self.checkpoint.save(self.checkpointKey(),
+                             {"start": self.query.start + self.query.N,
+                              "N": self.nextPageSize(),
+                              "text": self.textComp.getState(),
+                              "rankBuffer": self.rankBuffer})
+
+    def isSent(self, entryId):
+        """Checks if an entry was already sent (see setSentStore)
+
+        Parameters
+        ----------
+        entryId: str
+            id of the entry
+
+        Returns
+        -------
+        sent: bool
+            Indicates if this version of the entry was sent before
+        """
+        return ((not (self.sentStore is None))
+                and self.sentStore.isSent(self.recipient, entryId))
+
+    def __applyCoverage(self):
+        """Stops searching where earlier results were already gone through
+
+        Only possible if the earlier results reach back to the date limit.
+        """
+        if self.sentStore is None:
+            return
+        coverage = self.sentStore.getCoverage(self.recipient,
+                                              self.query.getQueryKey())
+        date = self.textComp.getDate()
+        self.coveredUntil = None
+        if not (coverage is None):
+            since, highWaterMark = coverage
+            if (since is None) or ((not (date is None)) and (since <= date)):
+                self.coveredUntil = highWaterMark
+        self.textComp.setSentFilter(self.isSent, self.coveredUntil)
+
+    def markSent(self):
+        """Records the results in the text as sent (see setSentStore)
+        """
+        if self.sentStore is None:
+            return
+        self.sentStore.addSent(self.recipient, self.textComp.getEntryIds())
+        queryKey = self.query.getQueryKey()
+        since = self.textComp.getDate()
+        newest = self.textComp.getNewestUpdate()
+        coverage = self.sentStore.getCoverage(self.recipient, queryKey)
+        if (not (coverage is None)) and (not (self.coveredUntil is None)):
+            # this search reached the results gone through before
+            oldSince, oldHighWaterMark = coverage
+            if (oldSince is None) or (since is None):
+                since = None
+            else:
+                since = min(since, oldSince)
+            if (newest is None) or (oldHighWaterMark > newest):
+                newest = oldHighWaterMark
+        if not (newest is None):
+            self.sentStore.setCoverage(self.recipient, queryKey, since,
+                                       newest)
+
+    def search(self, andNotOr=False, prefetch=0, store=None, streaming=False):
         """Perform the query with the chosen keywords/categories
 
         Set and=True if you want to only search titles/abstracts by the authors
+
+        Parameters
+        ----------
+        andNotOr: bool
+            Only search titles/abstracts by the given authors
+        prefetch: int
+            Number of further pages to download in the background while the
+            current one is composed (0 downloads one page after the other).
+            Once the number of results since the date limit is known, all
+            remaining pages are downloaded this way.
+        store: entryStore.EntryStore
+            If given, only results missing in the store are downloaded and
+            the text is composed from the store
+        streaming: bool
+            Parse pages while downloading them and stop downloading a page
+            once the date limit is reached
+
+        If a checkpoint is set (see setCheckpoint), a search that is not
+        split into shards and does not use a store continues after the last
+        page of a failed run.
         """
-        if andNotOr:
-            self.query.setConnector("and")
+        self.__setConnector(andNotOr)
+        shards = self.shardQuery()
+        self.__applyCoverage()
+        if len(shards) > 1:
+            self.searchShards(shards, andNotOr, prefetch, store, streaming)
+        elif not (store is None):
+            self.syncStore(store, andNotOr, prefetch, streaming)
+            self.addMatchingEntries(store.getFeed(self.textComp.getDate()))
         else:
-            self.query.setConnector("or")
+            self.__resume()
+            feeds = self.iterFeeds(andNotOr, prefetch, streaming)
+            try:
+                for feed in feeds:
+                    if self.__addFeed(feed):
+                        break
+                    self.__saveCheckpoint()
+            finally:
+                feeds.close()
+            if not (self.checkpoint is None):
+                self.checkpoint.clear()
+        self.composeRanked()
+
+    def searchAsync(self, andNotOr=False, prefetch=0, timeout=None):
+        """Perform the query like search, but without blocking an event loop
+
+        Pages are downloaded, composed, and checkpointed like by search
+        (without splitting the query into shards). Cancelling the search
+        cancels its downloads. Needs python 3.
+
+        Parameters
+        ----------
+        andNotOr: bool
+            Only search titles/abstracts by the given authors
+        prefetch: int
+            Number of further pages to download concurrently
+        timeout: float
+            Seconds to wait for a page (None waits as long as needed)
+
+        Returns
+        -------
+        search: coroutine
+            coroutine performing the search
+
+        Raises
+        ------
+        EmptyQueryException
+            If there is nothing to search for
+        RuntimeError
+            If the python version has no async/await
+        """
+        if aFD is None:
+            raise RuntimeError("searchAsync needs python 3.5 or later")
+        self.__setConnector(andNotOr)
+        self.__checkQuery()
+        self.__applyCoverage()
+        self.__resume()
+
+        def addFeed(feed):
+            if self.__addFeed(feed):
+                return True
+            self.__saveCheckpoint()
+            return False
+
+        def finish():
+            if not (self.checkpoint is None):
+                self.checkpoint.clear()
+            self.composeRanked()
+        return aFD.searchPages(self, addFeed, prefetch, timeout, finish)
+
+    def __addFeed(self, feed):
+        """Adds a feed to the text (or keeps its entries for ranking)
+
+        Returns
+        -------
+        finished: bool
+            Indicates if the date was reached
+        """
+        if not self.ranking:
+            return self.textComp.addFeed(feed)
+        date = self.textComp.getDate()
+        entries = []
+        reached = tC.isLastPage(feed)
+        for entry in feed.entries:
+            entry = fE.toEntry(entry)
+            if (((not (date is None))
+                    and (datetime.date(*entry.updated_parsed[:3]) < date))
+                    or ((not (self.coveredUntil is None))
+                        and (calendar.timegm(entry.updated_parsed)
+                             < self.coveredUntil))):
+                reached = True
+                break
+            if not self.isSent(entry.id):
+                entries.append(entry)
+        self.rankBuffer.extend(entries)
+        return reached
+
+    def composeRanked(self, ranker=None):
+        """Adds the entries kept for ranking to the text, most relevant first
+
+        Nothing is done if the results are not ranked (see setRanking).
+
+        Parameters
+        ----------
+        ranker: entryRanker.EntryRanker
+            ranker containing (at least) the kept entries, e.g. one shared by
+            several searches (a new one for the kept entries if None)
+        """
+        if (not self.ranking) or (len(self.rankBuffer) == 0):
+            return
+        if ranker is None:
+            ranker = eR.EntryRanker(self.rankBuffer)
+        entries = ranker.rank(self.query, self.rankBuffer, self.topK)
+        self.rankBuffer = []
+        self.textComp.addFeed(feedparser.FeedParserDict(
+            feed=feedparser.FeedParserDict(), entries=entries))
+
+    def shardQuery(self):
+        """Splits the query into shards within its budget
+
+        Returns
+        -------
+        shards: list of queryString.QueryString
+            queries whose results together are the results of the query
+
+        Raises
+        ------
+        EmptyQueryException
+            If there is nothing to search for
+        """
+        self.__checkQuery()
+        return self.query.shard()
+
+    def __checkQuery(self):
+        """Explains what is missing if there is nothing to search for
+        """
         try:
-            url = self.query.getSearchString()
+            self.query.getQueryKey()
         except qS.EmptyQueryException as e:
             print("You have to specify at least one of the following:")
             print(" - One or multiple authors")
             print(" - Title/Abstract keyword to search for")
+            print(" - One or multiple categories to search in")
             raise e
+
+    def searchShards(self, shards, andNotOr=False, prefetch=0, store=None,
+                     streaming=False):
+        """Perform the query split into shards
+
+        The shards are downloaded concurrently and their results merged
+        (without duplicates, newest first) before they are composed.
+
+        Parameters
+        ----------
+        shards: list of queryString.QueryString
+            shards of the query (see shardQuery)
+        andNotOr: bool
+            Only search titles/abstracts by the given authors
+        prefetch: int
+            Number of further pages of every shard to download in the
+            background
+        store: entryStore.EntryStore
+            If given, only results missing in the store are downloaded (one
+            shard after the other) and the text is composed from the store
+        streaming: bool
+            Parse pages while downloading them and stop downloading a page
+            once the date limit is reached
+        """
+        date = self.textComp.getDate()
+        collectors = []
+        for shard in shards:
+            collector = arXivQuerPy("", date, self.pageSize, self.pageGrowth)
+            collector.query = shard
+            collectors.append(collector)
+        if not (store is None):
+            for collector in collectors:
+                collector.syncStore(store, andNotOr, prefetch, streaming)
+            self.addMatchingEntries(store.getFeed(date))
+            return
+        with ThreadPoolExecutor(
+                max_workers=min(len(collectors), self.shardWorkers)) as pool:
+            futures = [pool.submit(collector.collectFeed, andNotOr, prefetch,
+                                   streaming)
+                       for collector in collectors]
+            feeds = [future.result() for future in futures]
+        self.__addFeed(tC.mergeFeeds(feeds))
+
+    def collectFeed(self, andNotOr=False, prefetch=0, streaming=False):
+        """Downloads all results back to the date limit into one feed
+
+        Parameters
+        ----------
+        andNotOr: bool
+            Only search titles/abstracts by the given authors
+        prefetch: int
+            Number of further pages to download in the background
+        streaming: bool
+            Parse pages while downloading them and stop downloading a page
+            once the date limit is reached
+
+        Returns
+        -------
+        feed: feedparser.FeedParserDict
+            one feed containing the entries of all downloaded pages
+        """
+        date = self.textComp.getDate()
+        feed = None
+        entries = []
+        feeds = self.iterFeeds(andNotOr, prefetch, streaming)
+        try:
+            for page in feeds:
+                feed = page
+                entries.extend(page.entries)
+                if tC.isLastPage(page) or tC.isDateReached(page, date):
+                    break
+        finally:
+            feeds.close()
+        feed = feedparser.FeedParserDict(feed)
+        feed["entries"] = entries
+        return feed
+
+    def iterFeeds(self, andNotOr=False, prefetch=0, streaming=False):
+        """Downloads the pages of results for the chosen keywords/categories
+
+        Pages are downloaded and yielded until the caller stops iterating, so
+        the caller has to stop once the date limit or the last page is reached.
+        The date limit is sent to the server as date window, so the first page
+        tells how many pages there are. Iterating stops after the last of them
+        and with prefetching all of them are downloaded concurrently.
+
+        Parameters
+        ----------
+        andNotOr: bool
+            Only search titles/abstracts by the given authors
+        prefetch: int
+            Number of further pages to download in the background (and number
+            of concurrent downloads once the number of pages is known)
+        streaming: bool
+            Parse pages while downloading them and stop downloading a page
+            once the date limit is reached
+
+        Yields
+        ------
+        feed: feedparser.FeedParserDict
+            next page of results
+        """
+        self.__setConnector(andNotOr)
+        self.__checkQuery()
+        self.query.setDateWindow(self.textComp.getDate())
+        url = self.query.getSearchString()
+        stopDate = self.textComp.getDate() if streaming else None
+        prefetcher = None
+        if prefetch > 0:
+            prefetcher = fD.FeedPrefetcher(prefetch, stopDate)
         if self.feedDL is None:
-            self.feedDL = fD.FeedDownloader(url)
+            self.feedDL = fD.FeedDownloader(url, prefetcher, stopDate)
         else:
             self.feedDL.updateQueryString(url)
-        self.feedDL.updateFeed()
-        while(not self.textComp.addFeed(self.feedDL.getFeed())):
-            self.query.nextNumberOfResults(10)
-            self.feedDL.updateQueryString(self.query.getSearchString())
+            self.feedDL.setPrefetcher(prefetcher)
+            self.feedDL.setStopDate(stopDate)
+        try:
+            self.feedDL.prefetch([url] + self.upcomingSearchStrings(prefetch))
             self.feedDL.updateFeed()
+            feed = self.feedDL.getFeed()
+            # the server only gives results from within the date window, so
+            # all of its pages are needed
+            total = self.windowTotal(feed)
+            if not (total is None):
+                prefetch = None
+            yield feed
+            while True:
+                self.query.nextNumberOfResults(self.nextPageSize())
+                if (not (total is None)) and (self.query.start >= total):
+                    return
+                self.feedDL.updateQueryString(self.query.getSearchString())
+                self.feedDL.prefetch(self.upcomingSearchStrings(prefetch,
+                                                                total))
+                self.feedDL.updateFeed()
+                yield self.feedDL.getFeed()
+        finally:
+            if not (prefetcher is None):
+                self.feedDL.setPrefetcher(None)
+                prefetcher.close()
+
+    def windowTotal(self, feed):
+        """Gives the number of results within the date window of the query
+
+        Parameters
+        ----------
+        feed: feedparser.FeedParserDict
+            a page of results of the query
+
+        Returns
+        -------
+        total: int
+            number of results, None if the query has no date window or the
+            page does not tell
+        """
+        if self.query.getDateWindow() is None:
+            return None
+        return tC.numberOfResults(feed)
+
+    def __setConnector(self, andNotOr):
+        """Set the connector between authors and titles/abstracts
+        """
+        if andNotOr:
+            self.query.setConnector("and")
+        else:
+            self.query.setConnector("or")
+
+    def syncStore(self, store, andNotOr=False, prefetch=0, streaming=False):
+        """Downloads the results that are missing in an entry store
+
+        If the store already contains all results of the query back to the
+        date limit, only results updated after the newest one stored are
+        downloaded. Otherwise all results back to the date limit are. As the
+        results are searched for within a date window, the last page of the
+        window only completes the store back to the start of the window.
+
+        Parameters
+        ----------
+        store: entryStore.EntryStore
+            store to add the downloaded entries to
+        andNotOr: bool
+            Only search titles/abstracts by the given authors
+        prefetch: int
+            Number of further pages to download in the background
+        streaming: bool
+            Parse pages while downloading them and stop downloading a page
+            once the date limit is reached
+        """
+        date = self.textComp.getDate()
+        self.__setConnector(andNotOr)
+        queryKey = self.query.getQueryKey()
+        sync = store.getSync(queryKey)
+        incremental = ((not (sync is None))
+                       and ((sync[0] is None)
+                            or ((not (date is None)) and (sync[0] <= date))))
+        highWaterMark = sync[1] if incremental else 0.
+        newest = highWaterMark
+        complete = False
+        feeds = self.iterFeeds(andNotOr, prefetch, streaming)
+        try:
+            for feed in feeds:
+                store.addEntries(feed.entries)
+                if tC.isLastPage(feed):
+                    complete = True
+                updates = [calendar.timegm(entry.updated_parsed)
+                           for entry in feed.entries]
+                newest = max([newest] + updates)
+                if (complete or tC.isDateReached(feed, date)
+                        or (min(updates) < highWaterMark)):
+                    break
+        finally:
+            feeds.close()
+        if complete and (self.query.getDateWindow() is None):
+            since = None
+        elif incremental:
+            since = sync[0]
+        else:
+            since = date
+        store.setSync(queryKey, since, newest)
+
+    def addMatchingEntries(self, feed):
+        """Adds the entries of a feed that match the chosen keywords/categories
+
+        Used for feeds that were downloaded for a broader query, e.g. one
+        shared by several searches in the same categories.
+
+        Parameters
+        ----------
+        feed: feedparser.FeedParserDict
+            feed to filter and add to the text
 
-    def sendMail(self, address, suppress):
+        Returns
+        -------
+        finished: bool
+            Indicates if the date was reached
+        """
+        return self.__addFeed(eF.EntryFilter(self.query).filterFeed(feed))
+
+    def addIndexedEntries(self, index):
+        """Adds the indexed entries that match the chosen keywords/categories
+
+        Like addMatchingEntries, but only the entries found in the index are
+        checked instead of all entries of a feed.
+
+        Parameters
+        ----------
+        index: entryIndex.EntryIndex
+            index of entries, e.g. of the stored or shared downloads
+
+        Returns
+        -------
+        finished: bool
+            Indicates if the date was reached
+        """
+        return self.__addFeed(
+            index.getFeed(self.query, self.textComp.getDate()))
+
+    def searchIndex(self, index, andNotOr=False):
+        """Perform the query on an index of entries without downloading
+
+        Parameters
+        ----------
+        index: entryIndex.EntryIndex
+            index of entries, e.g. of the stored ones
+        andNotOr: bool
+            Only search titles/abstracts by the given authors
+        """
+        self.__setConnector(andNotOr)
+        self.__checkQuery()
+        self.__applyCoverage()
+        self.addIndexedEntries(index)
+        self.composeRanked()
+
+    def nextPageSize(self, N=None):
+        """Gives the number of results to request with the next page
+
+        Parameters
+        ----------
+        N: int
+            Size of the current page (defaults to the one of the query)
+
+        Returns
+        -------
+        N: int
+            Current page size grown by pageGrowth, but at most the maximum
+            number of results the api returns at once
+        """
+        if N is None:
+            N = self.query.N
+        return min(N * self.pageGrowth, qS.QueryString.maxResultsLimit)
+
+    def upcomingSearchStrings(self, numPages, total=None):
+        """Gives the search strings of the pages following the current one
+
+        Parameters
+        ----------
+        numPages: int
+            Number of upcoming pages (all up to total if None)
+        total: int
+            Total number of results, pages beyond it are left out (None if
+            unknown)
+
+        Returns
+        -------
+        searchStrings: list
+            Search strings of the next numPages pages
+        """
+        if (numPages is None) and (total is None):
+            raise ValueError("the number of pages or results is needed")
+        query = copy.deepcopy(self.query)
+        searchStrings = []
+        while (numPages is None) or (len(searchStrings) < numPages):
+            query.nextNumberOfResults(self.nextPageSize(query.N))
+            if (not (total is None)) and (query.start >= total):
+                break
+            searchStrings.append(query.getSearchString())
+        return searchStrings
+
+    def sendMail(self, address, suppress, session=None):
         """Sends the gathered feed as text to the given address.
         Returns boolean whether mail was send.
+
+        If a mailSender.MailSession is given, its connection is used. A
+        mailSender.DeliveryQueue sends the mail in the background; then the
+        future giving whether it was delivered is returned instead of True.
         """
-        text = self.textComp.getText()
-        if ((not suppress) or (text.count('\n') > 2)):
-            mS.sendMail(text, address)
+        if ((not suppress) or (self.textComp.getNumberOfLines() > 2)):
+            if session is None:
+                mS.sendMail(self.textComp.getText(), address)
+            else:
+                future = session.send(self.textComp.getText(), address)
+                if isinstance(session, mS.DeliveryQueue):
+                    return future
             return True
         else:
             return False
 
+    def sendMailAsync(self, address, suppress, session=None, timeout=None):
+        """Sends the gathered feed like sendMail, but without blocking an
+        event loop
+
+        The mail is sent in the default executor of the event loop, as
+        sending it via smtp blocks. Needs python 3.
+
+        Parameters
+        ----------
+        timeout: float
+            Seconds to wait for the mail to be sent (None waits as long as
+            needed)
+
+        Returns
+        -------
+        send: coroutine
+            coroutine sending the mail, gives whether the mail was sent
+
+        Raises
+        ------
+        RuntimeError
+            If the python version has no async/await
+        """
+        if aFD is None:
+            raise RuntimeError("sendMailAsync needs python 3.5 or later")
+        return aFD.runBlocking(self.sendMail, address, suppress, session,
+                               timeout=timeout)
+
     def printText(self, suppress):
         """Prints the gathered feed rather than sending it via email
         """
-        text = self.textComp.getText()
-        if ((not suppress) or (text.count('\n') > 2)):
-            print(text)
+        if ((not suppress) or (self.textComp.getNumberOfLines() > 2)):
+            for fragment in self.textComp.iterText():
+                sys.stdout.write(fragment)
+            sys.stdout.write("\n")
         else:
             print("No results found in the given timeframe...")
 
@@ -147,13 +810,72 @@ if (__name__ == "__main__"):
     parser.add_argument("--andNotOr", action="store_true",
                         help="Search for one of the titles from one of "
                              "the authors")
+    parser.add_argument("--pageSize", type=int, default=25,
+                        help="Number of results requested with the first "
+                             "page (grows for further pages)")
+    parser.add_argument("--prefetch", type=int, default=0,
+                        help="Number of further pages to download "
+                             "concurrently while the current one is "
+                             "processed")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Stop downloading a page once the date limit "
+                             "is reached")
+    parser.add_argument("--parseWorkers", type=int, default=0,
+                        help="Number of processes parsing large pages "
+                             "while further pages are downloaded (implies "
+                             "--prefetch 1, 0 parses them in this process)")
+    parser.add_argument("--store", type=str, default=None,
+                        help="Database to keep downloaded entries in, so "
+                             "that later runs only download new updates")
+    parser.add_argument("--cache", type=str, default=None,
+                        help="File to keep api responses in, so that "
+                             "repeated queries are not downloaded again")
+    parser.add_argument("--rateLimit", type=float, default=3.,
+                        help="Seconds between api requests")
+    parser.add_argument("--rateLock", type=str, default=None,
+                        help="Lock file to space out api requests of "
+                             "concurrent runs through")
+    parser.add_argument("--rank", action="store_true",
+                        help="List the results by relevance for the "
+                             "keywords/authors instead of by date")
+    parser.add_argument("--top", type=int, default=None,
+                        help="Only list this many of the most relevant "
+                             "results (implies --rank)")
+    parser.add_argument("--sent", type=str, default=None,
+                        help="Database to record the sent results in, so "
+                             "that later runs do not send them again")
+    parser.add_argument("--offline", action="store_true",
+                        help="Only search the entries in the database given "
+                             "with --store instead of downloading")
+    parser.add_argument("--maxTerms", type=int, default=None,
+                        help="Split queries with more author/title/abstract "
+                             "terms into several concurrent queries")
+    parser.add_argument("--maxUrlLength", type=int, default=None,
+                        help="Split queries with longer query strings into "
+                             "several concurrent queries")
+    parser.add_argument("--metrics", type=str, default=None,
+                        help="File to write counters and timings of the "
+                             "run to as json")
+    parser.add_argument("--prometheus", type=str, default=None,
+                        help="File to write counters and timings of the "
+                             "run to for Prometheus' textfile collector")
+    parser.add_argument("--profile", type=str, default=None,
+                        help="File to write a cProfile profile of the "
+                             "search and delivery to")
+    parser.add_argument("--checkpoint", type=str, default=None,
+                        help="File to keep the state of the search in after "
+                             "every page, so that a failed search is resumed "
+                             "by the next run")
     args = parser.parse_args()
+    if args.offline and (args.store is None):
+        parser.error("--offline needs a database given with --store")
 
     if args.lastNDays is None:
-        querPy = arXivQuerPy()
+        querPy = arXivQuerPy(pageSize=args.pageSize)
     else:
         querPy = arXivQuerPy(date=datetime.date.today() -
-                             datetime.timedelta(days=args.lastNDays))
+                             datetime.timedelta(days=args.lastNDays),
+                             pageSize=args.pageSize)
 
     if not (args.categories is None):
         with open(args.categories) as f:
@@ -175,13 +897,53 @@ if (__name__ == "__main__"):
             querPy.addAbstractKeywords(f.read().split())
     if not (args.abstractList is None):
         querPy.addAbstractKeywords(args.abstractList)
+    if args.rank or not (args.top is None):
+        querPy.setRanking(topK=args.top)
+    querPy.query.setShardBudget(args.maxUrlLength, args.maxTerms)
+    if not (args.checkpoint is None):
+        querPy.setCheckpoint(sC.SearchCheckpoint(args.checkpoint))
+    sent = None
+    if (not (args.sent is None)) and (not (args.email == "print")):
+        sent = sS.SentStore(args.sent)
+        querPy.setSentStore(sent, args.email)
 
-    try:
-        querPy.search(args.andNotOr)
-    except qS.EmptyQueryException:
-        exit(1)
+    store = None
+    if not (args.store is None):
+        store = eS.EntryStore(args.store)
+    if not (args.cache is None):
+        fD.setResponseCache(rC.ResponseCache(fileName=args.cache))
+    fD.setRateLimiter(rL.RateLimiter(args.rateLimit, lockFile=args.rateLock))
+    if args.parseWorkers > 0:
+        fD.setParsePool(pP.ParsePool(args.parseWorkers))
+        # pages are only parsed meanwhile if further ones are downloaded
+        args.prefetch = max(args.prefetch, 1)
+    with mT.profiled(args.profile):
+        try:
+            with mT.timer("search"):
+                if args.offline:
+                    querPy.searchIndex(
+                        eI.EntryIndex.fromStore(store,
+                                                querPy.textComp.getDate()),
+                        args.andNotOr)
+                else:
+                    querPy.search(args.andNotOr, args.prefetch, store,
+                                  args.streaming)
+        except qS.EmptyQueryException:
+            exit(1)
+        finally:
+            if not (store is None):
+                store.close()
+            if not (args.cache is None):
+                fD.responseCache.save()
+            if not (fD.parsePool is None):
+                fD.parsePool.close()
 
-    if args.email == "print":
-        querPy.printText(args.suppress)
-    else:
-        querPy.sendMail(args.email, args.suppress)
+        with mT.timer("deliver"):
+            if args.email == "print":
+                querPy.printText(args.suppress)
+            else:
+                if querPy.sendMail(args.email, args.suppress):
+                    querPy.markSent()
+                if not (sent is None):
+                    sent.close()
+    mT.report(args.metrics, args.prometheus)
@@ -0,0 +1,445 @@
+import asyncio
+import collections
+import io
+import zlib
+from http.client import parse_headers
+from urllib.error import HTTPError
+from urllib.parse import urlsplit, urljoin
+from urllib.request import urlopen
+import feedDownloader as fD
+import connectionPool as cP
+import metrics as mT
+
+
+# python 3.6 only knows the loop of the current thread
+getRunningLoop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+
+# seconds to wait for a connection or further data without a connection pool
+defaultTimeout = 60.
+
+
+class AsyncResponse():
+    """Response of a request made with fetch
+    """
+    def __init__(self, url, status, reason, headers, body):
+        """Constructor for an AsyncResponse
+
+        Parameters
+        ----------
+        url: str
+            url that answered (after redirects)
+        status: int
+            status code
+        reason: str
+            reason phrase
+        headers: http.client.HTTPMessage
+            headers of the response
+        body: bytes
+            decoded body
+        """
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def info(self):
+        """Gives the headers of the response
+        """
+        return self.headers
+
+
+async def readBody(reader, headers, timeout):
+    """Reads the body of a response as announced by its headers
+
+    Every read gives up after the timeout.
+    """
+    if headers.get("Transfer-Encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout)
+            size = int(line.split(b";")[0], 16)
+            if size == 0:
+                # trailer
+                while not ((await asyncio.wait_for(reader.readline(),
+                                                   timeout))
+                           in (b"\r\n", b"\n", b"")):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await asyncio.wait_for(reader.readexactly(size),
+                                                 timeout))
+            await asyncio.wait_for(reader.readline(), timeout)
+    length = headers.get("Content-Length")
+    if not (length is None):
+        return await asyncio.wait_for(reader.readexactly(int(length)),
+                                      timeout)
+    return await asyncio.wait_for(reader.read(), timeout)
+
+
+async def requestOnce(url, headers, timeout):
+    """Makes one GET request on a new connection
+
+    If the request fails, times out, or is cancelled before the response was
+    read, the connection is aborted.
+    """
+    parts = urlsplit(url)
+    https = parts.scheme == "https"
+    port = parts.port or (443 if https else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(
+        parts.hostname, port, ssl=True if https else None), timeout)
+    try:
+        lines = ["GET {0} HTTP/1.1".format(path),
+                 "Host: {0}".format(parts.netloc),
+                 "Connection: close"]
+        lines += ["{0}: {1}".format(name, value)
+                  for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        statusLine = (await asyncio.wait_for(reader.readline(), timeout)
+                      ).decode("latin-1").split(None, 2)
+        if len(statusLine) < 2:
+            raise HTTPError(url, 502, "Invalid status line", None, None)
+        status = int(statusLine[1])
+        reason = statusLine[2].strip() if len(statusLine) > 2 else ""
+        headerLines = []
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            headerLines.append(line)
+        message = parse_headers(io.BytesIO(b"".join(headerLines) + b"\r\n"))
+        body = await readBody(reader, message, timeout)
+    except BaseException:
+        # do not wait for the rest of the response (also when cancelled)
+        writer.transport.abort()
+        raise
+    writer.close()
+    mT.count("bytes", len(body))
+    if message.get("Content-Encoding", "").lower() == "gzip":
+        body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    return AsyncResponse(url, status, reason, message, body)
+
+
+async def fetch(url, headers=None):
+    """Requests a url without blocking, following redirects
+
+    Connections are not kept alive, as requests to arXiv's api are spaced
+    out by the rate limiter anyway. User agent, gzip encoding and timeout
+    are those of feedDownloader's connection pool.
+
+    Parameters
+    ----------
+    url: str
+        http(s) url to request
+    headers: dict
+        further headers to send
+
+    Returns
+    -------
+    response: AsyncResponse
+        response with the complete (gzip decoded) body
+
+    Raises
+    ------
+    HTTPError
+        If the server answers with a status code of 300 or above
+        (including 304 Not Modified)
+    connectionPool.TooManyRedirectsException
+        If the request is redirected too often
+    asyncio.TimeoutError
+        If connecting or a read takes longer than the timeout
+    """
+    pool = fD.connectionPool
+    requestHeaders = {"User-Agent": "arXivQuerPy",
+                      "Accept-Encoding": "gzip"}
+    timeout = defaultTimeout
+    if not (pool is None):
+        requestHeaders["User-Agent"] = pool.userAgent
+        if not pool.gzip:
+            del requestHeaders["Accept-Encoding"]
+        timeout = pool.timeout
+    requestHeaders.update(headers or {})
+    for i in range(cP.ConnectionPool.maxRedirects + 1):
+        response = await requestOnce(url, requestHeaders, timeout)
+        if response.status < 300:
+            return response
+        if not (response.status in cP.ConnectionPool.redirectCodes):
+            raise HTTPError(url, response.status, response.reason,
+                            response.headers, None)
+        url = urljoin(url, response.headers.get("Location"))
+    raise cP.TooManyRedirectsException
+
+
+async def openUrl(url, headers=None):
+    """Requests a url, rate limited like feedDownloader.openUrl
+
+    The slot reserved with the rate limiter is waited for on the event
+    loop, and throttled requests are retried the same way. Urls that are
+    not http(s) (e.g. files) are read in the default executor.
+
+    Parameters
+    ----------
+    url: str
+        url to request
+    headers: dict
+        further headers to send
+
+    Returns
+    -------
+    response: AsyncResponse
+        response with the complete body
+    """
+    if not url.startswith(("http://", "https://")):
+        body = await getRunningLoop().run_in_executor(
+            None, lambda: urlopen(url).read())
+        return AsyncResponse(url, 200, "OK", parse_headers(io.BytesIO(
+            b"\r\n")), body)
+    limiter = fD.rateLimiter
+    if limiter is None:
+        return await fetch(url, headers)
+    attempt = 0
+    while True:
+        wait = limiter.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        try:
+            return await fetch(url, headers)
+        except HTTPError as e:
+            if limiter.retryDelay(e, attempt) is None:
+                raise
+        attempt += 1
+
+
+async def downloadFeed(queryString, stopDate=None):
+    """Downloads and parses the feed for a given query string without blocking
+
+    Uses the response cache and parse pool of feedDownloader like
+    feedDownloader.downloadFeed.
+
+    Parameters
+    ----------
+    queryString: str
+        String to use for arXiv api query
+    stopDate: datetime.date
+        If given, only entries up to the first one last updated before this
+        date are parsed
+
+    Returns
+    -------
+    feed: feedparser.FeedParserDict
+        parsed feed, its entries are feedEntry.Entry records
+    """
+    feed, cached = fD.checkCache(queryString, stopDate)
+    if not (feed is None):
+        return feed
+    mT.count("requests")
+    try:
+        with mT.timer("http"):
+            response = await openUrl(queryString, fD.validators(cached))
+    except HTTPError as e:
+        if (e.code == 304) and (not (cached is None)):
+            return fD.notModified(queryString, cached)
+        raise
+    pool = fD.parsePool
+    with mT.timer("parse"):
+        if (pool is None) or (not pool.usesWorkers(response.body)):
+            feed = fD.parseBody(response.body, stopDate)
+        else:
+            feed = await asyncio.wrap_future(
+                pool.submitFeed(response.body, stopDate))
+    return fD.finishFeed(queryString, stopDate, response.info(),
+                         len(response.body), feed)
+
+
+class AsyncFeedDownloader():
+    """Downloads and parses feeds like feedDownloader.FeedDownloader, but
+    without blocking an event loop
+
+    Upcoming pages can be prefetched as tasks of the event loop, of which
+    at most maxDownloads download at the same time. Downloads that take
+    longer than the timeout are cancelled, aborting their connections.
+    """
+    def __init__(self, queryString, stopDate=None, timeout=None,
+                 maxDownloads=4):
+        """Constructor for an AsyncFeedDownloader
+
+        Parameters
+        ----------
+        queryString: str
+            String to use for arXiv api query
+        stopDate: datetime.date
+            If given, only entries up to the first one last updated before
+            this date are parsed
+        timeout: float
+            Seconds to wait for a feed (None waits as long as needed)
+        maxDownloads: int
+            Maximum number of concurrent downloads
+        """
+        self.queryString = queryString
+        self.stopDate = stopDate
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(maxDownloads)
+        self.pending = collections.OrderedDict()
+        self.feed = None
+
+    def updateQueryString(self, queryString):
+        """Change the query string
+
+        Parameters
+        ----------
+        queryString: str
+            String to use for arXiv api query
+        """
+        self.queryString = queryString
+
+    def getQueryString(self):
+        """Getter for the query string
+
+        Returns
+        -------
+        queryString: str
+            current query string
+        """
+        return self.queryString
+
+    def setStopDate(self, stopDate):
+        """Change the date after which entries are not parsed anymore
+
+        Parameters
+        ----------
+        stopDate: datetime.date
+            date (None parses all entries)
+        """
+        self.stopDate = stopDate
+
+    async def download(self, queryString):
+        """Downloads a feed once fewer than maxDownloads are running
+        """
+        async with self.semaphore:
+            return await downloadFeed(queryString, self.stopDate)
+
+    def prefetch(self, queryStrings):
+        """Starts downloading the feeds for upcoming query strings
+
+        Query strings that are already being downloaded are skipped.
+
+        Parameters
+        ----------
+        queryStrings: iterable of str
+            Strings to use for upcoming arXiv api queries
+        """
+        for queryString in queryStrings:
+            if not (queryString in self.pending):
+                self.pending[queryString] = asyncio.ensure_future(
+                    self.download(queryString))
+
+    async def updateFeed(self):
+        """Downloads the feed for the current query string
+
+        Raises
+        ------
+        asyncio.TimeoutError
+            If the feed was not downloaded within the timeout
+        """
+        download = self.pending.pop(self.queryString, None)
+        if download is None:
+            download = self.download(self.queryString)
+        self.feed = await asyncio.wait_for(download, self.timeout)
+
+    def getFeed(self):
+        """Getter for the feed
+
+        Returns
+        -------
+        feed: feedparser.FeedParserDict
+            parsed feed
+
+        Raises
+        ------
+        feedDownloader.NoDownloadedFeedException
+            If no feed was downloaded
+        """
+        if self.feed is None:
+            raise fD.NoDownloadedFeedException
+        return self.feed
+
+    def cancel(self):
+        """Cancels all prefetched downloads that were not used
+        """
+        for task in self.pending.values():
+            task.cancel()
+        self.pending.clear()
+
+
+async def searchPages(querPy, addFeed, prefetch=0, timeout=None,
+                      finish=None):
+    """Downloads the pages of a search and adds them until it is finished
+
+    Pages are requested like arXivQuerPy.iterFeeds does.
+
+    Parameters
+    ----------
+    querPy: arXivQuerPy.arXivQuerPy
+        search whose query is downloaded
+    addFeed: callable
+        Gets every page and tells whether the search is finished
+    prefetch: int
+        Number of further pages to download concurrently (all remaining
+        ones are queued once their number is known, see
+        AsyncFeedDownloader for how many download at the same time)
+    timeout: float
+        Seconds to wait for a page (None waits as long as needed)
+    finish: callable
+        Called once all pages were added (not if the search fails)
+    """
+    query = querPy.query
+    query.setDateWindow(querPy.textComp.getDate())
+    downloader = AsyncFeedDownloader(query.getSearchString(),
+                                     timeout=timeout)
+    try:
+        downloader.prefetch(querPy.upcomingSearchStrings(prefetch))
+        await downloader.updateFeed()
+        feed = downloader.getFeed()
+        total = querPy.windowTotal(feed)
+        if not (total is None):
+            prefetch = None
+        while not addFeed(feed):
+            query.nextNumberOfResults(querPy.nextPageSize())
+            if (not (total is None)) and (query.start >= total):
+                break
+            downloader.updateQueryString(query.getSearchString())
+            downloader.prefetch(querPy.upcomingSearchStrings(prefetch, total))
+            await downloader.updateFeed()
+            feed = downloader.getFeed()
+    finally:
+        downloader.cancel()
+    if not (finish is None):
+        finish()
+
+
+async def runBlocking(function, *args, timeout=None):
+    """Runs a blocking function in the default executor of the event loop
+
+    Parameters
+    ----------
+    function: callable
+        function to run, called with the further arguments
+    timeout: float
+        Seconds to wait for the function (None waits as long as needed)
+
+    Returns
+    -------
+    result:
+        return value of the function
+
+    Raises
+    ------
+    asyncio.TimeoutError
+        If the function did not return within the timeout (it still runs to
+        its end in the executor)
+    """
+    loop = getRunningLoop()
+    return await asyncio.wait_for(loop.run_in_executor(None, function, *args),
+                                  timeout)
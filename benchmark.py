@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+
+import argparse
+import calendar
+import datetime
+import io
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import timeit
+
+import queryString as qS
+import feedDownloader as fD
+import feedArchive as fA
+import streamParser as sP
+import textComposer as tC
+import mailSender as mS
+from Tests.feedServer import FeedServer
+
+
+recordedFeed = "./Tests/testFeed.xml"
+
+
+def syntheticFeed(numEntries, fileName=recordedFeed):
+    """Builds a feed of many entries from the entries of a recorded feed
+
+    The entries of the recorded feed are repeated with new ids and update
+    times one minute apart (newest first).
+
+    Parameters
+    ----------
+    numEntries: int
+        number of entries of the feed
+    fileName: str
+        path to the recorded Atom feed
+
+    Returns
+    -------
+    body: bytes
+        the feed as utf-8 encoded Atom
+    """
+    with io.open(fileName, encoding="utf-8") as f:
+        text = f.read()
+    start = text.index(u"<entry>")
+    end = text.rindex(u"</entry>") + len(u"</entry>")
+    header = re.sub(u"(<opensearch:totalResults[^>]*>)\\d+",
+                    u"\\g<1>{0:d}".format(numEntries), text[:start])
+    records = re.findall(u"<entry>.*?</entry>", text[start:end], re.DOTALL)
+    newest = calendar.timegm((2016, 8, 10, 23, 59, 59))
+    parts = [header]
+    for i in range(numEntries):
+        updated = time.strftime(u"%Y-%m-%dT%H:%M:%SZ",
+                                time.gmtime(newest - 60 * i))
+        record = re.sub(u"<id>[^<]*</id>",
+                        u"<id>http://arxiv.org/abs/1608.{0:05d}v1</id>"
+                        .format(i), records[i % len(records)], count=1)
+        record = re.sub(u"<updated>[^<]*</updated>",
+                        u"<updated>{0}</updated>".format(updated), record,
+                        count=1)
+        parts.append(record)
+        parts.append(u"\n  ")
+    parts.append(text[end:])
+    return u"".join(parts).encode("utf-8")
+
+
+def timeStage(function, repeats):
+    """Times a stage of the pipeline
+
+    Parameters
+    ----------
+    function: callable
+        runs the stage once
+    repeats: int
+        number of times to run the stage
+
+    Returns
+    -------
+    timing: dict
+        best and mean time of a run in seconds
+    """
+    times = []
+    for _ in range(repeats):
+        start = timeit.default_timer()
+        function()
+        times.append(timeit.default_timer() - start)
+    return {"best": min(times), "mean": sum(times) / len(times),
+            "repeats": repeats}
+
+
+def renderQueries(numTerms, numPages):
+    """Builds a query string and renders it for a number of pages
+    """
+    query = qS.QueryString(N=25)
+    query.addCategory("cond-mat")
+    for i in range(numTerms):
+        query.addAuthorQuery("Author{0:d}_A".format(i))
+        query.addTitleQuery("keyword{0:d}".format(i))
+    for _ in range(numPages):
+        query.getSearchString()
+        query.nextNumberOfResults(25)
+
+
+def downloadBody(url):
+    """Downloads a page, returning its connection to the pool afterwards
+    """
+    with fD.openUrl(url) as response:
+        return response.read()
+
+
+def parseFeed(body):
+    """Parses a feed completely as downloadFeed does
+    """
+    return fD.parseBody(body)
+
+
+def composeText(feed):
+    """Composes the text of a parsed feed
+    """
+    textComp = tC.TextComposer("arXiv update:\n",
+                               datetime.date(2016, 1, 1))
+    textComp.addFeed(feed)
+    return textComp.getText()
+
+
+def buildMail(text):
+    """Builds the MIME message of a text
+    """
+    msg, to = mS.composeMail(text, "benchmark@example.com")
+    return msg.as_string()
+
+
+def runBenchmarks(sizes=(10, 1000, 10000), repeats=3):
+    """Times every stage of the pipeline for feeds of several sizes
+
+    Feeds are served by a local stand-in for arXiv's api, so no network
+    access is needed. Requests are not rate limited while benchmarking.
+
+    Parameters
+    ----------
+    sizes: iterable of int
+        numbers of entries of the feeds (10 uses the recorded feed)
+    repeats: int
+        number of times every stage is run
+
+    Returns
+    -------
+    results: list of dict
+        stage, number of entries, and timing of every benchmark
+    """
+    handle, archive = tempfile.mkstemp(suffix=".archive")
+    os.close(handle)
+    try:
+        results = [dict(stage="queryString", entries=0,
+                        **timeStage(lambda: renderQueries(100, 100),
+                                    repeats))]
+        for size in sizes:
+            if size == 10:
+                with open(recordedFeed, "rb") as f:
+                    body = f.read()
+            else:
+                body = syntheticFeed(size)
+            feed = parseFeed(body)
+            text = composeText(feed)
+            fA.saveFeed(feed, archive)
+            with FeedServer(gzip=False) as server:
+                server.body = body
+                url = server.url()
+                stages = [
+                    ("download", lambda: downloadBody(url)),
+                    ("parse", lambda: parseFeed(body)),
+                    ("streamingParse",
+                     lambda: sP.parseUntil(io.BytesIO(body))),
+                    ("loadFeed", lambda: fA.loadFeed(archive)),
+                    ("compose", lambda: composeText(feed)),
+                    ("mail", lambda: buildMail(text)),
+                    ("pipeline",
+                     lambda: buildMail(composeText(fD.downloadFeed(url))))]
+                for stage, function in stages:
+                    timing = timeStage(function, repeats)
+                    results.append(dict(stage=stage,
+                                        entries=len(feed.entries),
+                                        bytes=len(body), **timing))
+                if not (fD.connectionPool is None):
+                    # the idle connections are to this server
+                    fD.connectionPool.close()
+    finally:
+        os.remove(archive)
+    return results
+
+
+def findRegressions(results, baseline, tolerance=0.2):
+    """Compares results to earlier ones
+
+    Parameters
+    ----------
+    results: list of dict
+        results of runBenchmarks
+    baseline: list of dict
+        earlier results of runBenchmarks
+    tolerance: float
+        relative slowdown of the best time still accepted
+
+    Returns
+    -------
+    regressions: list of dict
+        stage, number of entries, and best times of the slower benchmarks
+    """
+    earlier = dict(((result["stage"], result["entries"]), result["best"])
+                   for result in baseline)
+    regressions = []
+    for result in results:
+        key = (result["stage"], result["entries"])
+        if (key in earlier) and (result["best"]
+                                 > (1. + tolerance) * earlier[key]):
+            regressions.append({"stage": result["stage"],
+                                "entries": result["entries"],
+                                "best": result["best"],
+                                "baseline": earlier[key]})
+    return regressions
+
+
+if (__name__ == "__main__"):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs='+',
+                        default=[10, 1000, 10000],
+                        help="Numbers of entries of the benchmarked feeds")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="Number of runs of every stage")
+    parser.add_argument("--output", type=str, default=None,
+                        help="File to write the results to as json "
+                             "(stdout if not given)")
+    parser.add_argument("--baseline", type=str, default=None,
+                        help="Results of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Relative slowdown accepted compared to the "
+                             "baseline")
+    args = parser.parse_args()
+
+    report = {"python": platform.python_version(),
+              "timestamp": time.time(),
+              "results": runBenchmarks(args.sizes, args.repeats)}
+    if not (args.baseline is None):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        report["regressions"] = findRegressions(report["results"], baseline,
+                                                args.tolerance)
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if len(report.get("regressions", [])) > 0:
+        sys.exit(1)
@@ -0,0 +1,287 @@
+import collections
+import socket
+import threading
+import zlib
+try:
+    import http.client as httplib
+    from urllib.parse import urlsplit, urljoin
+    from urllib.error import HTTPError
+except ImportError:
+    import httplib
+    from urlparse import urlsplit, urljoin
+    from urllib2 import HTTPError
+
+
+class TooManyRedirectsException(Exception):
+    """Raised when a request is redirected too often
+    """
+
+
+class PooledResponse():
+    """File-like response whose connection goes back to the pool once read
+
+    Gzip encoded bodies are decompressed while they are read; numRawBytes
+    counts the (compressed) bytes received. If the response is closed before
+    it was read completely, its connection is closed instead of being
+    reused.
+    """
+    def __init__(self, pool, key, connection, response):
+        """Constructor for a PooledResponse
+
+        Parameters
+        ----------
+        pool: ConnectionPool
+            pool the connection belongs to
+        key: tuple
+            (scheme, host, port) the connection is for
+        connection: httplib.HTTPConnection
+            connection the response was received on
+        response: httplib.HTTPResponse
+            response to read from
+        """
+        self.pool = pool
+        self.key = key
+        self.connection = connection
+        self.response = response
+        self.decompressor = None
+        if response.getheader("Content-Encoding", "").lower() == "gzip":
+            self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self.buffer = b""
+        self.exhausted = False
+        self.closed = False
+        self.numRawBytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def info(self):
+        """Gives the headers of the response
+        """
+        return self.response.msg
+
+    def __readRaw(self, size):
+        """Reads (at most size) undecoded bytes from the response
+        """
+        if self.exhausted:
+            return b""
+        if size < 0:
+            data = self.response.read()
+        else:
+            data = self.response.read(size)
+        if (size < 0) or (len(data) == 0):
+            self.exhausted = True
+        self.numRawBytes += len(data)
+        return data
+
+    def read(self, size=-1):
+        """Reads (at most size) decoded bytes from the response
+
+        Parameters
+        ----------
+        size: int
+            Maximum number of bytes to read, all if negative
+
+        Returns
+        -------
+        data: bytes
+            decoded bytes (empty once the response is read completely)
+        """
+        if self.decompressor is None:
+            return self.__readRaw(size)
+        while ((size < 0) or (len(self.buffer) < size)) and \
+                not self.exhausted:
+            data = self.__readRaw(size if size < 0 else max(size, 8192))
+            if len(data) > 0:
+                self.buffer += self.decompressor.decompress(data)
+            else:
+                self.buffer += self.decompressor.flush()
+        if size < 0:
+            data, self.buffer = self.buffer, b""
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def close(self):
+        """Closes the response, returning its connection to the pool
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if self.exhausted or self.response.isclosed():
+            self.response.close()
+            self.pool.release(self.key, self.connection,
+                              self.response.will_close)
+        else:
+            self.response.close()
+            self.connection.close()
+
+
+class ConnectionPool():
+    """Pool of persistent (keep-alive) HTTP connections
+
+    Connections are kept per (scheme, host, port) and shared between all
+    threads using the pool, so that consecutive requests to the same host
+    do not open new connections. Responses are requested gzip encoded.
+    """
+    redirectCodes = (301, 302, 303, 307, 308)
+    maxRedirects = 5
+
+    def __init__(self, maxIdlePerHost=4, timeout=60., gzip=True,
+                 userAgent="arXivQuerPy"):
+        """Constructor for a ConnectionPool
+
+        Parameters
+        ----------
+        maxIdlePerHost: int
+            Maximum number of idle connections kept per host
+        timeout: float
+            Seconds to wait for a connection or a response
+        gzip: bool
+            Indicates if responses are requested gzip encoded
+        userAgent: str
+            User-Agent header sent with every request
+        """
+        self.maxIdlePerHost = maxIdlePerHost
+        self.timeout = timeout
+        self.gzip = gzip
+        self.userAgent = userAgent
+        self.idle = collections.defaultdict(list)
+        self.lock = threading.Lock()
+        self.numConnections = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __connect(self, key):
+        """Opens a new connection for (scheme, host, port)
+        """
+        scheme, host, port = key
+        if scheme == "https":
+            connection = httplib.HTTPSConnection(host, port,
+                                                 timeout=self.timeout)
+        else:
+            connection = httplib.HTTPConnection(host, port,
+                                                timeout=self.timeout)
+        with self.lock:
+            self.numConnections += 1
+        return connection
+
+    def acquire(self, key):
+        """Takes an idle connection for (scheme, host, port) or opens one
+
+        Parameters
+        ----------
+        key: tuple
+            (scheme, host, port) to connect to
+
+        Returns
+        -------
+        connection: httplib.HTTPConnection
+            connection to use
+        reused: bool
+            Indicates if the connection was used before
+        """
+        with self.lock:
+            if len(self.idle[key]) > 0:
+                return self.idle[key].pop(), True
+        return self.__connect(key), False
+
+    def release(self, key, connection, willClose=False):
+        """Returns a connection to the pool after its response was read
+
+        Parameters
+        ----------
+        key: tuple
+            (scheme, host, port) of the connection
+        connection: httplib.HTTPConnection
+            connection to return
+        willClose: bool
+            Indicates if the server is closing the connection
+        """
+        with self.lock:
+            if (not willClose) and \
+                    (len(self.idle[key]) < self.maxIdlePerHost):
+                self.idle[key].append(connection)
+                return
+        connection.close()
+
+    def __request(self, key, path, headers):
+        """Sends a request, retrying once if a reused connection was stale
+        """
+        connection, reused = self.acquire(key)
+        try:
+            connection.request("GET", path, headers=headers)
+            return connection, connection.getresponse()
+        except (httplib.HTTPException, socket.error):
+            connection.close()
+            if not reused:
+                raise
+        connection = self.__connect(key)
+        try:
+            connection.request("GET", path, headers=headers)
+            return connection, connection.getresponse()
+        except (httplib.HTTPException, socket.error):
+            connection.close()
+            raise
+
+    def open(self, url, headers=None):
+        """Requests a url, following redirects
+
+        Parameters
+        ----------
+        url: str
+            http(s) url to request
+        headers: dict
+            further headers to send
+
+        Returns
+        -------
+        response: PooledResponse
+            file-like response (close it to release its connection)
+
+        Raises
+        ------
+        HTTPError
+            If the server answers with a status code of 300 or above
+            (including 304 Not Modified)
+        TooManyRedirectsException
+            If the request is redirected too often
+        """
+        for i in range(self.maxRedirects + 1):
+            parts = urlsplit(url)
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            key = (parts.scheme, parts.hostname, port)
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+            requestHeaders = {"User-Agent": self.userAgent}
+            if self.gzip:
+                requestHeaders["Accept-Encoding"] = "gzip"
+            requestHeaders.update(headers or {})
+            connection, response = self.__request(key, path, requestHeaders)
+            pooled = PooledResponse(self, key, connection, response)
+            if response.status < 300:
+                return pooled
+            pooled.read()
+            pooled.close()
+            if not (response.status in self.redirectCodes):
+                raise HTTPError(url, response.status, response.reason,
+                                response.msg, None)
+            url = urljoin(url, response.getheader("Location"))
+        raise TooManyRedirectsException
+
+    def close(self):
+        """Closes all idle connections
+        """
+        with self.lock:
+            connections = [connection for idle in self.idle.values()
+                           for connection in idle]
+            self.idle.clear()
+        for connection in connections:
+            connection.close()
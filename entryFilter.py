@@ -0,0 +1,182 @@
+import re
+import feedparser
+import feedEntry as fE
+
+
+def tokenize(text):
+    """Splits a text into lower case words
+
+    Parameters
+    ----------
+    text: str
+        text to split
+
+    Returns
+    -------
+    words: list
+        lower case words of the text
+    """
+    return re.findall(r"\w+", text.lower(), re.UNICODE)
+
+
+def authorMatches(authorQuery, authorName):
+    """Checks if an author name matches an arXiv author query
+
+    Author queries are either a (sur)name or of the form Surname_Initials as
+    used by arXiv's api (e.g. Mustermann_M).
+
+    Parameters
+    ----------
+    authorQuery: str
+        author to search for
+    authorName: str
+        full name of an author of an entry
+
+    Returns
+    -------
+    matches: bool
+        Indicates if the author name matches the query
+    """
+    nameWords = tokenize(authorName)
+    if len(nameWords) == 0:
+        return False
+    surname, _, initials = authorQuery.partition("_")
+    surnameWords = tokenize(surname)
+    if len(surnameWords) == 0:
+        return False
+    if not initials:
+        return all(word in nameWords for word in surnameWords)
+    if nameWords[-len(surnameWords):] != surnameWords:
+        return False
+    firstNames = nameWords[:-len(surnameWords)]
+    initials = tokenize(initials)
+    if len(initials) == 0:
+        return True
+    return (len(firstNames) > 0
+            and firstNames[0].startswith(initials[0][0]))
+
+
+class EntryFilter():
+    """Filters feed entries locally with the queries of a QueryString
+
+    Mirrors the search of arXiv's api: The queries of a field are connected
+    by the field connector of the QueryString, title and abstract queries are
+    or-connected, the author and title/abstract blocks are connected by the
+    connector of the QueryString, and an entry has to be in one of the
+    categories (or one of their subcategories), if any are given. Queries of
+    several words are phrases, whose words have to appear in this order.
+    """
+    def __init__(self, queryString):
+        """Constructor for an EntryFilter
+
+        Parameters
+        ----------
+        queryString: queryString.QueryString
+            QueryString whose queries and categories are used for filtering
+        """
+        self.authors = list(queryString.getAllAuthorQueries())
+        self.titleWords = [tokenize(query)
+                           for query in queryString.getAllTitleQueries()]
+        self.abstractWords = [tokenize(query)
+                              for query in queryString.getAllAbstractQueries()]
+        self.categories = list(queryString.getAllCategories())
+        self.connector = queryString.connector
+        self.fieldConnectors = {field: queryString.getFieldConnector(field)
+                                for field in ("au", "ti", "abs")}
+
+    def __matchesWords(self, wordQueries, text, connector):
+        """Checks if any (or all) of the phrases are in the text
+        """
+        textWords = tokenize(text)
+        textWordSet = set(textWords)
+        matches = []
+        for words in wordQueries:
+            if len(words) == 0:
+                continue
+            if len(words) == 1:
+                matches.append(words[0] in textWordSet)
+            else:
+                matches.append(any(textWords[i:i + len(words)] == words
+                                   for i in range(len(textWords)
+                                                  - len(words) + 1)))
+        if connector == "and":
+            return (len(matches) > 0) and all(matches)
+        return any(matches)
+
+    def __matchesAuthors(self, entry):
+        """Checks if one (or all) of the authors searched for wrote the entry
+        """
+        matches = [any(authorMatches(query, author)
+                       for author in entry.authors)
+                   for query in self.authors]
+        if self.fieldConnectors["au"] == "and":
+            return all(matches)
+        return any(matches)
+
+    def __matchesTitleOrAbstract(self, entry):
+        """Checks if the title or abstract queries match the entry
+        """
+        return (self.__matchesWords(self.titleWords, entry.title,
+                                    self.fieldConnectors["ti"])
+                or self.__matchesWords(self.abstractWords, entry.summary,
+                                       self.fieldConnectors["abs"]))
+
+    def __matchesCategories(self, entry):
+        """Checks if the entry is in one of the categories searched in
+        """
+        if len(self.categories) == 0:
+            return True
+        for term in entry.categories:
+            for category in self.categories:
+                if (term == category) or term.startswith(category + "."):
+                    return True
+        return False
+
+    def matches(self, entry):
+        """Checks if an entry matches the queries
+
+        Parameters
+        ----------
+        entry: feedEntry.Entry or feedparser.FeedParserDict
+            entry of a feed
+
+        Returns
+        -------
+        matches: bool
+            Indicates if arXiv's api would have returned the entry
+        """
+        entry = fE.toEntry(entry)
+        if not self.__matchesCategories(entry):
+            return False
+        authors = (len(self.authors) > 0)
+        titlesOrAbstracts = ((len(self.titleWords) > 0)
+                             or (len(self.abstractWords) > 0))
+        if authors and titlesOrAbstracts:
+            if self.connector == "and":
+                return (self.__matchesAuthors(entry)
+                        and self.__matchesTitleOrAbstract(entry))
+            return (self.__matchesAuthors(entry)
+                    or self.__matchesTitleOrAbstract(entry))
+        if authors:
+            return self.__matchesAuthors(entry)
+        if titlesOrAbstracts:
+            return self.__matchesTitleOrAbstract(entry)
+        return True
+
+    def filterFeed(self, feed):
+        """Gives a copy of a feed only containing the matching entries
+
+        Parameters
+        ----------
+        feed: feedparser.FeedParserDict
+            feed to filter
+
+        Returns
+        -------
+        filteredFeed: feedparser.FeedParserDict
+            feed with the same header, but only the matching entries
+        """
+        filteredFeed = feedparser.FeedParserDict(feed)
+        filteredFeed["entries"] = [entry for entry in feed.entries
+                                   if self.matches(entry)]
+        return filteredFeed
@@ -0,0 +1,210 @@
+import calendar
+import feedparser
+import entryFilter as eF
+import feedEntry as fE
+
+
+class EntryIndex():
+    """In-memory inverted index over feed entries
+
+    Maps the words of titles, abstracts, and author names as well as the
+    categories to the arXiv ids of the entries containing them, so that the
+    queries of a QueryString can be answered locally without a download.
+    The index narrows down the candidates, which are then checked with an
+    entryFilter.EntryFilter, so the results are the same as filtering all
+    entries.
+    """
+    fields = ("ti", "abs", "au")
+
+    def __init__(self, entries=()):
+        """Constructor for an EntryIndex
+
+        Parameters
+        ----------
+        entries: iterable of feedEntry.Entry or feedparser.FeedParserDict
+            entries to index right away
+        """
+        self.entries = {}
+        self.versions = {}
+        self.postings = {field: {} for field in self.fields + ("cat",)}
+        self.addEntries(entries)
+
+    @classmethod
+    def fromStore(cls, store, date=None):
+        """Creates an index of the entries of an EntryStore
+
+        Parameters
+        ----------
+        store: entryStore.EntryStore
+            store to index the entries of
+        date: datetime.date
+            date until when to go back (None indexes all entries)
+
+        Returns
+        -------
+        index: EntryIndex
+            index of the stored entries
+        """
+        return cls(store.getEntries(date))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __terms(self, entry):
+        """Gives the indexed terms of an entry per field
+        """
+        authorWords = set()
+        for author in entry.authors:
+            authorWords.update(eF.tokenize(author))
+        categories = set()
+        for category in entry.categories:
+            parts = category.split(".")
+            for i in range(len(parts)):
+                categories.add(".".join(parts[:i + 1]))
+        return {"ti": set(eF.tokenize(entry.title)),
+                "abs": set(eF.tokenize(entry.summary)),
+                "au": authorWords,
+                "cat": categories}
+
+    def __remove(self, arxivId):
+        """Removes an entry from the postings
+        """
+        for field, terms in self.__terms(self.entries[arxivId]).items():
+            postings = self.postings[field]
+            for term in terms:
+                postings[term].discard(arxivId)
+                if len(postings[term]) == 0:
+                    del postings[term]
+        del self.entries[arxivId]
+        del self.versions[arxivId]
+
+    def addEntries(self, entries):
+        """Adds entries to the index
+
+        Entries already in the index are only replaced by newer updates.
+
+        Parameters
+        ----------
+        entries: iterable of feedEntry.Entry or feedparser.FeedParserDict
+            entries of a feed
+        """
+        for entry in entries:
+            entry = fE.toEntry(entry)
+            arxivId, version = fE.splitArxivId(entry.id)
+            key = (tuple(entry.updated_parsed), version)
+            if arxivId in self.entries:
+                if key <= self.versions[arxivId]:
+                    continue
+                self.__remove(arxivId)
+            self.entries[arxivId] = entry
+            self.versions[arxivId] = key
+            for field, terms in self.__terms(entry).items():
+                postings = self.postings[field]
+                for term in terms:
+                    postings.setdefault(term, set()).add(arxivId)
+
+    def __lookup(self, field, words):
+        """Gives the ids of the entries containing all words in a field
+        """
+        if len(words) == 0:
+            return set()
+        postings = self.postings[field]
+        ids = set(postings.get(words[0], ()))
+        for word in words[1:]:
+            ids &= postings.get(word, set())
+        return ids
+
+    def __fieldCandidates(self, queryString, field, queries):
+        """Gives the ids of the entries possibly matching a field's queries
+        """
+        if field == "au":
+            words = [eF.tokenize(query.partition("_")[0])
+                     for query in queries]
+        else:
+            words = [eF.tokenize(query) for query in queries]
+        matches = [self.__lookup(field, queryWords) for queryWords in words]
+        if queryString.getFieldConnector(field) == "and":
+            return set.intersection(*matches)
+        return set.union(*matches)
+
+    def __candidates(self, queryString):
+        """Gives the ids of the entries possibly matching a query string
+        """
+        queries = {"au": queryString.getAllAuthorQueries(),
+                   "ti": queryString.getAllTitleQueries(),
+                   "abs": queryString.getAllAbstractQueries()}
+        blocks = []
+        if len(queries["au"]) > 0:
+            blocks.append(self.__fieldCandidates(queryString, "au",
+                                                 queries["au"]))
+        texts = [self.__fieldCandidates(queryString, field, queries[field])
+                 for field in ("ti", "abs") if len(queries[field]) > 0]
+        if len(texts) > 0:
+            blocks.append(set.union(*texts))
+        if len(blocks) == 0:
+            candidates = set(self.entries)
+        elif queryString.connector == "and":
+            candidates = set.intersection(*blocks)
+        else:
+            candidates = set.union(*blocks)
+        categories = queryString.getAllCategories()
+        if len(categories) > 0:
+            candidates &= set().union(*[self.postings["cat"].get(category,
+                                                                 set())
+                                        for category in categories])
+        return candidates
+
+    def getEntries(self, queryString, date=None):
+        """Gives the indexed entries matching a query string
+
+        Parameters
+        ----------
+        queryString: queryString.QueryString
+            QueryString whose queries and categories are searched for
+        date: datetime.date
+            date until when to go back (None gives all matching entries)
+
+        Returns
+        -------
+        entries: list of feedEntry.Entry
+            matching entries sorted by their last update, newest first
+
+        Raises
+        ------
+        EmptyQueryException
+            If there are neither querys nor categories to search for.
+        """
+        queryString.getQueryKey()
+        since = None
+        if not (date is None):
+            since = calendar.timegm(date.timetuple())
+        entryFilter = eF.EntryFilter(queryString)
+        entries = []
+        for arxivId in self.__candidates(queryString):
+            entry = self.entries[arxivId]
+            if ((since is None)
+                    or (calendar.timegm(entry.updated_parsed) >= since)):
+                if entryFilter.matches(entry):
+                    entries.append(entry)
+        entries.sort(key=lambda entry: tuple(entry.updated_parsed),
+                     reverse=True)
+        return entries
+
+    def getFeed(self, queryString, date=None):
+        """Gives the indexed entries matching a query string as one feed
+
+        Parameters
+        ----------
+        queryString: queryString.QueryString
+            QueryString whose queries and categories are searched for
+        date: datetime.date
+            date until when to go back (None gives all matching entries)
+
+        Returns
+        -------
+        feed: feedparser.FeedParserDict
+            feed containing the matching entries, newest first
+        """
+        return feedparser.FeedParserDict(
+            feed=feedparser.FeedParserDict(),
+            entries=self.getEntries(queryString, date))
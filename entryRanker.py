@@ -0,0 +1,137 @@
+import collections
+import math
+import entryFilter as eF
+import feedEntry as fE
+
+
+class EntryRanker():
+    """Ranks feed entries by their relevance for the queries of a QueryString
+
+    Titles and abstracts are scored against the title and abstract queries
+    with BM25 (title matches weighted higher), and every author query that
+    matches one of the authors of an entry adds a fixed bonus. Term counts
+    and document frequencies are computed once for all entries, so ranking
+    the same entries for many QueryStrings only has to look up the few terms
+    of their queries.
+    """
+    k1 = 1.2
+    b = 0.75
+    titleWeight = 2.
+    authorBonus = 5.
+
+    def __init__(self, entries):
+        """Constructor for an EntryRanker
+
+        Parameters
+        ----------
+        entries: iterable of feedEntry.Entry or feedparser.FeedParserDict
+            entries to rank (their statistics weight the terms)
+        """
+        self.entries = [fE.toEntry(entry) for entry in entries]
+        self.counts = {"ti": [], "abs": []}
+        self.lengths = {"ti": [], "abs": []}
+        self.documentFrequencies = {"ti": collections.Counter(),
+                                    "abs": collections.Counter()}
+        for entry in self.entries:
+            for field, text in (("ti", entry.title), ("abs", entry.summary)):
+                words = eF.tokenize(text)
+                counts = collections.Counter(words)
+                self.counts[field].append(counts)
+                self.lengths[field].append(len(words))
+                self.documentFrequencies[field].update(counts.keys())
+        self.averageLengths = {
+            field: (float(sum(lengths)) / len(lengths)
+                    if len(lengths) > 0 else 0.)
+            for field, lengths in self.lengths.items()}
+        self.positions = dict((entry.id, i)
+                              for i, entry in enumerate(self.entries))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __idf(self, field, word):
+        """Gives the inverse document frequency of a word in a field
+        """
+        n = self.documentFrequencies[field][word]
+        return math.log(1. + (len(self.entries) - n + 0.5) / (n + 0.5))
+
+    def __fieldScores(self, field, words, positions):
+        """Gives the BM25 scores of a field of the entries at the positions
+        """
+        scores = [0.] * len(positions)
+        averageLength = self.averageLengths[field] or 1.
+        for word in set(words):
+            idf = self.__idf(field, word)
+            for j, i in enumerate(positions):
+                tf = self.counts[field][i].get(word, 0)
+                if tf > 0:
+                    norm = self.k1 * (1. - self.b + self.b
+                                      * self.lengths[field][i]
+                                      / averageLength)
+                    scores[j] += idf * tf * (self.k1 + 1.) / (tf + norm)
+        return scores
+
+    def score(self, queryString, entries=None):
+        """Scores entries against the queries of a QueryString
+
+        Parameters
+        ----------
+        queryString: queryString.QueryString
+            QueryString whose author, title, and abstract queries are scored
+        entries: list of feedEntry.Entry or feedparser.FeedParserDict
+            entries (given to the constructor) to score, all if None
+
+        Returns
+        -------
+        scores: list of float
+            scores of the entries, higher is more relevant
+        """
+        if entries is None:
+            entries = self.entries
+        entries = [fE.toEntry(entry) for entry in entries]
+        positions = [self.positions[entry.id] for entry in entries]
+        words = {"ti": [], "abs": []}
+        for field, queries in (("ti", queryString.getAllTitleQueries()),
+                               ("abs", queryString.getAllAbstractQueries())):
+            for query in queries:
+                words[field].extend(eF.tokenize(query))
+        titleScores = self.__fieldScores("ti", words["ti"], positions)
+        abstractScores = self.__fieldScores("abs", words["abs"], positions)
+        authors = queryString.getAllAuthorQueries()
+        scores = []
+        for entry, titleScore, abstractScore in zip(entries, titleScores,
+                                                    abstractScores):
+            matches = sum(1 for query in authors
+                          if any(eF.authorMatches(query, author)
+                                 for author in entry.authors))
+            scores.append(self.titleWeight * titleScore + abstractScore
+                          + self.authorBonus * matches)
+        return scores
+
+    def rank(self, queryString, entries=None, topK=None):
+        """Sorts entries by their relevance for a QueryString
+
+        Entries with the same score keep their order.
+
+        Parameters
+        ----------
+        queryString: queryString.QueryString
+            QueryString whose author, title, and abstract queries are scored
+        entries: list of feedEntry.Entry or feedparser.FeedParserDict
+            entries (given to the constructor) to rank, all if None
+        topK: int
+            Only give this many of the most relevant entries (all if None)
+
+        Returns
+        -------
+        entries: list of feedEntry.Entry
+            entries, most relevant first
+        """
+        if entries is None:
+            entries = self.entries
+        entries = [fE.toEntry(entry) for entry in entries]
+        scores = self.score(queryString, entries)
+        order = sorted(range(len(entries)), key=lambda i: -scores[i])
+        if not (topK is None):
+            order = order[:topK]
+        return [entries[i] for i in order]
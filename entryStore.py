@@ -0,0 +1,165 @@
+import calendar
+import datetime
+import json
+import sqlite3
+import time
+import feedparser
+import feedEntry as fE
+
+
+class EntryStore():
+    """On-disk store of feed entries keyed by arXiv id
+
+    Keeps the newest version of every entry in a SQLite database together
+    with the state of previous downloads (per query), so that later searches
+    only have to download entries that were updated since.
+    """
+    def __init__(self, fileName=r"./entries.sqlite"):
+        """Constructor for an EntryStore
+
+        Parameters
+        ----------
+        fileName: str
+            path to the database (created if it does not exist)
+        """
+        self.fileName = fileName
+        self.connection = sqlite3.connect(fileName)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "arxivId TEXT PRIMARY KEY, version INTEGER, updated REAL, "
+            "entryId TEXT, title TEXT, authors TEXT, link TEXT, "
+            "summary TEXT, categories TEXT)")
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS entriesUpdated ON entries (updated)")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS syncs ("
+            "queryKey TEXT PRIMARY KEY, since TEXT, highWaterMark REAL)")
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        """Closes the database
+        """
+        self.connection.close()
+
+    def addEntries(self, entries):
+        """Adds entries to the store
+
+        Entries already in the store are only replaced by newer updates.
+
+        Parameters
+        ----------
+        entries: list of feedEntry.Entry or feedparser.FeedParserDict
+            entries of a feed
+        """
+        rows = []
+        for entry in entries:
+            entry = fE.toEntry(entry)
+            arxivId, version = fE.splitArxivId(entry.id)
+            rows.append((arxivId, version,
+                         calendar.timegm(entry.updated_parsed), entry.id,
+                         entry.title, json.dumps(entry.authors),
+                         entry.link, entry.summary,
+                         json.dumps(entry.categories)))
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO entries "
+            "SELECT ?, ?, ?, ?, ?, ?, ?, ?, ? WHERE NOT EXISTS "
+            "(SELECT 1 FROM entries WHERE arxivId = ? AND updated > ?)",
+            [row + (row[0], row[2]) for row in rows])
+        self.connection.commit()
+
+    def getEntries(self, date=None):
+        """Gives all stored entries updated since a date
+
+        Parameters
+        ----------
+        date: datetime.date
+            date until when to go back (None gives all entries)
+
+        Returns
+        -------
+        entries: list of feedEntry.Entry
+            entries sorted by their last update, newest first
+        """
+        since = 0
+        if not (date is None):
+            since = calendar.timegm(date.timetuple())
+        rows = self.connection.execute(
+            "SELECT updated, entryId, title, authors, link, summary, "
+            "categories FROM entries WHERE updated >= ? "
+            "ORDER BY updated DESC", (since,))
+        return [fE.Entry(entryId, title, json.loads(authors), link, summary,
+                         time.gmtime(updated), json.loads(categories))
+                for (updated, entryId, title, authors, link, summary,
+                     categories) in rows]
+
+    def getFeed(self, date=None):
+        """Gives all stored entries updated since a date as one feed
+
+        Parameters
+        ----------
+        date: datetime.date
+            date until when to go back (None gives all entries)
+
+        Returns
+        -------
+        feed: feedparser.FeedParserDict
+            feed containing the entries, newest first
+        """
+        return feedparser.FeedParserDict(feed=feedparser.FeedParserDict(),
+                                         entries=self.getEntries(date))
+
+    def getSync(self, queryKey):
+        """Gives the state of previous downloads for a query
+
+        Parameters
+        ----------
+        queryKey: str
+            key of the query (see QueryString.getQueryKey)
+
+        Returns
+        -------
+        sync: tuple
+            None if the query was never downloaded, otherwise the date back to
+            which all results of the query are stored (None if all results are
+            stored) and the time stamp of the newest update downloaded for the
+            query
+        """
+        row = self.connection.execute(
+            "SELECT since, highWaterMark FROM syncs WHERE queryKey = ?",
+            (queryKey,)).fetchone()
+        if row is None:
+            return None
+        since, highWaterMark = row
+        if not (since is None):
+            since = datetime.datetime.strptime(since, "%Y-%m-%d").date()
+        return since, highWaterMark
+
+    def setSync(self, queryKey, since, highWaterMark):
+        """Records the state of the downloads for a query
+
+        Parameters
+        ----------
+        queryKey: str
+            key of the query (see QueryString.getQueryKey)
+        since: datetime.date
+            date back to which all results of the query are stored (None if
+            all results are stored)
+        highWaterMark: float
+            time stamp of the newest update downloaded for the query
+        """
+        if not (since is None):
+            since = since.isoformat()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO syncs VALUES (?, ?, ?)",
+            (queryKey, since, highWaterMark))
+        self.connection.commit()
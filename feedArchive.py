@@ -0,0 +1,255 @@
+import calendar
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+import feedparser
+import feedEntry as fE
+
+
+class NotAFeedArchiveException(ValueError):
+    """Raised when a file is not a feed archive
+    """
+
+
+magic = b"AQPYFEED"
+version = 1
+columns = ("id", "title", "authors", "link", "summary", "updated",
+           "categories")
+headerFormat = struct.Struct(">I")
+
+
+def isFeedArchive(fileName):
+    """Checks whether a file is a feed archive (and not e.g. a pickle)
+
+    Parameters
+    ----------
+    fileName: str
+        path to the file
+
+    Returns
+    -------
+    archive: bool
+        Indicates if the file starts like a feed archive
+    """
+    with open(fileName, "rb") as f:
+        return f.read(len(magic)) == magic
+
+
+def encodeValue(value):
+    """Marks the time stamps in a value of the feed header, so that they are
+    restored by decodeObject (json would store them as lists)
+    """
+    if isinstance(value, time.struct_time):
+        return {"__struct_time__": calendar.timegm(value)}
+    if isinstance(value, dict):
+        return dict((key, encodeValue(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [encodeValue(item) for item in value]
+    return value
+
+
+def decodeObject(obj):
+    """Restores time stamps and the dict type of the feed header (json
+    object_hook)
+    """
+    if list(obj.keys()) == ["__struct_time__"]:
+        return time.gmtime(obj["__struct_time__"])
+    return feedparser.FeedParserDict(obj)
+
+
+def encodeColumn(values, compress):
+    """Gives the bytes a column is stored as
+    """
+    data = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    if compress:
+        data = zlib.compress(data)
+    return data
+
+
+def saveFeed(feed, fileName, compress=True):
+    """Saves a feed as archive
+
+    The entries are stored column by column (ids, titles, ..., summaries),
+    so that a column can be read without reading the others. Everything
+    besides the entries (the feed header and the like) is kept as far as it
+    can be stored as json. The file is replaced atomically (on POSIX
+    systems), so it never holds a partly written archive.
+
+    Parameters
+    ----------
+    feed: feedparser.FeedParserDict
+        feed to save, its entries can be feedEntry.Entry records
+    fileName: str
+        path to write to
+    compress: bool
+        compress the columns with zlib
+    """
+    entries = [fE.toEntry(entry) for entry in feed.get("entries", [])]
+    values = {"id": [entry.id for entry in entries],
+              "title": [entry.title for entry in entries],
+              "authors": [list(entry.authors) for entry in entries],
+              "link": [entry.link for entry in entries],
+              "summary": [entry.summary for entry in entries],
+              "updated": [calendar.timegm(entry.updated_parsed)
+                          for entry in entries],
+              "categories": [list(entry.categories) for entry in entries]}
+    info = {}
+    for key, value in feed.items():
+        if key == "entries":
+            continue
+        value = encodeValue(value)
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            continue
+        info[key] = value
+    blobs = []
+    offsets = {}
+    offset = 0
+    for name in columns:
+        blob = encodeColumn(values[name], compress)
+        offsets[name] = [offset, len(blob)]
+        offset += len(blob)
+        blobs.append(blob)
+    header = json.dumps({"version": version, "compressed": compress,
+                         "numEntries": len(entries), "columns": offsets,
+                         "info": info}).encode("utf-8")
+    temporary = fileName + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(magic)
+        f.write(headerFormat.pack(len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.rename(temporary, fileName)
+
+
+def loadFeed(fileName):
+    """Loads a feed saved as archive
+
+    Parameters
+    ----------
+    fileName: str
+        path to the archive
+
+    Returns
+    -------
+    feed: feedparser.FeedParserDict
+        saved feed, its entries are feedEntry.Entry records
+
+    Raises
+    ------
+    NotAFeedArchiveException
+        If the file is not a feed archive
+    """
+    with FeedArchive(fileName) as archive:
+        return archive.getFeed()
+
+
+class FeedArchive():
+    """Feed saved as archive whose columns are read when they are needed
+
+    The file is memory mapped and only the columns asked for are decoded, so
+    e.g. the ids and update times of a large archive are read without
+    decoding all summaries.
+    """
+    def __init__(self, fileName):
+        """Constructor for a FeedArchive
+
+        Parameters
+        ----------
+        fileName: str
+            path to the archive
+
+        Raises
+        ------
+        NotAFeedArchiveException
+            If the file is not a feed archive
+        """
+        self.fileName = fileName
+        self.file = open(fileName, "rb")
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file
+            self.file.close()
+            raise NotAFeedArchiveException
+        start = len(magic) + headerFormat.size
+        if not (self.data[:len(magic)] == magic):
+            self.close()
+            raise NotAFeedArchiveException
+        length, = headerFormat.unpack(self.data[len(magic):start])
+        header = json.loads(self.data[start:start + length].decode("utf-8"),
+                            object_hook=decodeObject)
+        if header["version"] > version:
+            self.close()
+            raise NotAFeedArchiveException
+        self.compressed = header["compressed"]
+        self.numEntries = header["numEntries"]
+        self.offsets = header["columns"]
+        self.info = header["info"]
+        self.dataStart = start + length
+        self.columns = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.numEntries
+
+    def close(self):
+        """Closes the archive
+        """
+        self.data.close()
+        self.file.close()
+
+    def getColumn(self, name):
+        """Gives one field of all entries
+
+        Parameters
+        ----------
+        name: str
+            one of id, title, authors, link, summary, updated (time stamps
+            in seconds since the epoch), or categories
+
+        Returns
+        -------
+        values: list
+            the field of every entry in order
+
+        Raises
+        ------
+        KeyError
+            If there is no such field
+        """
+        if not (name in self.columns):
+            offset, length = self.offsets[name]
+            start = self.dataStart + offset
+            data = self.data[start:start + length]
+            if self.compressed:
+                data = zlib.decompress(data)
+            self.columns[name] = json.loads(data.decode("utf-8"))
+        return self.columns[name]
+
+    def getFeed(self):
+        """Gives the saved feed
+
+        Returns
+        -------
+        feed: feedparser.FeedParserDict
+            saved feed, its entries are feedEntry.Entry records
+        """
+        feed = feedparser.FeedParserDict(self.info)
+        feed["entries"] = [
+            fE.Entry(id, title, authors, link, summary, time.gmtime(updated),
+                     categories)
+            for id, title, authors, link, summary, updated, categories
+            in zip(*[self.getColumn(name) for name in columns])]
+        return feed
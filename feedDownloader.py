@@ -1,11 +1,24 @@
 import sys
 try:
-    from urllib.request import urlopen
-except:
-    from urllib import urlopen
+    from urllib.request import urlopen, Request
+    from urllib.error import HTTPError
+except ImportError:
+    from urllib2 import urlopen, Request, HTTPError
+from concurrent.futures import ThreadPoolExecutor
+import collections
+import functools
+import io
 import feedparser
 import pickle
 import os
+import timeit
+import streamParser as sP
+import feedEntry as fE
+import feedArchive as fA
+import responseCache as rC
+import connectionPool as cP
+import rateLimiter as rL
+import metrics as mT
 
 
 class NoDownloadedFeedException(Exception):
@@ -18,18 +31,471 @@ class NoSavedFeedException(Exception):
     """
 
 
+responseCache = None
+
+
+def setResponseCache(cache):
+    """Sets the response cache used by all downloads of this process
+
+    Parameters
+    ----------
+    cache: responseCache.ResponseCache
+        cache to use, None to always download feeds
+    """
+    global responseCache
+    responseCache = cache
+
+
+connectionPool = cP.ConnectionPool()
+
+
+def setConnectionPool(pool):
+    """Sets the connection pool used by all downloads of this process
+
+    Parameters
+    ----------
+    pool: connectionPool.ConnectionPool
+        pool to use, None to open a new connection for every download
+    """
+    global connectionPool
+    connectionPool = pool
+
+
+rateLimiter = None
+
+
+parsePool = None
+
+
+def setParsePool(pool):
+    """Sets the pool of processes parsing the downloads of this process
+
+    Parameters
+    ----------
+    pool: parsePool.ParsePool
+        pool to use, None to parse feeds in this process
+    """
+    global parsePool
+    parsePool = pool
+
+
+def setRateLimiter(limiter):
+    """Sets the rate limiter spacing out all http(s) requests of this process
+
+    No requests are spaced out by default. The scripts (arXivQuerPy.py and
+    the like) set a limiter as asked for by arXiv's api.
+
+    Parameters
+    ----------
+    limiter: rateLimiter.RateLimiter
+        limiter to use, None to make requests without waiting
+    """
+    global rateLimiter
+    rateLimiter = limiter
+
+
+def openUrl(url, headers=None):
+    """Opens a url, rate limited and through the connection pool for http(s)
+
+    Parameters
+    ----------
+    url: str
+        url to open
+    headers: dict
+        further headers to send
+
+    Returns
+    -------
+    response: file-like
+        response to read the body from
+    """
+    if not url.startswith(("http://", "https://")):
+        return urlopen(Request(url, headers=headers or {}))
+    pool = connectionPool
+    limiter = rateLimiter
+    if pool is None:
+        request, args = urlopen, (Request(url, headers=headers or {}),)
+    else:
+        request, args = pool.open, (url, headers)
+    if limiter is None:
+        return request(*args)
+    return limiter.call(request, *args)
+
+
+class CountingStream():
+    """Wraps a response, counting the number of (decoded) bytes read from it
+    and the seconds spent reading
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.numBytes = 0
+        self.seconds = 0.
+
+    def read(self, *args):
+        start = timeit.default_timer()
+        data = self.stream.read(*args)
+        self.seconds += timeit.default_timer() - start
+        self.numBytes += len(data)
+        return data
+
+    def wireBytes(self):
+        """Gives the number of bytes received, before they were decoded
+        """
+        return getattr(self.stream, "numRawBytes", self.numBytes)
+
+    def close(self):
+        self.stream.close()
+
+
+def parseBody(body, stopDate=None):
+    """Parses a downloaded feed
+
+    Parameters
+    ----------
+    body: bytes
+        the feed as Atom
+    stopDate: datetime.date
+        If given, parsing stops after the first entry last updated before
+        this date
+
+    Returns
+    -------
+    feed: feedparser.FeedParserDict
+        parsed feed, its entries are feedEntry.Entry records
+    """
+    if not (stopDate is None):
+        return sP.parseUntil(io.BytesIO(body), stopDate)
+    feed = feedparser.parse(body)
+    feed["entries"] = [fE.Entry.fromFeedParserDict(entry)
+                       for entry in feed.entries]
+    return feed
+
+
+class PendingFeed():
+    """Downloaded page that is still parsed by the parse pool
+    """
+    def __init__(self, future, finish):
+        """Constructor for a PendingFeed
+
+        Parameters
+        ----------
+        future: concurrent.futures.Future
+            future of the parsed feed (see parsePool.ParsePool.submitFeed)
+        finish: callable
+            Gets the parsed feed and gives it back once it is counted and
+            cached
+        """
+        self.future = future
+        self.finish = finish
+
+    def result(self):
+        """Waits until the page is parsed
+
+        Returns
+        -------
+        feed: feedparser.FeedParserDict
+            parsed feed, its entries are feedEntry.Entry records
+        """
+        start = timeit.default_timer()
+        feed = self.future.result()
+        mT.addTime("parse", timeit.default_timer() - start, calls=0)
+        return self.finish(feed)
+
+
+def resolveFeed(feed):
+    """Gives a feed, waiting for it if it is still parsed
+
+    Parameters
+    ----------
+    feed: feedparser.FeedParserDict or PendingFeed
+        feed as given by requestFeed
+
+    Returns
+    -------
+    feed: feedparser.FeedParserDict
+        parsed feed
+    """
+    if isinstance(feed, PendingFeed):
+        return feed.result()
+    return feed
+
+
+def checkCache(queryString, stopDate=None):
+    """Looks a query string up in the response cache (see setResponseCache)
+
+    Parameters
+    ----------
+    queryString: str
+        String to use for arXiv api query
+    stopDate: datetime.date
+        date after which parsing will stop (None for the complete feed)
+
+    Returns
+    -------
+    feed: feedparser.FeedParserDict
+        cached feed if it can be used without asking the server, else None
+    cached: responseCache.CachedResponse
+        cached response to revalidate with the server, None if there is
+        none
+    """
+    cache = responseCache
+    if cache is None:
+        return None, None
+    cached = cache.get(queryString)
+    if (cached is None) or (not cached.covers(stopDate)):
+        return None, None
+    if cache.isFresh(cached):
+        mT.count("cacheHits")
+        return cached.feed, cached
+    return None, cached
+
+
+def validators(cached):
+    """Gives the headers revalidating a cached response with the server
+
+    Parameters
+    ----------
+    cached: responseCache.CachedResponse
+        cached response (None sends no validators)
+
+    Returns
+    -------
+    headers: dict
+        headers to send with the request
+    """
+    if cached is None:
+        return {}
+    return cached.validators()
+
+
+def notModified(queryString, cached):
+    """Gives the cached feed once the server reported it as not modified
+
+    Parameters
+    ----------
+    queryString: str
+        String used for the arXiv api query
+    cached: responseCache.CachedResponse
+        cached response that was revalidated
+
+    Returns
+    -------
+    feed: feedparser.FeedParserDict
+        the cached feed
+    """
+    mT.count("notModified")
+    if not (responseCache is None):
+        responseCache.refresh(queryString)
+    return cached.feed
+
+
+def finishFeed(queryString, stopDate, info, numBytes, feed):
+    """Counts a parsed page and puts it into the response cache
+
+    Parameters
+    ----------
+    queryString: str
+        String used for the arXiv api query
+    stopDate: datetime.date
+        date after which parsing stopped (None if the feed is complete)
+    info: email.message.Message
+        headers of the response
+    numBytes: int
+        Number of (decoded) bytes of the response
+    feed: feedparser.FeedParserDict
+        parsed feed
+
+    Returns
+    -------
+    feed: feedparser.FeedParserDict
+        the given feed
+    """
+    mT.count("pages")
+    mT.count("entriesParsed", len(feed.entries))
+    cache = responseCache
+    if not (cache is None):
+        cache.put(queryString, rC.CachedResponse(
+            feed, stopDate, info.get("ETag"), info.get("Last-Modified"),
+            numBytes))
+    return feed
+
+
+def requestFeed(queryString, stopDate=None):
+    """Downloads the feed for a given query string, without waiting for the
+    parse pool
+
+    Like downloadFeed, but pages handed to the parse pool (see setParsePool)
+    are given as PendingFeed, so the calling thread can go on (e.g. with
+    the next download) while the page is parsed.
+
+    Parameters
+    ----------
+    queryString: str
+        String to use for arXiv api query
+    stopDate: datetime.date
+        If given, the feed is parsed while it is downloaded and the download
+        stops after the first entry last updated before this date
+
+    Returns
+    -------
+    feed: feedparser.FeedParserDict or PendingFeed
+        parsed feed (see resolveFeed)
+    """
+    feed, cached = checkCache(queryString, stopDate)
+    if not (feed is None):
+        return feed
+    mT.count("requests")
+    try:
+        with mT.timer("http"):
+            response = openUrl(queryString, validators(cached))
+    except HTTPError as e:
+        if (e.code == 304) and (not (cached is None)):
+            return notModified(queryString, cached)
+        raise
+    stream = CountingStream(response)
+    pending = None
+    start = timeit.default_timer()
+    try:
+        if stopDate is None:
+            body = stream.read()
+            pool = parsePool
+            if (pool is None) or (not pool.usesWorkers(body)):
+                feed = parseBody(body)
+            else:
+                pending = pool.submitFeed(body)
+        else:
+            # reading and parsing are interleaved
+            feed = sP.parseUntil(stream, stopDate)
+    finally:
+        stream.close()
+        # reading the body belongs to the request, the rest is parsing
+        mT.addTime("http", stream.seconds, calls=0)
+        mT.addTime("parse", timeit.default_timer() - start - stream.seconds)
+    mT.count("bytes", stream.wireBytes())
+    finish = functools.partial(finishFeed, queryString, stopDate,
+                               response.info(), stream.numBytes)
+    if not (pending is None):
+        return PendingFeed(pending, finish)
+    return finish(feed)
+
+
+def downloadFeed(queryString, stopDate=None):
+    """Downloads and parses the feed for a given query string
+
+    If a response cache is set (see setResponseCache), fresh cached feeds
+    are used directly and stale ones are revalidated with the server. If a
+    parse pool is set (see setParsePool), large complete pages are parsed by
+    its worker processes.
+
+    Parameters
+    ----------
+    queryString: str
+        String to use for arXiv api query
+    stopDate: datetime.date
+        If given, the feed is parsed while it is downloaded and the download
+        stops after the first entry last updated before this date
+
+    Returns
+    -------
+    feed: feedparser.FeedParserDict
+        parsed feed, its entries are feedEntry.Entry records
+    """
+    return resolveFeed(requestFeed(queryString, stopDate))
+
+
+class FeedPrefetcher():
+    """Downloads feeds for upcoming query strings in the background
+
+    Feeds are downloaded on a bounded thread pool, so that further pages can
+    be requested while the current one is still parsed and composed. Pages
+    handed to the parse pool are waited for in getFeed, so the download
+    threads go on with the next pages meanwhile.
+    """
+    def __init__(self, maxWorkers=4, stopDate=None):
+        """Constructor for a FeedPrefetcher
+
+        Parameters
+        ----------
+        maxWorkers: int
+            Maximum number of concurrent downloads
+        stopDate: datetime.date
+            If given, downloads stop after the first entry last updated
+            before this date (see downloadFeed)
+        """
+        self.executor = ThreadPoolExecutor(max_workers=maxWorkers)
+        self.pending = collections.OrderedDict()
+        self.stopDate = stopDate
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def prefetch(self, queryStrings):
+        """Starts downloading the feeds for the given query strings
+
+        Query strings that are already being downloaded are skipped.
+
+        Parameters
+        ----------
+        queryStrings: iterable of str
+            Strings to use for arXiv api queries
+        """
+        for queryString in queryStrings:
+            if not (queryString in self.pending):
+                self.pending[queryString] = self.executor.submit(
+                    requestFeed, queryString, self.stopDate)
+
+    def getFeed(self, queryString):
+        """Returns the feed for a query string, waiting for its download
+
+        Parameters
+        ----------
+        queryString: str
+            String to use for arXiv api query
+
+        Returns
+        -------
+        feed: feedparser.FeedParserDict
+            parsed feed
+        """
+        self.prefetch([queryString])
+        return resolveFeed(self.pending.pop(queryString).result())
+
+    def cancel(self):
+        """Cancels all downloads that were not requested via getFeed
+        """
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+
+    def close(self):
+        """Cancels all outstanding downloads and shuts down the thread pool
+        """
+        self.cancel()
+        self.executor.shutdown(wait=False)
+
+
 class FeedDownloader():
     """Downloads and parses xml file using arXiv's api for a given query string
     """
-    def __init__(self, queryString):
+    def __init__(self, queryString, prefetcher=None, stopDate=None):
         """Constructor for a FeedDownloader
 
         Parameters
         ----------
         queryString: str
             String to use for arXiv api query
+        prefetcher: FeedPrefetcher
+            If given, feeds are taken from (and can be prefetched with) it
+        stopDate: datetime.date
+            If given, downloads stop after the first entry last updated
+            before this date (see downloadFeed)
         """
         self.queryString = queryString
+        self.prefetcher = prefetcher
+        self.stopDate = stopDate
         self.feed = None
 
     def updateQueryString(self, queryString):
@@ -52,14 +518,47 @@ class FeedDownloader():
         """
         return self.queryString
 
+    def setPrefetcher(self, prefetcher):
+        """Change the prefetcher used to download feeds
+
+        Parameters
+        ----------
+        prefetcher: FeedPrefetcher
+            Prefetcher to use, None to download feeds directly
+        """
+        self.prefetcher = prefetcher
+
+    def prefetch(self, queryStrings):
+        """Starts downloading the feeds for upcoming query strings
+
+        Does nothing if no prefetcher is set.
+
+        Parameters
+        ----------
+        queryStrings: iterable of str
+            Strings to use for upcoming arXiv api queries
+        """
+        if not (self.prefetcher is None):
+            self.prefetcher.prefetch(queryStrings)
+
+    def setStopDate(self, stopDate):
+        """Change the date after which downloads stop
+
+        Parameters
+        ----------
+        stopDate: datetime.date
+            Downloads stop after the first entry last updated before this
+            date, None downloads whole feeds
+        """
+        self.stopDate = stopDate
+
     def updateFeed(self):
         """Downloads the current feed
         """
-        try:
-            with urlopen(self.queryString) as url:
-                self.feed = feedparser.parse(url.read())
-        except AttributeError:
-            self.feed = feedparser.parse(urlopen(self.queryString).read())
+        if self.prefetcher is None:
+            self.feed = downloadFeed(self.queryString, self.stopDate)
+        else:
+            self.feed = self.prefetcher.getFeed(self.queryString)
 
     def getFeed(self):
         """Returns the current feed
@@ -73,17 +572,25 @@ class FeedDownloader():
             raise NoDownloadedFeedException
         return self.feed
 
-    def saveFeed(self, fileName=r"./feed.pickle"):
-        """Saves the feed for further use
+    def saveFeed(self, fileName=r"./feed.archive", compress=True):
+        """Saves the feed for further use (as feedArchive)
+
+        Parameters
+        ----------
+        fileName: str
+            path to write to
+        compress: bool
+            compress the saved entries
         """
         if self.feed is None:
             raise NoDownloadedFeedException
-        with open(fileName, "wb") as f:
-            pickle.dump(self.feed, f)
+        fA.saveFeed(self.feed, fileName, compress)
 
-    def loadFeed(self, fileName=r"./feed.pickle"):
+    def loadFeed(self, fileName=r"./feed.archive"):
         """Loads the feed for further use
 
+        Feeds saved as pickle by earlier versions are loaded as well.
+
         Raises
         ------
         NoSavedFeedException
@@ -91,5 +598,8 @@ class FeedDownloader():
         """
         if not os.path.exists(fileName):
             raise NoSavedFeedException
+        if fA.isFeedArchive(fileName):
+            self.feed = fA.loadFeed(fileName)
+            return
         with open(fileName, "rb") as f:
             self.feed = pickle.load(f)
@@ -0,0 +1,142 @@
+import re
+import time
+import feedparser
+
+
+class Entry(object):
+    """Lightweight record of a feed entry
+
+    Only keeps the fields needed to filter, store, and compose entries.
+    Authors and categories are tuples of their names/terms.
+    """
+    __slots__ = ("id", "title", "authors", "link", "summary",
+                 "updated_parsed", "categories")
+
+    def __init__(self, id, title, authors, link, summary, updated_parsed,
+                 categories=()):
+        """Constructor for an Entry
+
+        Parameters
+        ----------
+        id: str
+            id of the entry (e.g. http://arxiv.org/abs/1608.03248v1)
+        title: str
+            title of the entry
+        authors: iterable of str
+            names of the authors
+        link: str
+            link to the abstract page
+        summary: str
+            abstract of the entry
+        updated_parsed: time.struct_time
+            time of the last update
+        categories: iterable of str
+            categories the entry is in
+        """
+        self.id = id
+        self.title = title
+        self.authors = tuple(authors)
+        self.link = link
+        self.summary = summary
+        self.updated_parsed = updated_parsed
+        self.categories = tuple(categories)
+
+    def __eq__(self, other):
+        if not isinstance(other, Entry):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name)
+                   for name in self.__slots__)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    def __repr__(self):
+        return "Entry({0!r}, {1!r})".format(self.id, self.title)
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    @classmethod
+    def fromFeedParserDict(cls, entry):
+        """Creates an Entry from an entry parsed by feedparser
+
+        Parameters
+        ----------
+        entry: feedparser.FeedParserDict
+            entry of a feed
+
+        Returns
+        -------
+        entry: Entry
+            record of the entry
+        """
+        return cls(entry.id, entry.title,
+                   [author["name"] for author in entry.get("authors", [])],
+                   entry.link, entry.summary, entry.updated_parsed,
+                   [tag["term"] for tag in entry.get("tags", [])])
+
+    def toFeedParserDict(self):
+        """Converts the Entry into an entry as parsed by feedparser
+
+        Returns
+        -------
+        entry: feedparser.FeedParserDict
+            entry containing the fields of the record
+        """
+        return feedparser.FeedParserDict(
+            id=self.id,
+            updated=time.strftime("%Y-%m-%dT%H:%M:%SZ", self.updated_parsed),
+            title=self.title,
+            authors=[feedparser.FeedParserDict(name=name)
+                     for name in self.authors],
+            link=self.link,
+            summary=self.summary,
+            updated_parsed=self.updated_parsed,
+            tags=[feedparser.FeedParserDict(term=term)
+                  for term in self.categories])
+
+
+def toEntry(entry):
+    """Gives an Entry for an entry in either representation
+
+    Parameters
+    ----------
+    entry: Entry or feedparser.FeedParserDict
+        entry of a feed
+
+    Returns
+    -------
+    entry: Entry
+        record of the entry
+    """
+    if isinstance(entry, Entry):
+        return entry
+    return Entry.fromFeedParserDict(entry)
+
+
+def splitArxivId(entryId):
+    """Splits the id of an entry into arXiv id and version
+
+    Parameters
+    ----------
+    entryId: str
+        id of an entry (e.g. http://arxiv.org/abs/1608.03248v1)
+
+    Returns
+    -------
+    arxivId: str
+        arXiv id without version (e.g. 1608.03248)
+    version: int
+        version of the entry (1 if not given)
+    """
+    match = re.search(r"(?:abs/)?([^/]+/\d+|\d+\.\d+)(?:v(\d+))?$", entryId)
+    if match is None:
+        return entryId, 1
+    return match.group(1), int(match.group(2) or 1)
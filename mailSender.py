@@ -1,6 +1,17 @@
+import os
 import smtplib
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from email import message_from_file
 from email.mime.text import MIMEText
 from email.utils import parseaddr
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+import metrics as mT
 
 
 class InvalidEmailAddress(Exception):
@@ -8,9 +19,31 @@ class InvalidEmailAddress(Exception):
     """
 
 
-def sendMail(text, address,
-             mailFrom="arXivUpdate@nut.physik.uni-mainz.de",
-             mailgateAddress="mailgate.zdv.uni-mainz.de:25"):
+def composeMail(text, address,
+                mailFrom="arXivUpdate@nut.physik.uni-mainz.de"):
+    """Composes the message for an update
+
+    Parameters
+    ----------
+    text: str
+        text of the update
+    address: str or list
+        address(es) to send the update to
+    mailFrom: str
+        address the update is sent from
+
+    Returns
+    -------
+    msg: email.mime.text.MIMEText
+        message to send
+    to: list
+        addresses to send the message to
+
+    Raises
+    ------
+    InvalidEmailAddress
+        If one of the addresses could not be parsed
+    """
     msg = MIMEText(text)
     msg["Subject"] = "arXive update"
     msg["From"] = mailFrom
@@ -21,10 +54,318 @@ def sendMail(text, address,
         msg["To"] = ",".join(address)
         to = address
     else:
-        if parseaddr(address) == "":
+        if parseaddr(address)[1] == "":
             raise InvalidEmailAddress
         msg["To"] = address
         to = [address]
-    s = smtplib.SMTP(mailgateAddress)
-    s.sendmail(msg["From"], to, msg.as_string())
-    s.quit()
+    return msg, to
+
+
+class MailSession():
+    """Sends many updates over one connection to a mailgate
+
+    The connection is opened with the first message, renewed after a given
+    number of messages, and reestablished once if the mailgate dropped it.
+    """
+    def __init__(self, mailgateAddress="mailgate.zdv.uni-mainz.de:25",
+                 maxMessagesPerConnection=100, user=None, password=None,
+                 smtpClass=smtplib.SMTP):
+        """Constructor for a MailSession
+
+        Parameters
+        ----------
+        mailgateAddress: str
+            host:port of the mailgate to send through
+        maxMessagesPerConnection: int
+            Number of messages after which the connection is renewed
+        user: str
+            user to log in with (no login if None)
+        password: str
+            password to log in with
+        smtpClass: class
+            class used to connect to the mailgate
+        """
+        self.mailgateAddress = mailgateAddress
+        self.maxMessagesPerConnection = maxMessagesPerConnection
+        self.user = user
+        self.password = password
+        self.smtpClass = smtpClass
+        self.connection = None
+        self.numSent = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def connect(self):
+        """Opens a new connection to the mailgate (closing an old one)
+        """
+        self.close()
+        self.connection = self.smtpClass(self.mailgateAddress)
+        if not (self.user is None):
+            self.connection.login(self.user, self.password)
+        self.numSent = 0
+
+    def close(self):
+        """Closes the connection to the mailgate if one is open
+        """
+        if self.connection is None:
+            return
+        try:
+            self.connection.quit()
+        except (smtplib.SMTPException, socket.error):
+            pass
+        self.connection = None
+
+    def sendMessage(self, msg, to):
+        """Sends a composed message
+
+        Parameters
+        ----------
+        msg: email.mime.text.MIMEText
+            message to send
+        to: list
+            addresses to send the message to
+        """
+        with mT.timer("smtp"):
+            if ((self.connection is None)
+                    or (self.numSent >= self.maxMessagesPerConnection)):
+                self.connect()
+            try:
+                self.connection.sendmail(msg["From"], to, msg.as_string())
+            except (smtplib.SMTPServerDisconnected, socket.error):
+                self.connection = None
+                self.connect()
+                self.connection.sendmail(msg["From"], to, msg.as_string())
+        self.numSent += 1
+        mT.count("mails")
+
+    def send(self, text, address,
+             mailFrom="arXivUpdate@nut.physik.uni-mainz.de"):
+        """Sends an update
+
+        Parameters
+        ----------
+        text: str
+            text of the update
+        address: str or list
+            address(es) to send the update to
+        mailFrom: str
+            address the update is sent from
+
+        Raises
+        ------
+        InvalidEmailAddress
+            If one of the addresses could not be parsed
+        """
+        msg, to = composeMail(text, address, mailFrom)
+        self.sendMessage(msg, to)
+
+
+def sendMail(text, address,
+             mailFrom="arXivUpdate@nut.physik.uni-mainz.de",
+             mailgateAddress="mailgate.zdv.uni-mainz.de:25"):
+    """Sends an update over a new connection to the mailgate
+
+    Use a MailSession to send many updates over the same connection.
+
+    Parameters
+    ----------
+    text: str
+        text of the update
+    address: str or list
+        address(es) to send the update to
+    mailFrom: str
+        address the update is sent from
+    mailgateAddress: str
+        host:port of the mailgate to send through
+    """
+    with MailSession(mailgateAddress) as session:
+        session.send(text, address, mailFrom)
+
+
+class DeliveryQueue():
+    """Sends updates in the background
+
+    Updates are sent by a bounded number of worker threads, each with its own
+    MailSession. Failed deliveries are retried with exponential backoff and
+    written to a spool directory if they fail for good, so they can be resent
+    later with resendSpool. Messages the mailgate refuses (e.g. for an
+    unknown recipient) are neither retried nor spooled.
+    """
+    permanentErrors = (smtplib.SMTPRecipientsRefused,
+                       smtplib.SMTPSenderRefused)
+
+    def __init__(self, mailgateAddress="mailgate.zdv.uni-mainz.de:25",
+                 maxConnections=2, maxRetries=3, backoff=1.,
+                 spoolDirectory=None, **sessionArgs):
+        """Constructor for a DeliveryQueue
+
+        Parameters
+        ----------
+        mailgateAddress: str
+            host:port of the mailgate to send through
+        maxConnections: int
+            Maximum number of concurrent connections to the mailgate
+        maxRetries: int
+            Number of retries before a delivery is given up
+        backoff: float
+            Seconds to wait before the first retry (doubled for every
+            further retry)
+        spoolDirectory: str
+            directory to write undeliverable messages to (they are dropped
+            if None)
+        sessionArgs:
+            further arguments for the MailSessions (see MailSession)
+        """
+        self.maxRetries = maxRetries
+        self.backoff = backoff
+        self.spoolDirectory = spoolDirectory
+        self.executor = ThreadPoolExecutor(max_workers=maxConnections)
+        self.sessions = queue.Queue()
+        for i in range(maxConnections):
+            self.sessions.put(MailSession(mailgateAddress, **sessionArgs))
+        self.futures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __deliver(self, msg, to):
+        """Sends a message with retries, spooling it if it fails for good
+        """
+        session = self.sessions.get()
+        try:
+            for attempt in range(self.maxRetries + 1):
+                try:
+                    session.sendMessage(msg, to)
+                    return True
+                except self.permanentErrors:
+                    # resending would be refused again
+                    mT.count("mailsRefused")
+                    return False
+                except (smtplib.SMTPException, socket.error):
+                    session.close()
+                    if attempt < self.maxRetries:
+                        mT.count("smtpRetries")
+                        time.sleep(self.backoff * 2**attempt)
+            self.spool(msg)
+            return False
+        finally:
+            self.sessions.put(session)
+
+    def submit(self, msg, to):
+        """Queues a composed message for delivery
+
+        Parameters
+        ----------
+        msg: email.mime.text.MIMEText
+            message to send
+        to: list
+            addresses to send the message to
+
+        Returns
+        -------
+        future: concurrent.futures.Future
+            future giving whether the message was delivered
+        """
+        future = self.executor.submit(self.__deliver, msg, to)
+        self.futures.append(future)
+        return future
+
+    def send(self, text, address,
+             mailFrom="arXivUpdate@nut.physik.uni-mainz.de"):
+        """Queues an update for delivery
+
+        Parameters
+        ----------
+        text: str
+            text of the update
+        address: str or list
+            address(es) to send the update to
+        mailFrom: str
+            address the update is sent from
+
+        Returns
+        -------
+        future: concurrent.futures.Future
+            future giving whether the update was delivered
+
+        Raises
+        ------
+        InvalidEmailAddress
+            If one of the addresses could not be parsed
+        """
+        msg, to = composeMail(text, address, mailFrom)
+        return self.submit(msg, to)
+
+    def spool(self, msg):
+        """Writes an undeliverable message to the spool directory
+
+        Parameters
+        ----------
+        msg: email.mime.text.MIMEText
+            message to spool
+        """
+        if self.spoolDirectory is None:
+            return
+        if not os.path.isdir(self.spoolDirectory):
+            os.makedirs(self.spoolDirectory)
+        fileName = os.path.join(self.spoolDirectory,
+                                uuid.uuid4().hex + ".eml")
+        with open(fileName, "w") as f:
+            f.write(msg.as_string())
+
+    def resendSpool(self):
+        """Queues all spooled messages for delivery again
+
+        Spooled messages are removed from the spool directory. Messages that
+        fail again are spooled again.
+
+        Returns
+        -------
+        futures: list of concurrent.futures.Future
+            futures giving whether the messages were delivered
+        """
+        if ((self.spoolDirectory is None)
+                or (not os.path.isdir(self.spoolDirectory))):
+            return []
+        futures = []
+        for fileName in sorted(os.listdir(self.spoolDirectory)):
+            if not fileName.endswith(".eml"):
+                continue
+            path = os.path.join(self.spoolDirectory, fileName)
+            with open(path) as f:
+                msg = message_from_file(f)
+            os.remove(path)
+            futures.append(self.submit(msg, msg["To"].split(",")))
+        return futures
+
+    def join(self):
+        """Waits until all queued messages are delivered (or given up)
+
+        Returns
+        -------
+        numFailed: int
+            Number of messages that could not be delivered
+        """
+        futures, self.futures = self.futures, []
+        return sum(1 for future in futures if not future.result())
+
+    def close(self):
+        """Waits for all queued messages and closes all connections
+
+        Returns
+        -------
+        numFailed: int
+            Number of messages that could not be delivered
+        """
+        numFailed = self.join()
+        self.executor.shutdown()
+        while not self.sessions.empty():
+            self.sessions.get().close()
+        return numFailed
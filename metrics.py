@@ -0,0 +1,203 @@
+import contextlib
+import cProfile
+import json
+import os
+import re
+import threading
+import time
+import timeit
+
+
+class Metrics():
+    """Counters and timers of a run
+
+    Counters count things like requests, bytes, or entries, timers add up
+    the seconds spent in a stage and how often it was entered. Both are safe
+    to use from several threads.
+    """
+    def __init__(self):
+        """Constructor for Metrics
+        """
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counters = {}
+        self.timers = {}
+
+    def count(self, name, n=1):
+        """Adds to a counter
+
+        Parameters
+        ----------
+        name: str
+            name of the counter
+        n: int
+            amount to add
+        """
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def addTime(self, name, seconds, calls=1):
+        """Adds the time of one pass through a stage to a timer
+
+        Parameters
+        ----------
+        name: str
+            name of the timer
+        seconds: float
+            seconds spent
+        calls: int
+            number of passes to add (0 adds to the time of a pass that was
+            already counted)
+        """
+        with self.lock:
+            total, numCalls = self.timers.get(name, (0., 0))
+            self.timers[name] = (total + seconds, numCalls + calls)
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        """Times the enclosed block (also if it raises)
+
+        Parameters
+        ----------
+        name: str
+            name of the timer
+        """
+        start = timeit.default_timer()
+        try:
+            yield
+        finally:
+            self.addTime(name, timeit.default_timer() - start)
+
+    def summary(self):
+        """Gives all counters and timers
+
+        Returns
+        -------
+        summary: dict
+            start time and wall time of the run, counters, and seconds and
+            calls of the timers
+        """
+        with self.lock:
+            return {"started": self.started,
+                    "wallTime": time.time() - self.started,
+                    "counters": dict(self.counters),
+                    "timers": dict((name, {"seconds": total, "calls": calls})
+                                   for name, (total, calls)
+                                   in self.timers.items())}
+
+    def writeJson(self, fileName):
+        """Writes the summary as json
+
+        Parameters
+        ----------
+        fileName: str
+            path to write to
+        """
+        with open(fileName, "w") as f:
+            json.dump(self.summary(), f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    def writePrometheus(self, fileName, prefix="arxivquerpy"):
+        """Writes the summary in the text format of Prometheus
+
+        The file is replaced atomically, so it can be read by the textfile
+        collector of the node exporter at any time. All values are gauges,
+        as they start from zero with every run.
+
+        Parameters
+        ----------
+        fileName: str
+            path to write to
+        prefix: str
+            prefix of the metric names
+        """
+        summary = self.summary()
+        lines = []
+
+        def add(name, kind, value):
+            name = prefix + "_" + re.sub(
+                r"([a-z0-9])([A-Z])", r"\1_\2", name).lower()
+            lines.append("# TYPE {0} {1}".format(name, kind))
+            lines.append("{0} {1!r}".format(name, value))
+        add("last_run_timestamp_seconds", "gauge", summary["started"])
+        add("wall_time_seconds", "gauge", summary["wallTime"])
+        for name, value in sorted(summary["counters"].items()):
+            add(name, "gauge", value)
+        for name, timer in sorted(summary["timers"].items()):
+            add(name + "Seconds", "gauge", timer["seconds"])
+            add(name + "Calls", "gauge", timer["calls"])
+        temporary = fileName + ".tmp"
+        with open(temporary, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.rename(temporary, fileName)
+
+
+metrics = Metrics()
+
+
+def setMetrics(newMetrics):
+    """Sets the metrics all stages of this process record to
+
+    Parameters
+    ----------
+    newMetrics: Metrics
+        metrics to record to
+    """
+    global metrics
+    metrics = newMetrics
+
+
+def count(name, n=1):
+    """Adds to a counter of the current metrics (see Metrics.count)
+    """
+    metrics.count(name, n)
+
+
+def addTime(name, seconds, calls=1):
+    """Adds to a timer of the current metrics (see Metrics.addTime)
+    """
+    metrics.addTime(name, seconds, calls)
+
+
+def timer(name):
+    """Times a block with the current metrics (see Metrics.timer)
+    """
+    return metrics.timer(name)
+
+
+def report(jsonFile=None, prometheusFile=None):
+    """Writes the summary of the current metrics
+
+    Parameters
+    ----------
+    jsonFile: str
+        path to write the summary to as json (not written if None)
+    prometheusFile: str
+        path to write the summary to for Prometheus (not written if None)
+    """
+    if not (jsonFile is None):
+        metrics.writeJson(jsonFile)
+    if not (prometheusFile is None):
+        metrics.writePrometheus(prometheusFile)
+
+
+@contextlib.contextmanager
+def profiled(fileName=None):
+    """Captures a cProfile profile of the enclosed block
+
+    Parameters
+    ----------
+    fileName: str
+        path to write the profile to (for pstats), nothing is profiled if
+        None
+    """
+    if fileName is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(fileName)
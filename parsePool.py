@@ -0,0 +1,190 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+import feedparser
+import feedDownloader as fD
+import feedEntry as fE
+
+
+plainTypes = (type(u""), str, int, float, bool, type(None))
+
+
+def plainValues(info):
+    """Gives the items of a dict whose values are strings or numbers
+
+    Parameters
+    ----------
+    info: dict
+        e.g. the header of a feed
+
+    Returns
+    -------
+    values: dict
+        items with plain values (nested dicts, lists, and dates are left
+        out)
+    """
+    return dict((key, value) for key, value in info.items()
+                if isinstance(value, plainTypes))
+
+
+def parseRecords(body, stopDate=None):
+    """Parses a feed into compact records (runs in the worker processes)
+
+    Parameters
+    ----------
+    body: bytes
+        the feed as Atom
+    stopDate: datetime.date
+        If given, parsing stops after the first entry last updated before
+        this date
+
+    Returns
+    -------
+    records: tuple
+        plain values of the feed (e.g. bozo) and of its header (e.g. the
+        opensearch information) and the fields of every entry as tuple (see
+        toFeed)
+    """
+    feed = fD.parseBody(body, stopDate)
+    return (plainValues(feed), plainValues(feed.get("feed", {})),
+            [entry.__getstate__() for entry in feed.entries])
+
+
+def toFeed(records):
+    """Builds the feed from the records of parseRecords
+
+    Parameters
+    ----------
+    records: tuple
+        plain values of the feed and of its header and the fields of every
+        entry
+
+    Returns
+    -------
+    feed: feedparser.FeedParserDict
+        parsed feed, its entries are feedEntry.Entry records
+    """
+    values, header, entries = records
+    feed = feedparser.FeedParserDict(values)
+    feed["feed"] = feedparser.FeedParserDict(header)
+    feed["entries"] = [fE.Entry(*fields) for fields in entries]
+    return feed
+
+
+class ParsePool():
+    """Pool of processes parsing downloaded feeds
+
+    Parsing is CPU bound, so parsing many large pages (e.g. when going back
+    months) in worker processes uses all cores, while downloads and
+    composition go on in this process. Only plain values are sent back: the
+    fields of the entries and the strings and numbers of the header. Small
+    feeds are parsed in this process, as sending them to a worker would take
+    longer than parsing them.
+
+    Downloads do not wait for their page to be parsed (see
+    feedDownloader.requestFeed), but the search needs every page before it
+    can go on, so pages are only parsed while further ones are downloaded if
+    these are prefetched.
+    """
+    def __init__(self, maxWorkers=None, minBytes=256 * 1024):
+        """Constructor for a ParsePool
+
+        Parameters
+        ----------
+        maxWorkers: int
+            Number of worker processes (the number of cores if None)
+        minBytes: int
+            Size from which on feeds are parsed by the workers
+        """
+        self.maxWorkers = maxWorkers
+        self.minBytes = minBytes
+        self.executor = ProcessPoolExecutor(max_workers=maxWorkers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def usesWorkers(self, body):
+        """Checks whether a feed is parsed by the workers
+
+        Parameters
+        ----------
+        body: bytes
+            the feed as Atom
+
+        Returns
+        -------
+        workers: bool
+            Indicates if the feed is large enough
+        """
+        return len(body) >= self.minBytes
+
+    def submit(self, body, stopDate=None):
+        """Hands a feed to the workers
+
+        Parameters
+        ----------
+        body: bytes
+            the feed as Atom
+        stopDate: datetime.date
+            If given, parsing stops after the first entry last updated
+            before this date
+
+        Returns
+        -------
+        records: concurrent.futures.Future
+            future of the records of the feed (see toFeed)
+        """
+        return self.executor.submit(parseRecords, body, stopDate)
+
+    def submitFeed(self, body, stopDate=None):
+        """Hands a feed to the workers, building it once they are done
+
+        Parameters
+        ----------
+        body: bytes
+            the feed as Atom
+        stopDate: datetime.date
+            If given, parsing stops after the first entry last updated
+            before this date
+
+        Returns
+        -------
+        feed: concurrent.futures.Future
+            future of the parsed feed, its entries are feedEntry.Entry
+            records
+        """
+        feed = Future()
+
+        def build(records):
+            try:
+                feed.set_result(toFeed(records.result()))
+            except Exception as e:
+                feed.set_exception(e)
+        self.submit(body, stopDate).add_done_callback(build)
+        return feed
+
+    def parse(self, body, stopDate=None):
+        """Parses a feed, by the workers if it is large enough
+
+        Parameters
+        ----------
+        body: bytes
+            the feed as Atom
+        stopDate: datetime.date
+            If given, parsing stops after the first entry last updated
+            before this date
+
+        Returns
+        -------
+        feed: feedparser.FeedParserDict
+            parsed feed, its entries are feedEntry.Entry records
+        """
+        if not self.usesWorkers(body):
+            return fD.parseBody(body, stopDate)
+        return self.submitFeed(body, stopDate).result()
+
+    def close(self):
+        """Shuts down the worker processes
+        """
+        self.executor.shutdown(wait=True)
@@ -1,3 +1,12 @@
+import collections
+import copy
+import datetime
+try:
+    from urllib.parse import quote_plus
+except ImportError:
+    from urllib import quote_plus
+
+
 class EmptyQueryException(Exception):
     """Raise when trying to use empty QueryString
     """
@@ -18,6 +27,12 @@ class InvalidConnectorException(Exception):
     """
 
 
+class InvalidFieldException(Exception):
+    """Raise when trying to set the connector of a field not being au/ti/abs
+    or a date window of a field not being a date field
+    """
+
+
 class QueryString:
     """Composer of a query string for searches using arXiv's api
     """
@@ -26,7 +41,15 @@ class QueryString:
     searchPrefix = r"search_query="
     blockStart = r"%28"
     blockEnd = r"%29"
+    phraseDelimiter = r"%22"
+    rangeStart = r"%5B"
+    rangeEnd = r"%5D"
+    rangeConnector = r"+TO+"
+    dateFields = ["lastUpdatedDate", "submittedDate"]
     connectorStrings = {"and": r"+AND+", "or": r"+OR+"}
+    maxResultsLimit = 2000
+    maxUrlLength = 2000
+    maxTerms = 50
     validCategories = ["cond-mat",
                        "cond-mat.soft",
                        "cond-mat.stat-mech",
@@ -55,14 +78,24 @@ class QueryString:
         """
         self.start = start
         self.N = N
-        self.categories = []
-        self.queries = {"ti":  [],
-                        "abs": [],
-                        "au":  []}
+        self.categories = collections.OrderedDict()
+        self.queries = {"ti":  collections.OrderedDict(),
+                        "abs": collections.OrderedDict(),
+                        "au":  collections.OrderedDict()}
+        self.fieldConnectors = {"ti":  "or",
+                                "abs": "or",
+                                "au":  "or"}
+        self.__queryCache = None
+        self.dateWindow = None
         self.connector = connector.lower()
         if not (self.connector in self.connectorStrings.keys()):
             raise InvalidConnectorException
 
+    def __changed(self):
+        """Invalidate the cached query string after the queries changed
+        """
+        self.__queryCache = None
+
     def __checkForEmptyQuery(self):
         """Check if there are any queries
 
@@ -78,6 +111,35 @@ class QueryString:
                 break
         return empty
 
+    def __encodeTerm(self, query):
+        """Percent-encode a query for the query string
+
+        Queries consisting of several words (or given in double quotes) are
+        searched for as a phrase, i.e. the words have to appear in this order.
+
+        Parameters
+        ----------
+        query: str
+            Query to encode
+
+        Returns
+        -------
+        term: str
+            Encoded query
+        """
+        query = query.strip()
+        phrase = ((len(query) > 1) and query.startswith('"')
+                  and query.endswith('"'))
+        if phrase:
+            query = query[1:-1].strip()
+        words = query.split()
+        if not isinstance(query, str):
+            words = [word.encode("utf-8") for word in words]
+        term = "+".join(quote_plus(word) for word in words)
+        if phrase or (len(words) > 1):
+            return self.phraseDelimiter + term + self.phraseDelimiter
+        return term
+
     def __produceBlock(self, qType, qList=None):
         """Produce a block of queries for the given type (without parantheses)
 
@@ -85,42 +147,62 @@ class QueryString:
         ----------
         qType: str
             Type to create the block for
-        qList: list
-            List of queries (if not given self.queries[qType] is used)
+        qList: iterable
+            Queries (if not given self.queries[qType] is used)
 
         Returns
         -------
         block: str
             Block for the given qType
         """
-        block = ""
-        first = True
-        for query in (qList if not (qList is None) else self.queries[qType]):
-            if first:
-                block += qType + ":" + query
-                first = False
-            else:
-                block += self.connectorStrings["or"] + qType + ":" + query
+        connector = self.fieldConnectors.get(qType, "or")
+        return self.connectorStrings[connector].join(
+            qType + ":" + self.__encodeTerm(query)
+            for query in (qList if not (qList is None)
+                          else self.queries[qType]))
+
+    def __produceFieldBlock(self, qType, grouped):
+        """Produce the block of a field, in parantheses if needed
+
+        Parameters
+        ----------
+        qType: str
+            Type to create the block for
+        grouped: bool
+            Indicates if the block is or-connected with another one
+        """
+        block = self.__produceBlock(qType)
+        if (grouped and (len(self.queries[qType]) > 1)
+                and (self.fieldConnectors[qType] == "and")):
+            return self.blockStart + block + self.blockEnd
         return block
 
-    def __str__(self):
-        """Gives the current QueryString as string
+    def __produceQuery(self):
+        """Produce the query string without the paging parameters
 
-        Gives a valid query string to use on arXiv's api containing all
-        information previously added.
+        The result is cached until queries, categories, or the connector are
+        changed, so that paging only renders the paging parameters anew.
 
         Returns
         -------
-        str
-            query string
+        url: str
+            query string without sorting, start, and number of results
 
         Raises
         ------
         EmptyQueryException
-            If there are no querys to search for.
+            If there are neither querys nor categories to search for.
         """
+        if not (self.__queryCache is None):
+            return self.__queryCache
         if self.__checkForEmptyQuery():
-            raise EmptyQueryException
+            if len(self.categories) == 0:
+                raise EmptyQueryException
+            self.__queryCache = (self.baseUrl + self.searchPrefix
+                                 + self.blockStart
+                                 + self.__produceBlock("cat", self.categories)
+                                 + self.blockEnd)
+            return self.__queryCache
 
         # What fields are needed?
         authors = (len(self.queries["au"]) > 0)
@@ -130,31 +212,93 @@ class QueryString:
                               and (len(self.queries["abs"]) > 0))
         categories = (len(self.categories) > 0)
 
-        url = self.baseUrl + self.searchPrefix + self.blockStart
+        parts = [self.baseUrl, self.searchPrefix, self.blockStart]
         # Start with authors
         if authors:
-            url += self.blockStart + self.__produceBlock("au") + self.blockEnd
+            parts += [self.blockStart, self.__produceBlock("au"),
+                      self.blockEnd]
             if titlesOrAbstracts:
-                url += self.connectorStrings[self.connector]
+                parts.append(self.connectorStrings[self.connector])
 
         # Now do title/abstract queries
         if titlesOrAbstracts:
-            url += self.blockStart
-        url += self.__produceBlock("ti")
+            parts.append(self.blockStart)
+        parts.append(self.__produceFieldBlock("ti", titlesAndAbstracts))
         if titlesAndAbstracts:
-            url += self.connectorStrings["or"]
-        url += self.__produceBlock("abs") + self.blockEnd
+            parts.append(self.connectorStrings["or"])
+        parts += [self.__produceFieldBlock("abs", titlesAndAbstracts),
+                  self.blockEnd]
         if titlesOrAbstracts:
-            url += self.blockEnd
+            parts.append(self.blockEnd)
 
         # Lastly, do the categories
         if categories:
-            url += (self.connectorStrings["and"] + self.blockStart
-                    + self.__produceBlock("cat", self.categories)
-                    + self.blockEnd)
-        url += (r"&sortBy=lastUpdatedDate&start={0:d}&max_results={1:d}"
+            parts += [self.connectorStrings["and"], self.blockStart,
+                      self.__produceBlock("cat", self.categories),
+                      self.blockEnd]
+        self.__queryCache = "".join(parts)
+        return self.__queryCache
+
+    def __produceDateClause(self):
+        """Produce the range clause restricting results to the date window
+
+        Returns
+        -------
+        clause: str
+            clause to append to the query (empty if there is no window)
+        """
+        if self.dateWindow is None:
+            return ""
+        since, until, field = self.dateWindow
+        if until is None:
+            # include everything updated today in any time zone
+            until = (datetime.datetime.utcnow().date()
+                     + datetime.timedelta(days=1))
+        first = "000000000000" if since is None else since.strftime(
+            "%Y%m%d0000")
+        return (self.connectorStrings["and"] + field + ":" + self.rangeStart
+                + first + self.rangeConnector + until.strftime("%Y%m%d2359")
+                + self.rangeEnd)
+
+    def __str__(self):
+        """Gives the current QueryString as string
+
+        Gives a valid query string to use on arXiv's api containing all
+        information previously added. Without any author, title, or abstract
+        queries all results in the given categories are searched for.
+
+        Returns
+        -------
+        str
+            query string
+
+        Raises
+        ------
+        EmptyQueryException
+            If there are neither querys nor categories to search for.
+        """
+        return (self.__produceQuery() + self.__produceDateClause()
+                + r"&sortBy=lastUpdatedDate&start={0:d}&max_results={1:d}"
                 .format(self.start, self.N))
-        return url
+
+    def getQueryKey(self):
+        """Gives the query string without the paging parameters
+
+        All pages of the same search share this key, also if it is repeated
+        with another date window.
+
+        Returns
+        -------
+        str
+            query string without date window, sorting, start, and number of
+            results
+
+        Raises
+        ------
+        EmptyQueryException
+            If there are neither querys nor categories to search for.
+        """
+        return self.__produceQuery()
 
     def getSearchString(self):
         """Gives the current QueryString as string
@@ -174,6 +318,153 @@ class QueryString:
         """
         return str(self)
 
+    def setShardBudget(self, maxUrlLength=None, maxTerms=None):
+        """Set the budget queries are split into shards by
+
+        Parameters
+        ----------
+        maxUrlLength: int
+            Maximum length of the query string of a shard (None keeps the
+            current one)
+        maxTerms: int
+            Maximum number of author, title, and abstract queries of a shard
+            (None keeps the current one)
+        """
+        if not (maxUrlLength is None):
+            self.maxUrlLength = maxUrlLength
+        if not (maxTerms is None):
+            self.maxTerms = maxTerms
+
+    def __fitsBudget(self):
+        """Check if the query string is within the shard budget
+        """
+        numTerms = sum(len(self.queries[key]) for key in self.queries)
+        return ((numTerms <= self.maxTerms)
+                and (len(str(self)) <= self.maxUrlLength))
+
+    def __produceShard(self, items):
+        """Produce a copy of the query string with only the given queries
+
+        Parameters
+        ----------
+        items: list
+            (type, query) pairs of the queries of the shard
+        """
+        shard = copy.deepcopy(self)
+        shard.removeAllAuthorQueries()
+        shard.removeAllTitleQueries()
+        shard.removeAllAbstractQueries()
+        for qType, query in items:
+            shard.queries[qType][query] = None
+        return shard
+
+    def __produceUnits(self, qType):
+        """Produce the units of queries of a type that a shard may contain
+
+        And-connected queries of a field can not be split.
+
+        Parameters
+        ----------
+        qType: str
+            Type to produce the units for
+
+        Returns
+        -------
+        units: list
+            lists of (type, query) pairs
+        """
+        items = [(qType, query) for query in self.queries[qType]]
+        if (self.fieldConnectors[qType] == "and") and (len(items) > 0):
+            return [items]
+        return [[item] for item in items]
+
+    def shard(self):
+        """Split the query string into several within the shard budget
+
+        The union of the results of the shards are the results of the full
+        query string. Categories are never split. With the or connector the
+        author, title, and abstract queries are split into groups, with the
+        and connector every group of authors is combined with every group of
+        title/abstract queries. And-connected queries of a field are kept
+        together.
+
+        Returns
+        -------
+        shards: list of QueryString
+            query strings to search for instead of this one (just a copy of
+            it if it is within the budget or can not be split)
+
+        Raises
+        ------
+        EmptyQueryException
+            If there are neither querys nor categories to search for.
+        """
+        authors = self.__produceUnits("au")
+        texts = self.__produceUnits("ti") + self.__produceUnits("abs")
+        if self.connector == "or":
+            sides = [authors + texts]
+        else:
+            sides = [side for side in (authors, texts) if len(side) > 0]
+        numGroups = [1] * len(sides)
+        while True:
+            groups = [[side[i * len(side) // n:(i + 1) * len(side) // n]
+                       for i in range(n)]
+                      for side, n in zip(sides, numGroups)]
+            combinations = [[]]
+            for sideGroups in groups:
+                combinations = [items + sum(group, [])
+                                for items in combinations
+                                for group in sideGroups]
+            shards = [self.__produceShard(items) for items in combinations]
+            if all(shard.__fitsBudget() for shard in shards):
+                return shards
+            splittable = [i for i in range(len(sides))
+                          if numGroups[i] < len(sides[i])]
+            if len(splittable) == 0:
+                return shards
+            largest = max(splittable,
+                          key=lambda i: len(sides[i]) / float(numGroups[i]))
+            numGroups[largest] += 1
+
+    def setDateWindow(self, since=None, until=None, field="lastUpdatedDate"):
+        """Only search for results of a date window
+
+        The window is part of the query, so the server only gives results
+        from within it and the total number of results is the number of
+        results of the window.
+
+        Parameters
+        ----------
+        since: datetime.date
+            first day of the window (None for no lower limit)
+        until: datetime.date
+            last day of the window (None for no upper limit)
+        field: str
+            Can be either 'lastUpdatedDate' or 'submittedDate'
+
+        Raises
+        ------
+        InvalidFieldException
+            If field is not a date field
+        """
+        if not (field in self.dateFields):
+            raise InvalidFieldException
+        if (since is None) and (until is None):
+            self.dateWindow = None
+        else:
+            self.dateWindow = (since, until, field)
+
+    def getDateWindow(self):
+        """Give the date window results are searched for in
+
+        Returns
+        -------
+        window: tuple
+            first day, last day (None if not limited), and field of the
+            window, None if there is no window
+        """
+        return self.dateWindow
+
     def getAllAuthorQueries(self):
         """Give a list of all authors that are searched for
 
@@ -182,7 +473,7 @@ class QueryString:
         authorList: list
             List of all authors that are searched for
         """
-        return self.queries["au"]
+        return list(self.queries["au"])
 
     def getAllTitleQueries(self):
         """Give a list of all title queries that are searched for
@@ -192,7 +483,7 @@ class QueryString:
         titleList: list
             List of all title queries that are searched for
         """
-        return self.queries["ti"]
+        return list(self.queries["ti"])
 
     def getAllAbstractQueries(self):
         """Give a list of all abstract queries that are searched for
@@ -202,7 +493,7 @@ class QueryString:
         abstractList: list
             List of all abstract queries that are searched for
         """
-        return self.queries["abs"]
+        return list(self.queries["abs"])
 
     def getAllCategories(self):
         """Give a list of all categories that are searched in
@@ -212,7 +503,7 @@ class QueryString:
         categoryList: list
             List of all categories that are searched in
         """
-        return self.categories
+        return list(self.categories)
 
     def setConnector(self, connector):
         """Set to do or/and searches
@@ -230,6 +521,54 @@ class QueryString:
         self.connector = connector.lower()
         if not (self.connector in self.connectorStrings.keys()):
             raise InvalidConnectorException
+        self.__changed()
+
+    def setFieldConnector(self, field, connector):
+        """Set to search for any or all queries of a field
+
+        Parameters
+        ----------
+        field: str
+            Can be either 'au', 'ti', or 'abs'
+        connector: str
+            Can be either 'and' or 'or'
+
+        Raises
+        ------
+        InvalidFieldException
+            If field is not au/ti/abs
+        InvalidConnectorException
+            If connector is not and/or
+        """
+        if not (field in self.fieldConnectors):
+            raise InvalidFieldException
+        connector = connector.lower()
+        if not (connector in self.connectorStrings.keys()):
+            raise InvalidConnectorException
+        self.fieldConnectors[field] = connector
+        self.__changed()
+
+    def getFieldConnector(self, field):
+        """Give if any or all queries of a field are searched for
+
+        Parameters
+        ----------
+        field: str
+            Can be either 'au', 'ti', or 'abs'
+
+        Returns
+        -------
+        connector: str
+            Either 'and' or 'or'
+
+        Raises
+        ------
+        InvalidFieldException
+            If field is not au/ti/abs
+        """
+        if not (field in self.fieldConnectors):
+            raise InvalidFieldException
+        return self.fieldConnectors[field]
 
     def nextNumberOfResults(self, N=10):
         """Changes the query string to search for the next N results
@@ -253,9 +592,11 @@ class QueryString:
         ----------
         authorName: str
             Name of an author to also search for
+            (several words are searched for as a phrase)
         """
         if not (authorName in self.queries["au"]):
-            self.queries["au"].append(authorName)
+            self.queries["au"][authorName] = None
+            self.__changed()
 
     def addTitleQuery(self, titleQuery):
         """Add an string to be contained in a title to the query string
@@ -268,9 +609,11 @@ class QueryString:
         ----------
         titleQuery: str
             Word to also search for in titles
+            (several words are searched for as a phrase)
         """
         if not (titleQuery in self.queries["ti"]):
-            self.queries["ti"].append(titleQuery)
+            self.queries["ti"][titleQuery] = None
+            self.__changed()
 
     def addAbstractQuery(self, abstractQuery):
         """Add an string to be contained in an abstract to the query string
@@ -283,9 +626,11 @@ class QueryString:
         ----------
         abstractQuery: str
             Word to also search for in abstracts
+            (several words are searched for as a phrase)
         """
         if not (abstractQuery in self.queries["abs"]):
-            self.queries["abs"].append(abstractQuery)
+            self.queries["abs"][abstractQuery] = None
+            self.__changed()
 
     def addCategory(self, category):
         """Add a category to be searched in
@@ -305,7 +650,8 @@ class QueryString:
         if not (category in self.validCategories):
             raise InvalidCategoryException
         if not (category in self.categories):
-            self.categories.append(category)
+            self.categories[category] = None
+            self.__changed()
 
     def removeAuthorQuery(self, authorName):
         """Remove an author from the query string
@@ -324,9 +670,10 @@ class QueryString:
             If the specified author was not in the query before
         """
         try:
-            self.queries["au"].remove(authorName)
-        except ValueError:
+            del self.queries["au"][authorName]
+        except KeyError:
             raise NotInQueryException
+        self.__changed()
 
     def removeAllAuthorQueries(self):
         """Remove all authors from the query string
@@ -334,7 +681,8 @@ class QueryString:
         Stop searching for authors. At least one query has to be
         specified overall to have a valid query string.
         """
-        self.queries["au"] = []
+        self.queries["au"] = collections.OrderedDict()
+        self.__changed()
 
     def removeTitleQuery(self, titleQuery):
         """Remove an title query from the query string
@@ -353,9 +701,10 @@ class QueryString:
             If the specified word was not in the title queries before
         """
         try:
-            self.queries["ti"].remove(titleQuery)
-        except ValueError:
+            del self.queries["ti"][titleQuery]
+        except KeyError:
             raise NotInQueryException
+        self.__changed()
 
     def removeAllTitleQueries(self):
         """Remove all titles from the query string
@@ -363,7 +712,8 @@ class QueryString:
         Stop searching for titles. At least one query has to be
         specified overall to have a valid query string.
         """
-        self.queries["ti"] = []
+        self.queries["ti"] = collections.OrderedDict()
+        self.__changed()
 
     def removeAbstractQuery(self, abstractQuery):
         """Remove an abstract query from the query string
@@ -382,9 +732,10 @@ class QueryString:
             If the specified word was not in the title queries before
         """
         try:
-            self.queries["abs"].remove(abstractQuery)
-        except ValueError:
+            del self.queries["abs"][abstractQuery]
+        except KeyError:
             raise NotInQueryException
+        self.__changed()
 
     def removeAllAbstractQueries(self):
         """Remove all abstracts from the query string
@@ -392,7 +743,8 @@ class QueryString:
         Stop searching for abstracts. At least one query has to be
         specified overall to have a valid query string.
         """
-        self.queries["abs"] = []
+        self.queries["abs"] = collections.OrderedDict()
+        self.__changed()
 
     def removeCategory(self, category):
         """Remove a search category
@@ -414,6 +766,7 @@ class QueryString:
         if not (category in self.validCategories):
             raise InvalidCategoryException
         try:
-            self.categories.remove(category)
-        except ValueError:
+            del self.categories[category]
+        except KeyError:
             raise NotInQueryException
+        self.__changed()
@@ -0,0 +1,248 @@
+import threading
+import time
+from email.utils import parsedate_tz, mktime_tz
+try:
+    from urllib.error import HTTPError
+except ImportError:
+    from urllib2 import HTTPError
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+import metrics as mT
+
+
+def parseRetryAfter(value, now=None):
+    """Gives the seconds to wait according to a Retry-After header
+
+    Parameters
+    ----------
+    value: str
+        value of the header (seconds or an HTTP date)
+    now: float
+        current time (defaults to time.time())
+
+    Returns
+    -------
+    seconds: float
+        Seconds to wait (None if the value could not be parsed)
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    date = parsedate_tz(value)
+    if date is None:
+        return None
+    if now is None:
+        now = time.time()
+    return max(0., mktime_tz(date) - now)
+
+
+class RateLimiter():
+    """Token bucket spacing out requests to arXiv's api
+
+    Requests are allowed every interval seconds, with bursts of up to burst
+    requests after idle periods. The schedule is shared by all threads using
+    the limiter and, if a lock file is given, by all processes using the same
+    lock file. Requests answered with 429 or 503 are retried with exponential
+    backoff (or after the time asked for with Retry-After), pausing all
+    requests in the meantime.
+    """
+    retryCodes = (429, 503)
+
+    def __init__(self, interval=3., burst=1, lockFile=None, maxRetries=3,
+                 backoff=3., clock=time.time, sleep=time.sleep):
+        """Constructor for a RateLimiter
+
+        Parameters
+        ----------
+        interval: float
+            Seconds between requests
+        burst: int
+            Number of requests allowed at once after idle periods
+        lockFile: str
+            file to share the schedule with other processes through (needs
+            fcntl, the schedule is only shared within the process otherwise)
+        maxRetries: int
+            Number of retries of throttled requests before giving up
+        backoff: float
+            Seconds to wait before the first retry (doubled for every
+            further retry) if the server does not say how long to wait
+        clock: callable
+            function giving the current time in seconds
+        sleep: callable
+            function waiting for a number of seconds
+        """
+        self.interval = interval
+        self.burst = burst
+        self.lockFile = lockFile
+        self.maxRetries = maxRetries
+        self.backoff = backoff
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.nextTime = 0.
+        self.numRequests = 0
+        self.numRetries = 0
+        self.totalWait = 0.
+        self.maxWait = 0.
+
+    def __readNextTime(self, f):
+        """Reads the shared schedule from the lock file
+        """
+        f.seek(0)
+        content = f.read().strip()
+        return float(content) if content else 0.
+
+    def __writeNextTime(self, f, nextTime):
+        """Writes the shared schedule to the lock file
+        """
+        f.seek(0)
+        f.truncate()
+        f.write(repr(nextTime))
+        f.flush()
+
+    def __schedule(self, update):
+        """Applies update to the (shared) schedule while holding the locks
+
+        update takes the time of the next free slot and returns the new one
+        together with a result that is passed on.
+        """
+        with self.lock:
+            if (self.lockFile is None) or (fcntl is None):
+                self.nextTime, result = update(self.nextTime)
+                return result
+            with open(self.lockFile, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    nextTime, result = update(self.__readNextTime(f))
+                    self.__writeNextTime(f, nextTime)
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                return result
+
+    def reserve(self):
+        """Reserves the next allowed slot for a request without waiting
+
+        The caller has to wait the returned time before making the request
+        (e.g. with asyncio.sleep).
+
+        Returns
+        -------
+        wait: float
+            Seconds until the request is allowed
+        """
+        now = self.clock()
+        tolerance = (self.burst - 1) * self.interval
+
+        def update(nextTime):
+            start = max(now, nextTime - tolerance)
+            return max(nextTime, start) + self.interval, start - now
+        wait = self.__schedule(update)
+        if wait > 0:
+            mT.addTime("rateLimitWait", wait)
+        with self.lock:
+            self.numRequests += 1
+            self.totalWait += wait
+            self.maxWait = max(self.maxWait, wait)
+        return wait
+
+    def acquire(self):
+        """Waits until the next request is allowed
+
+        Returns
+        -------
+        wait: float
+            Seconds waited
+        """
+        wait = self.reserve()
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def retryDelay(self, error, attempt):
+        """Decides whether a failed request is retried and pauses requests
+
+        Parameters
+        ----------
+        error: HTTPError
+            error the request failed with
+        attempt: int
+            Number of retries of the request so far
+
+        Returns
+        -------
+        delay: float
+            Seconds all requests are paused before the retry, None if the
+            request is not retried
+        """
+        if (not (error.code in self.retryCodes)) or \
+                (attempt >= self.maxRetries):
+            return None
+        retryAfter = None
+        if not (error.info() is None):
+            retryAfter = parseRetryAfter(
+                error.info().get("Retry-After"), self.clock())
+        if retryAfter is None:
+            retryAfter = self.backoff * 2**attempt
+        with self.lock:
+            self.numRetries += 1
+        mT.count("retries")
+        self.pause(retryAfter)
+        return retryAfter
+
+    def pause(self, seconds):
+        """Delays all further requests by at least a number of seconds
+
+        Parameters
+        ----------
+        seconds: float
+            Seconds from now before the next request is allowed
+        """
+        until = self.clock() + seconds + (self.burst - 1) * self.interval
+        self.__schedule(lambda nextTime: (max(nextTime, until), None))
+
+    def call(self, request, *args, **kwargs):
+        """Makes a request once allowed, retrying it if it is throttled
+
+        Parameters
+        ----------
+        request: callable
+            function making the request, called with the further arguments
+
+        Returns
+        -------
+        result:
+            return value of the request
+
+        Raises
+        ------
+        HTTPError
+            If the request failed, or was still throttled after maxRetries
+            retries
+        """
+        for attempt in range(self.maxRetries + 1):
+            self.acquire()
+            try:
+                return request(*args, **kwargs)
+            except HTTPError as e:
+                if self.retryDelay(e, attempt) is None:
+                    raise
+
+    def statistics(self):
+        """Gives how often and how long requests waited
+
+        Returns
+        -------
+        statistics: dict
+            number of requests and retries, total, mean and maximal wait in
+            seconds
+        """
+        with self.lock:
+            return {"requests": self.numRequests,
+                    "retries": self.numRetries,
+                    "totalWait": self.totalWait,
+                    "meanWait": self.totalWait / max(self.numRequests, 1),
+                    "maxWait": self.maxWait}
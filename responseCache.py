@@ -0,0 +1,231 @@
+import collections
+import os
+import pickle
+import threading
+import time
+try:
+    from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+except ImportError:
+    from urlparse import urlsplit, urlunsplit, parse_qsl
+    from urllib import urlencode
+
+
+def normalizeUrl(url):
+    """Normalises a query url, so that equivalent urls give the same key
+
+    Scheme and host are lower cased and the query parameters are sorted.
+
+    Parameters
+    ----------
+    url: str
+        url to normalise
+
+    Returns
+    -------
+    key: str
+        normalised url
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(),
+                       parts.path, query, ""))
+
+
+class CachedResponse():
+    """Parsed feed of a cached response together with its validators
+    """
+    def __init__(self, feed, stopDate=None, etag=None, lastModified=None,
+                 size=0):
+        """Constructor for a CachedResponse
+
+        Parameters
+        ----------
+        feed: feedparser.FeedParserDict
+            parsed feed
+        stopDate: datetime.date
+            date after which parsing stopped (None if the feed is complete)
+        etag: str
+            ETag header of the response
+        lastModified: str
+            Last-Modified header of the response
+        size: int
+            Number of (decoded) bytes of the response, as a measure of the
+            memory its feed takes
+        """
+        self.feed = feed
+        self.stopDate = stopDate
+        self.etag = etag
+        self.lastModified = lastModified
+        self.size = size
+        self.storedAt = time.time()
+
+    def covers(self, stopDate):
+        """Checks if the cached feed contains all entries needed
+
+        Parameters
+        ----------
+        stopDate: datetime.date
+            date after which parsing is to stop (None for complete feeds)
+
+        Returns
+        -------
+        covers: bool
+            Indicates if the cached feed can be used
+        """
+        if self.stopDate is None:
+            return True
+        return (not (stopDate is None)) and (stopDate >= self.stopDate)
+
+    def validators(self):
+        """Gives the headers to revalidate the response with
+
+        Returns
+        -------
+        headers: dict
+            If-None-Match/If-Modified-Since headers
+        """
+        headers = {}
+        if not (self.etag is None):
+            headers["If-None-Match"] = self.etag
+        if not (self.lastModified is None):
+            headers["If-Modified-Since"] = self.lastModified
+        return headers
+
+
+class ResponseCache():
+    """Size-bounded LRU cache of parsed api responses keyed by their url
+
+    Responses are fresh for a given time, after which they are revalidated
+    with the server (via ETag/Last-Modified) before they are used again.
+    The cache can be saved to a file to reuse it in later runs.
+    """
+    def __init__(self, maxEntries=256, maxBytes=64 * 1024**2, ttl=600.,
+                 fileName=None):
+        """Constructor for a ResponseCache
+
+        Parameters
+        ----------
+        maxEntries: int
+            Maximum number of cached responses
+        maxBytes: int
+            Maximum number of bytes of all cached responses
+        ttl: float
+            Seconds a response is used without revalidating it
+        fileName: str
+            file to load the cache from (if it exists) and save it to
+        """
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.ttl = ttl
+        self.fileName = fileName
+        self.responses = collections.OrderedDict()
+        self.numBytes = 0
+        self.lock = threading.Lock()
+        if (not (fileName is None)) and os.path.exists(fileName):
+            self.load(fileName)
+
+    def __len__(self):
+        return len(self.responses)
+
+    def get(self, url):
+        """Gives the cached response for a url
+
+        Parameters
+        ----------
+        url: str
+            url of the request
+
+        Returns
+        -------
+        response: CachedResponse
+            cached response (None if there is none)
+        """
+        key = normalizeUrl(url)
+        with self.lock:
+            response = self.responses.pop(key, None)
+            if not (response is None):
+                self.responses[key] = response
+            return response
+
+    def isFresh(self, response):
+        """Checks if a cached response can be used without revalidation
+
+        Parameters
+        ----------
+        response: CachedResponse
+            cached response
+
+        Returns
+        -------
+        fresh: bool
+            Indicates if the response is younger than the ttl
+        """
+        return time.time() - response.storedAt < self.ttl
+
+    def put(self, url, response):
+        """Caches a response, evicting the least recently used ones
+
+        Parameters
+        ----------
+        url: str
+            url of the request
+        response: CachedResponse
+            response to cache
+        """
+        key = normalizeUrl(url)
+        with self.lock:
+            old = self.responses.pop(key, None)
+            if not (old is None):
+                self.numBytes -= old.size
+            self.responses[key] = response
+            self.numBytes += response.size
+            while ((len(self.responses) > self.maxEntries)
+                   or ((self.numBytes > self.maxBytes)
+                       and (len(self.responses) > 1))):
+                evicted = self.responses.popitem(last=False)[1]
+                self.numBytes -= evicted.size
+
+    def refresh(self, url):
+        """Marks the cached response for a url as fresh after revalidation
+
+        Parameters
+        ----------
+        url: str
+            url of the request
+        """
+        response = self.get(url)
+        if not (response is None):
+            response.storedAt = time.time()
+
+    def clear(self):
+        """Removes all cached responses
+        """
+        with self.lock:
+            self.responses.clear()
+            self.numBytes = 0
+
+    def load(self, fileName=None):
+        """Loads cached responses from a file
+
+        Parameters
+        ----------
+        fileName: str
+            file to load from (defaults to the one given to the constructor)
+        """
+        with open(fileName or self.fileName, "rb") as f:
+            responses = pickle.load(f)
+        for url, response in responses:
+            self.put(url, response)
+
+    def save(self, fileName=None):
+        """Saves the cached responses to a file
+
+        Parameters
+        ----------
+        fileName: str
+            file to save to (defaults to the one given to the constructor)
+        """
+        with self.lock:
+            responses = list(self.responses.items())
+        with open(fileName or self.fileName, "wb") as f:
+            pickle.dump(responses, f)
@@ -0,0 +1,70 @@
+import os
+import pickle
+
+
+class SearchCheckpoint():
+    """On-disk state of a search that was interrupted
+
+    After every page the position of the next page, the text composed so far,
+    and the entries kept for ranking are written to the file, so that a
+    failed search can be resumed from the last page that was gone through
+    instead of from the first one. The state is only given back to the same
+    search, i.e. one with the same key (see arXivQuerPy.checkpointKey).
+    """
+    def __init__(self, fileName=r"./checkpoint.pickle"):
+        """Constructor for a SearchCheckpoint
+
+        Parameters
+        ----------
+        fileName: str
+            path to the checkpoint (does not need to exist)
+        """
+        self.fileName = fileName
+
+    def save(self, key, state):
+        """Replaces the checkpoint by the state of a search
+
+        The file is replaced atomically, so an interruption while saving
+        keeps the previous checkpoint.
+
+        Parameters
+        ----------
+        key: tuple
+            key of the search
+        state: dict
+            state of the search (has to be picklable)
+        """
+        temporary = self.fileName + ".tmp"
+        with open(temporary, "wb") as f:
+            pickle.dump((key, state), f, protocol=2)
+        os.rename(temporary, self.fileName)
+
+    def load(self, key):
+        """Gives the state of a search
+
+        Parameters
+        ----------
+        key: tuple
+            key of the search
+
+        Returns
+        -------
+        state: dict
+            state saved for the search, None if there is no checkpoint, it
+            cannot be read, or it belongs to another search
+        """
+        try:
+            with open(self.fileName, "rb") as f:
+                savedKey, state = pickle.load(f)
+        except (IOError, OSError, EOFError, ValueError,
+                pickle.UnpicklingError):
+            return None
+        if not (savedKey == key):
+            return None
+        return state
+
+    def clear(self):
+        """Removes the checkpoint (once the search is finished)
+        """
+        if os.path.exists(self.fileName):
+            os.remove(self.fileName)
@@ -0,0 +1,206 @@
+import datetime
+import hashlib
+import math
+import sqlite3
+import feedEntry as fE
+
+
+class BloomFilter():
+    """Compact set of keys that may give false positives but no false
+    negatives
+    """
+    def __init__(self, capacity=1024, errorRate=0.01):
+        """Constructor for a BloomFilter
+
+        Parameters
+        ----------
+        capacity: int
+            Number of keys up to which the error rate is kept
+        errorRate: float
+            Probability of a false positive at full capacity
+        """
+        self.capacity = max(capacity, 1)
+        self.numBits = int(math.ceil(-self.capacity * math.log(errorRate)
+                                     / math.log(2) ** 2))
+        self.numHashes = max(1, int(round(float(self.numBits) / self.capacity
+                                          * math.log(2))))
+        self.bits = bytearray((self.numBits + 7) // 8)
+        self.numKeys = 0
+
+    def __len__(self):
+        return self.numKeys
+
+    def __positions(self, key):
+        """Gives the bits of a key
+        """
+        digest = hashlib.md5(key.encode("utf-8")).hexdigest()
+        first, second = int(digest[:16], 16), int(digest[16:], 16) | 1
+        return [(first + i * second) % self.numBits
+                for i in range(self.numHashes)]
+
+    def add(self, key):
+        """Adds a key to the set
+
+        Parameters
+        ----------
+        key: str
+            key to add
+        """
+        for position in self.__positions(key):
+            self.bits[position // 8] |= 1 << (position % 8)
+        self.numKeys += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position // 8] & (1 << (position % 8))
+                   for position in self.__positions(key))
+
+
+class SentStore():
+    """On-disk record of the entries already sent to every recipient
+
+    Entries are keyed by arXiv id and version, so that new versions of an
+    entry are sent again. An in-memory BloomFilter answers most lookups of
+    entries that were not sent without touching the database. Additionally
+    the range of updates already gone through for a recipient and query is
+    kept, so that later searches can stop once they reach it.
+    """
+    def __init__(self, fileName=r"./sent.sqlite"):
+        """Constructor for a SentStore
+
+        Parameters
+        ----------
+        fileName: str
+            path to the database (created if it does not exist)
+        """
+        self.fileName = fileName
+        self.connection = sqlite3.connect(fileName)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS sent ("
+            "recipient TEXT, arxivId TEXT, version INTEGER, "
+            "PRIMARY KEY (recipient, arxivId, version))")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS coverage ("
+            "recipient TEXT, queryKey TEXT, since TEXT, highWaterMark REAL, "
+            "PRIMARY KEY (recipient, queryKey))")
+        self.connection.commit()
+        self.__loadFilter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM sent").fetchone()[0]
+
+    def close(self):
+        """Closes the database
+        """
+        self.connection.close()
+
+    @staticmethod
+    def __key(recipient, arxivId, version):
+        return u"{0} {1}v{2:d}".format(recipient, arxivId, version)
+
+    def __loadFilter(self):
+        """Fills a new BloomFilter (with room to grow) from the database
+        """
+        self.filter = BloomFilter(capacity=max(1024, 2 * len(self)))
+        for row in self.connection.execute(
+                "SELECT recipient, arxivId, version FROM sent"):
+            self.filter.add(self.__key(*row))
+
+    def isSent(self, recipient, entryId):
+        """Checks if an entry was already sent to a recipient
+
+        Parameters
+        ----------
+        recipient: str
+            address the entry is sent to
+        entryId: str
+            id of the entry (e.g. http://arxiv.org/abs/1608.03248v1)
+
+        Returns
+        -------
+        sent: bool
+            Indicates if this version of the entry was sent before
+        """
+        arxivId, version = fE.splitArxivId(entryId)
+        if not (self.__key(recipient, arxivId, version) in self.filter):
+            return False
+        return not (self.connection.execute(
+            "SELECT 1 FROM sent WHERE recipient = ? AND arxivId = ? "
+            "AND version = ?", (recipient, arxivId, version)).fetchone()
+            is None)
+
+    def addSent(self, recipient, entryIds):
+        """Records entries as sent to a recipient
+
+        Parameters
+        ----------
+        recipient: str
+            address the entries were sent to
+        entryIds: iterable of str
+            ids of the entries
+        """
+        rows = [(recipient,) + fE.splitArxivId(entryId)
+                for entryId in entryIds]
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO sent VALUES (?, ?, ?)", rows)
+        self.connection.commit()
+        if len(self.filter) + len(rows) > self.filter.capacity:
+            self.__loadFilter()
+        else:
+            for row in rows:
+                self.filter.add(self.__key(*row))
+
+    def getCoverage(self, recipient, queryKey):
+        """Gives the range of updates gone through for a recipient and query
+
+        Parameters
+        ----------
+        recipient: str
+            address the results are sent to
+        queryKey: str
+            key of the query (see QueryString.getQueryKey)
+
+        Returns
+        -------
+        coverage: tuple
+            None if the query was never sent to the recipient, otherwise the
+            date back to which all results were gone through (None if all)
+            and the time stamp of the newest update gone through
+        """
+        row = self.connection.execute(
+            "SELECT since, highWaterMark FROM coverage "
+            "WHERE recipient = ? AND queryKey = ?",
+            (recipient, queryKey)).fetchone()
+        if row is None:
+            return None
+        since, highWaterMark = row
+        if not (since is None):
+            since = datetime.datetime.strptime(since, "%Y-%m-%d").date()
+        return since, highWaterMark
+
+    def setCoverage(self, recipient, queryKey, since, highWaterMark):
+        """Records the range of updates gone through for a recipient and query
+
+        Parameters
+        ----------
+        recipient: str
+            address the results are sent to
+        queryKey: str
+            key of the query (see QueryString.getQueryKey)
+        since: datetime.date
+            date back to which all results were gone through (None if all)
+        highWaterMark: float
+            time stamp of the newest update gone through
+        """
+        if not (since is None):
+            since = since.isoformat()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?)",
+            (recipient, queryKey, since, highWaterMark))
+        self.connection.commit()
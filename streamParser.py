@@ -0,0 +1,162 @@
+import calendar
+import datetime
+import time
+import xml.etree.ElementTree as ET
+import feedparser
+import feedEntry as fE
+
+
+atomNamespace = r"{http://www.w3.org/2005/Atom}"
+opensearchNamespace = r"{http://a9.com/-/spec/opensearch/1.1/}"
+
+
+def parseDate(text):
+    """Parses a date as given by arXiv's api (e.g. 2016-08-10T18:15:58Z)
+
+    Parameters
+    ----------
+    text: str
+        date to parse
+
+    Returns
+    -------
+    date: time.struct_time
+        parsed date in UTC (as given by feedparser)
+    """
+    return time.gmtime(calendar.timegm(
+        time.strptime(text.strip(), "%Y-%m-%dT%H:%M:%SZ")))
+
+
+def entryFromElement(element):
+    """Converts an Atom entry element into a feed entry
+
+    Parameters
+    ----------
+    element: xml.etree.ElementTree.Element
+        entry element of an Atom feed
+
+    Returns
+    -------
+    entry: feedEntry.Entry
+        record of the entry
+    """
+    link = None
+    for linkElement in element.findall(atomNamespace + "link"):
+        if linkElement.get("rel", "alternate") == "alternate":
+            link = linkElement.get("href")
+            break
+    return fE.Entry(
+        element.findtext(atomNamespace + "id", "").strip(),
+        element.findtext(atomNamespace + "title", "").strip(),
+        [author.findtext(atomNamespace + "name", "").strip()
+         for author in element.findall(atomNamespace + "author")],
+        link,
+        element.findtext(atomNamespace + "summary", "").strip(),
+        parseDate(element.findtext(atomNamespace + "updated")),
+        [tag.get("term")
+         for tag in element.findall(atomNamespace + "category")])
+
+
+class StreamingFeedParser():
+    """Parses an Atom feed from arXiv's api while it is read
+
+    Entries are yielded as soon as they are read, so that reading can stop
+    (and the stream can be closed) without reading the remaining feed.
+    The header of the feed (e.g. the opensearch information) is available
+    in feed once the first entry was yielded.
+    """
+    def __init__(self, stream):
+        """Constructor for a StreamingFeedParser
+
+        Parameters
+        ----------
+        stream: file-like object
+            stream to read the feed from (e.g. a http response)
+        """
+        self.stream = stream
+        self.feed = feedparser.FeedParserDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __iter__(self):
+        """Parses the feed entry by entry
+
+        Yields
+        ------
+        entry: feedEntry.Entry
+            next entry of the feed
+        """
+        depth = 0
+        root = None
+        for event, element in ET.iterparse(self.stream,
+                                           events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                continue
+            if element.tag == atomNamespace + "entry":
+                entry = entryFromElement(element)
+                # free the memory of entries that were already parsed
+                root.remove(element)
+                yield entry
+            else:
+                self.__addToHeader(element)
+
+    def __addToHeader(self, element):
+        """Adds a child of the feed element to the header
+        """
+        if element.tag.startswith(opensearchNamespace):
+            name = "opensearch_" + element.tag[len(opensearchNamespace):]
+            self.feed[name.lower()] = (element.text or "").strip()
+        elif element.tag.startswith(atomNamespace):
+            name = element.tag[len(atomNamespace):]
+            if name == "link":
+                self.feed.setdefault("links", []).append(
+                    feedparser.FeedParserDict(element.attrib))
+            elif not (element.text is None):
+                self.feed[name] = element.text.strip()
+
+    def close(self):
+        """Stops reading and closes the stream
+        """
+        self.stream.close()
+
+
+def parseUntil(stream, date=None):
+    """Parses a feed from a stream until an entry is older than a date
+
+    The first entry that was last updated before the date is still included
+    (so the date limit can be detected from the feed), everything after it is
+    not read anymore and the stream is closed.
+
+    Parameters
+    ----------
+    stream: file-like object
+        stream to read the feed from (e.g. a http response)
+    date: datetime.date
+        date until when to go back (None reads the whole feed)
+
+    Returns
+    -------
+    feed: feedparser.FeedParserDict
+        feed containing the entries read
+    """
+    parser = StreamingFeedParser(stream)
+    entries = []
+    try:
+        for entry in parser:
+            entries.append(entry)
+            if ((not (date is None)) and
+                    (datetime.date(*entry.updated_parsed[:3]) < date)):
+                break
+    finally:
+        parser.close()
+    return feedparser.FeedParserDict(feed=parser.feed, entries=entries)
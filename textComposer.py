@@ -1,5 +1,8 @@
+import calendar
 import feedparser
 import datetime
+import feedEntry as fE
+import metrics as mT
 
 
 class NotAFeedException(ValueError):
@@ -12,6 +15,113 @@ class NotADateException(ValueError):
     """
 
 
+def isLastPage(feed):
+    """Checks whether the given feed is the last page of its query
+
+    Uses the opensearch information of arXiv's api to decide whether further
+    results are available. If these are missing, a page that is not filled
+    up to the requested number of items is considered to be the last one.
+
+    Parameters
+    ----------
+    feed: feedparser.FeedParserDict
+        feed (one page of results) to check
+
+    Returns
+    -------
+    last: bool
+        Indicates if no further results are available
+    """
+    numEntries = len(feed.entries)
+    if numEntries == 0:
+        return True
+    info = feed.get("feed", {})
+    try:
+        total = int(info["opensearch_totalresults"])
+        start = int(info.get("opensearch_startindex", 0))
+        return start + numEntries >= total
+    except (KeyError, ValueError):
+        pass
+    try:
+        return numEntries < int(info["opensearch_itemsperpage"])
+    except (KeyError, ValueError):
+        return False
+
+
+def numberOfResults(feed):
+    """Gives the total number of results of the query of a feed
+
+    Parameters
+    ----------
+    feed: feedparser.FeedParserDict
+        feed (one page of results)
+
+    Returns
+    -------
+    total: int
+        number of results of all pages, None if the feed does not tell
+    """
+    try:
+        return int(feed.get("feed", {})["opensearch_totalresults"])
+    except (KeyError, ValueError):
+        return None
+
+
+def isDateReached(feed, date):
+    """Checks whether the given feed contains entries from before a date
+
+    Parameters
+    ----------
+    feed: feedparser.FeedParserDict
+        feed (one page of results) to check
+    date: datetime.date
+        date until when to go back (None never is reached)
+
+    Returns
+    -------
+    reached: bool
+        Indicates if any entry was last updated before the date
+    """
+    if date is None:
+        return False
+    for entry in feed.entries:
+        if datetime.date(*entry.updated_parsed[:3]) < date:
+            return True
+    return False
+
+
+def mergeFeeds(feeds):
+    """Merges the entries of several feeds, e.g. of the shards of a query
+
+    Entries contained in several feeds are only kept once (in their newest
+    version). Entries are sorted by the date of their last update, newest
+    first.
+
+    Parameters
+    ----------
+    feeds: list of feedparser.FeedParserDict
+        feeds to merge (the header is taken from the first one)
+
+    Returns
+    -------
+    feed: feedparser.FeedParserDict
+        feed with the merged entries
+    """
+    entries = {}
+    for feed in feeds:
+        for entry in feed.entries:
+            entry = fE.toEntry(entry)
+            arxivId, version = fE.splitArxivId(entry.id)
+            key = (tuple(entry.updated_parsed), version)
+            if (not (arxivId in entries)) or (entries[arxivId][0] < key):
+                entries[arxivId] = (key, entry)
+    merged = sorted(entries.values(), key=lambda item: item[0],
+                    reverse=True)
+    header = feeds[0].get("feed", {}) if len(feeds) > 0 else {}
+    return feedparser.FeedParserDict(
+        feed=header, entries=[entry for key, entry in merged])
+
+
 class TextComposer():
     """Makes feeds from the arXiv api readable
 
@@ -37,20 +147,55 @@ class TextComposer():
         NotADateException
             If the given date is not a datetime.date
         """
-        self.text = startingText
+        self.fragments = []
+        if not (startingText == ""):
+            self.fragments.append(startingText)
         if ((not (date is None))
                 and (not (type(date) == datetime.date))):
             raise NotADateException
         self.date = date
+        self.isSent = None
+        self.coveredUntil = None
+        self.entryIds = []
+        self.newestUpdate = None
 
     def __unicode__(self):
-        return self.text
+        text = u"".join(self.fragments)
+        # keep the joined text to not join the same fragments again
+        self.fragments = [text] if not (text == u"") else []
+        return text
 
     def __str__(self):
         try:
             return unicode(self).encode("utf-8")
         except NameError:
-            return self.text
+            return self.__unicode__()
+
+    def iterText(self):
+        """Gives the current version of the text piece by piece
+
+        Allows writing the text out without joining it into one string first.
+
+        Yields
+        ------
+        fragment: str
+            next piece of the text
+        """
+        for fragment in list(self.fragments):
+            if isinstance(fragment, str):
+                yield fragment
+            else:
+                yield fragment.encode("utf-8")
+
+    def getNumberOfLines(self):
+        """Counts the lines of the current version of the text
+
+        Returns
+        -------
+        numLines: int
+            Number of newline characters in the text
+        """
+        return sum(fragment.count(u"\n") for fragment in self.fragments)
 
     def getText(self):
         """Gives the current version of the text
@@ -89,6 +234,66 @@ class TextComposer():
             raise NotADateException
         self.date = date
 
+    def setSentFilter(self, isSent, coveredUntil=None):
+        """Skip entries that were already sent
+
+        Parameters
+        ----------
+        isSent: callable
+            Gets the id of an entry and tells if it was already sent
+        coveredUntil: float
+            Time stamp of the newest update already gone through, entries
+            updated before it are not gone through again (None if unknown)
+        """
+        self.isSent = isSent
+        self.coveredUntil = coveredUntil
+
+    def getEntryIds(self):
+        """Gives the ids of the entries added to the text
+
+        Returns
+        -------
+        entryIds: list of str
+            ids of the added entries in order
+        """
+        return self.entryIds
+
+    def getNewestUpdate(self):
+        """Gives the time stamp of the newest update gone through
+
+        Returns
+        -------
+        newestUpdate: float
+            time stamp of the newest entry of the added feeds, None if there
+            was none
+        """
+        return self.newestUpdate
+
+    def getState(self):
+        """Gives what was composed so far, e.g. to checkpoint it
+
+        Returns
+        -------
+        state: dict
+            text, ids of the added entries, and time stamp of the newest
+            update gone through
+        """
+        return {"text": u"".join(self.fragments),
+                "entryIds": list(self.entryIds),
+                "newestUpdate": self.newestUpdate}
+
+    def setState(self, state):
+        """Continues from what was composed before (see getState)
+
+        Parameters
+        ----------
+        state: dict
+            state given by getState
+        """
+        self.fragments = [state["text"]] if not (state["text"] == u"") else []
+        self.entryIds = list(state["entryIds"])
+        self.newestUpdate = state["newestUpdate"]
+
     def addFeed(self, feed):
         """Adds another feed to the text
 
@@ -109,28 +314,41 @@ class TextComposer():
         """
         if not (type(feed) == feedparser.FeedParserDict):
             raise NotAFeedException
-        reached = False
-        if not (self.text == ""):
-            self.text += u"\n"
-        numEntries = len(feed.entries)
-        if (numEntries < 10):
-            reached = True
-        for i, entry in enumerate(feed.entries):
-            entryUpdateParsed = entry.updated_parsed
-            if ((not (self.date is None))
-                    and (datetime.date(*entryUpdateParsed[:3]) < self.date)):
+        with mT.timer("compose"):
+            numEntries = len(self.entryIds)
+            reached = False
+            if len(self.fragments) > 0:
+                self.fragments.append(u"\n")
+            if isLastPage(feed):
                 reached = True
-                break
-            if i > 0:
-                self.text += u"\n"
-            self.text += entry.title + u"\n"
-            numAuthors = len(entry.authors)
-            for j, author in enumerate(entry.authors):
-                self.text += author["name"]
-                if j < numAuthors - 1:
-                    self.text += u", "
-                else:
-                    self.text += u"\n"
-            self.text += entry.link + u"\n"
-            self.text += entry.summary + u"\n"
+            first = True
+            for entry in feed.entries:
+                entry = fE.toEntry(entry)
+                entryUpdateParsed = entry.updated_parsed
+                if ((not (self.date is None))
+                        and (datetime.date(*entryUpdateParsed[:3])
+                             < self.date)):
+                    reached = True
+                    break
+                updated = calendar.timegm(entryUpdateParsed)
+                if ((not (self.coveredUntil is None))
+                        and (updated < self.coveredUntil)):
+                    reached = True
+                    break
+                if ((self.newestUpdate is None)
+                        or (updated > self.newestUpdate)):
+                    self.newestUpdate = updated
+                if (not (self.isSent is None)) and self.isSent(entry.id):
+                    continue
+                self.entryIds.append(entry.id)
+                lines = [entry.title]
+                if len(entry.authors) > 0:
+                    lines.append(u", ".join(entry.authors))
+                lines.append(entry.link)
+                lines.append(entry.summary)
+                if not first:
+                    self.fragments.append(u"\n")
+                first = False
+                self.fragments.append(u"\n".join(lines) + u"\n")
+            mT.count("entriesEmitted", len(self.entryIds) - numEntries)
         return reached